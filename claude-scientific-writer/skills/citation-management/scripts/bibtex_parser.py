@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Streaming BibTeX Parser
+Incremental, brace-depth-aware tokenizer shared by format_bibtex.py and
+validate_citations.py.
+
+The file is read in chunks and entries are yielded one at a time, so memory
+use does not depend on the size of the bibliography. Entry boundaries and
+field values are found by counting braces, like BibTeX itself does, so values
+with nested braces ({The {RNA} World}), quoted values, bare numbers, @string
+macros and # concatenation are all kept intact.
+
+Usage:
+    from bibtex_parser import iter_bibtex_entries
+
+    with open('references.bib', encoding='utf-8') as f:
+        for entry in iter_bibtex_entries(f):
+            print(entry['line'], entry['key'], entry['fields'].get('title'))
+"""
+
+import re
+import sys
+from typing import Callable, Dict, IO, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+# Start of an entry: @type{ or @type(
+ENTRY_START = re.compile(r'@\s*([A-Za-z][\w-]*)\s*([{(])')
+
+# The next line starting with @, where parsing resumes after a broken entry
+NEXT_ENTRY_LINE = re.compile(r'\n[ \t]*@')
+
+BRACE = re.compile(r'[{}]')
+BRACE_OR_PAREN = re.compile(r'[{}()]')
+BRACE_OR_QUOTE = re.compile(r'[{}"]')
+
+FIELD_NAME = re.compile(r'\s*([^\s=,{}"#%()]+)\s*=\s*')
+BARE_VALUE = re.compile(r'[^\s,#{}"()]+')
+WHITESPACE = re.compile(r'\s*')
+
+# Entry types that are not references
+SKIPPED_TYPES = {'comment', 'preamble'}
+
+
+def _warn(message: str) -> None:
+    print(f'Warning: {message}', file=sys.stderr)
+
+
+def iter_bibtex_entries(handle: IO[str],
+                        macros: Optional[Dict[str, str]] = None,
+                        on_warning: Callable[[str], None] = _warn) -> Iterator[Dict]:
+    """
+    Yield the entries of a BibTeX file one at a time.
+
+    @string definitions are collected into macros and used for later values;
+    @comment and @preamble blocks are skipped. An entry whose braces never
+    close is reported and skipped, and parsing resumes at the next line that
+    starts with @.
+
+    Args:
+        handle: Text file handle (or any object with read(size))
+        macros: Optional @string macros, updated as definitions are read
+        on_warning: Called with a message for each malformed entry or field
+
+    Yields:
+        Entry dictionaries with 'type' (lowercase), 'key', 'fields'
+        (lowercase name -> value, in file order), 'raw' (the entry's source
+        text), 'line' (1-based line of the @) and 'offset' (character offset
+        of the @)
+    """
+    macros = {} if macros is None else macros
+
+    buffer = ''
+    buffer_offset = 0  # offset of buffer[0] in the file
+    line = 1  # line number at counted_pos
+    counted_pos = 0
+    pos = 0
+    eof = False
+
+    def fill(keep_from: int) -> int:
+        """Drop buffer[:keep_from], read another chunk; return the shift."""
+        nonlocal buffer, buffer_offset, line, counted_pos, eof
+        if keep_from > counted_pos:
+            line += buffer.count('\n', counted_pos, keep_from)
+            counted_pos = keep_from
+        chunk = handle.read(CHUNK_SIZE)
+        if not chunk:
+            eof = True
+        buffer = buffer[keep_from:] + chunk
+        buffer_offset += keep_from
+        counted_pos -= keep_from
+        return keep_from
+
+    while True:
+        match = ENTRY_START.search(buffer, pos)
+        if not match:
+            if eof:
+                return
+            # Keep a trailing @ that may start an entry in the next chunk
+            at = buffer.rfind('@', max(pos, len(buffer) - 256))
+            fill(at if at >= 0 else len(buffer))
+            pos = 0
+            continue
+
+        start = match.start()
+        end, depth = _find_entry_end(buffer, match.end(), match.group(2))
+        while end < 0 and not eof:
+            scanned = len(buffer) - start
+            start -= fill(start)
+            match = ENTRY_START.match(buffer, start)
+            end, depth = _find_entry_end(buffer, start + scanned, match.group(2), depth)
+
+        line += buffer.count('\n', counted_pos, start)
+        counted_pos = start
+        entry_type = match.group(1).lower()
+
+        if end < 0:
+            on_warning(f'line {line}: unterminated @{entry_type} entry, skipped')
+            resume = NEXT_ENTRY_LINE.search(buffer, match.end())
+            if not resume:
+                return
+            pos = resume.start() + 1
+            continue
+
+        pos = end + 1
+        if entry_type in SKIPPED_TYPES:
+            continue
+
+        body = buffer[match.end():end]
+        if entry_type == 'string':
+            macros.update(_parse_fields(body, 0, macros, line, on_warning))
+            continue
+
+        comma = body.find(',')
+        if comma < 0:
+            key, fields = body.strip(), {}
+        else:
+            key = body[:comma].strip()
+            fields = _parse_fields(body, comma + 1, macros, line, on_warning)
+
+        yield {
+            'type': entry_type,
+            'key': key,
+            'fields': fields,
+            'raw': buffer[start:pos],
+            'line': line,
+            'offset': buffer_offset + start,
+        }
+
+        # Drop parsed text once it makes up most of the buffer
+        if pos > CHUNK_SIZE:
+            pos -= fill(pos)
+
+
+def parse_bibtex_file(filepath: str) -> List[Dict]:
+    """
+    Parse a BibTeX file into a list of entries.
+
+    Args:
+        filepath: Path to BibTeX file
+
+    Returns:
+        List of entry dictionaries (see iter_bibtex_entries), or an empty
+        list if the file cannot be read
+    """
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return list(iter_bibtex_entries(f))
+    except (OSError, UnicodeDecodeError) as e:
+        print(f'Error reading file: {e}', file=sys.stderr)
+        return []
+
+
+def _find_entry_end(text: str, pos: int, delimiter: str, depth: int = 0) -> Tuple[int, int]:
+    """
+    Find the brace or parenthesis closing an entry.
+
+    Returns (index, depth): index is -1 if the entry does not close within
+    text, and depth is then the brace depth at the end of text, for resuming
+    the scan once more text has been read.
+    """
+    pattern = BRACE if delimiter == '{' else BRACE_OR_PAREN
+    for match in pattern.finditer(text, pos):
+        char = match.group()
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            if depth == 0:
+                if delimiter == '{':
+                    return match.start(), depth
+                continue  # stray brace; BibTeX ignores it too
+            depth -= 1
+        elif char == ')' and depth == 0:
+            return match.start(), depth
+    return -1, depth
+
+
+def _find_value_end(text: str, pos: int) -> int:
+    """Index of the delimiter closing the {...} or "..." value at pos, or -1."""
+    closing = '}' if text[pos] == '{' else '"'
+    depth = 0
+    for match in BRACE_OR_QUOTE.finditer(text, pos + 1):
+        char = match.group()
+        if char == '{':
+            depth += 1
+        elif depth == 0 and char == closing:
+            return match.start()
+        elif char == '}':
+            depth -= 1
+    return -1
+
+
+def _skip_field(text: str, pos: int) -> int:
+    """Index just past the next comma outside braces, or len(text)."""
+    depth = 0
+    for index in range(pos, len(text)):
+        char = text[index]
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+        elif char == ',' and depth <= 0:
+            return index + 1
+    return len(text)
+
+
+def _parse_fields(body: str, pos: int, macros: Dict[str, str], line: int,
+                  on_warning: Callable[[str], None]) -> Dict[str, str]:
+    """Parse name = value pairs from an entry body, starting at pos."""
+    fields = {}
+    while True:
+        pos = WHITESPACE.match(body, pos).end()
+        while pos < len(body) and body[pos] == ',':
+            pos = WHITESPACE.match(body, pos + 1).end()
+        if pos >= len(body):
+            return fields
+
+        name_match = FIELD_NAME.match(body, pos)
+        if not name_match:
+            on_warning(f'line {line}: could not parse field near "{body[pos:pos + 30].strip()}"')
+            pos = _skip_field(body, pos)
+            continue
+
+        name = name_match.group(1).lower()
+        pos = name_match.end()
+        parts = []
+        while pos < len(body):
+            if body[pos] in '{"':
+                end = _find_value_end(body, pos)
+                if end < 0:
+                    on_warning(f'line {line}: unterminated value for field "{name}"')
+                    return fields
+                parts.append(body[pos + 1:end])
+                pos = end + 1
+            else:
+                bare = BARE_VALUE.match(body, pos)
+                if not bare:
+                    break
+                value = bare.group()
+                # Numbers stay as written, defined macros are expanded, and
+                # undefined ones (like the month names jan..dec) stay as names
+                parts.append(macros.get(value.lower(), value))
+                pos = bare.end()
+
+            pos = WHITESPACE.match(body, pos).end()
+            if pos < len(body) and body[pos] == '#':
+                pos = WHITESPACE.match(body, pos + 1).end()
+            else:
+                break
+
+        if parts:
+            fields[name] = ''.join(parts).strip()
+        else:
+            on_warning(f'line {line}: missing value for field "{name}"')
+
+        if pos < len(body) and body[pos] != ',':
+            on_warning(f'line {line}: unexpected text after field "{name}"')
+            pos = _skip_field(body, pos)
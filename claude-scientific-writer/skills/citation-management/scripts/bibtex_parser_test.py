@@ -0,0 +1,98 @@
+import io
+import unittest
+
+import bibtex_parser
+from bibtex_parser import iter_bibtex_entries
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestIterBibtexEntries(unittest.TestCase):
+
+    def parse(self, text, chunk_size=None):
+        """Parse text, optionally with a tiny chunk size to split entries across reads"""
+        warnings = []
+        original_chunk_size = bibtex_parser.CHUNK_SIZE
+        if chunk_size:
+            bibtex_parser.CHUNK_SIZE = chunk_size
+        try:
+            entries = list(iter_bibtex_entries(io.StringIO(text), on_warning=warnings.append))
+        finally:
+            bibtex_parser.CHUNK_SIZE = original_chunk_size
+        return entries, warnings
+
+    def test_nested_braces_and_quotes(self):
+        entries, warnings = self.parse(
+            '@Article{smith2020,\n'
+            '  title = {The {RNA} World: {A {nested}} view},\n'
+            '  author = "Smith, J. and {\\"O}zt{\\"u}rk, A.",\n'
+            '  year = 2020,\n'
+            '}\n'
+        )
+        self.assertEqual(warnings, [])
+        self.assertEqual(len(entries), 1)
+        entry = entries[0]
+        self.assertEqual(entry['type'], 'article')
+        self.assertEqual(entry['key'], 'smith2020')
+        self.assertEqual(entry['fields'], {
+            'title': 'The {RNA} World: {A {nested}} view',
+            'author': 'Smith, J. and {\\"O}zt{\\"u}rk, A.',
+            'year': '2020',
+        })
+
+    def test_single_line_entries(self):
+        text = '\n'.join(f'@misc{{k{i}, title = {{T {i}}}}}' for i in range(3))
+        entries, _ = self.parse(text)
+        self.assertEqual([e['key'] for e in entries], ['k0', 'k1', 'k2'])
+        self.assertEqual(entries[2]['fields'], {'title': 'T 2'})
+
+    def test_macros_and_concatenation(self):
+        entries, _ = self.parse(
+            '@string{ jn = "Journal of {Tests}" }\n'
+            '@article{a, journal = jn # " Letters", month = jan}\n'
+        )
+        self.assertEqual(entries[0]['fields'], {
+            'journal': 'Journal of {Tests} Letters',
+            'month': 'jan',
+        })
+
+    def test_comments_preamble_and_field_names(self):
+        entries, _ = self.parse(
+            'Free text with user@example.com\n'
+            '@comment{ignored {nested} text}\n'
+            '@preamble{"\\newcommand{\\x}{y}"}\n'
+            '@misc(paren, date-added = {2020-01-01})\n'
+            '@misc{nofields}\n'
+        )
+        self.assertEqual([e['key'] for e in entries], ['paren', 'nofields'])
+        self.assertEqual(entries[0]['fields'], {'date-added': '2020-01-01'})
+        self.assertEqual(entries[1]['fields'], {})
+
+    def test_line_offset_and_raw(self):
+        text = '% header\n\n@book{b1, title = {X}}\n@book{b2,\n  title = {Y}\n}\n'
+        for chunk_size in (None, 5):
+            entries, _ = self.parse(text, chunk_size)
+            self.assertEqual([e['line'] for e in entries], [3, 4])
+            self.assertEqual([e['offset'] for e in entries], [text.index('@book{b1'), text.index('@book{b2')])
+            self.assertEqual(entries[1]['raw'], '@book{b2,\n  title = {Y}\n}')
+
+    def test_unterminated_entry_is_skipped(self):
+        entries, warnings = self.parse(
+            '@book{broken, title = {Unclosed\n'
+            '@article{ok, title = {Fine}}\n'
+        )
+        self.assertEqual([e['key'] for e in entries], ['ok'])
+        self.assertEqual(warnings, ['line 1: unterminated @book entry, skipped'])
+
+    def test_small_chunks_match_whole_file(self):
+        text = ''.join(
+            f'@article{{key{i},\n  title = {{Title {{{i}}} with {{nested {{braces}}}}}},\n  year = {{20{i:02d}}}\n}}\n\n'
+            for i in range(20)
+        )
+        whole, _ = self.parse(text)
+        chunked, _ = self.parse(text, chunk_size=7)
+        self.assertEqual(len(whole), 20)
+        self.assertEqual(whole, chunked)
+
+
+if __name__ == '__main__':
+    unittest.main()
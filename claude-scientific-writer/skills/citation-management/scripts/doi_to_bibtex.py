@@ -11,13 +11,23 @@ import time
 import json
 from typing import Optional, List
 
+from metadata_cache import CacheUnavailable, MetadataCache, cached_request
+from rate_limiter import DEFAULT_WORKERS, RateLimitedSession, map_concurrently, user_agent
+
 class DOIConverter:
     """Convert DOIs to BibTeX entries using CrossRef API."""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, cache: Optional[MetadataCache] = None):
+        """
+        Initialize converter.
+        
+        Args:
+            cache: Optional response cache (see metadata_cache.py)
+        """
+        self.cache = cache
+        self.session = RateLimitedSession()
         self.session.headers.update({
-            'User-Agent': 'DOIConverter/1.0 (Citation Management Tool; mailto:support@example.com)'
+            'User-Agent': user_agent('DOIConverter/1.0', 'Citation Management Tool')
         })
     
     def doi_to_bibtex(self, doi: str) -> Optional[str]:
@@ -47,7 +57,8 @@ class DOIConverter:
         }
         
         try:
-            response = self.session.get(url, headers=headers, timeout=15)
+            response = cached_request(self.session, self.cache, 'doi.org/bibtex', doi, url,
+                                      headers=headers, timeout=15)
             
             if response.status_code == 200:
                 bibtex = response.text.strip()
@@ -69,29 +80,43 @@ class DOIConverter:
             print(f'Error: Request failed for {doi}: {e}', file=sys.stderr)
             return None
     
-    def convert_multiple(self, dois: List[str], delay: float = 0.5) -> List[str]:
+    def convert_multiple(self, dois: List[str], delay: Optional[float] = None,
+                         workers: int = DEFAULT_WORKERS) -> List[str]:
         """
         Convert multiple DOIs to BibTeX.
         
+        Up to `workers` DOIs are converted at once; the session keeps the
+        requests within doi.org's rate limit (see rate_limiter.py).
+        
         Args:
             dois: List of DOIs
-            delay: Delay between requests (seconds) for rate limiting
+            delay: Fixed delay between requests (seconds); if set, DOIs are
+                converted one at a time instead
+            workers: Maximum requests in flight
             
         Returns:
-            List of BibTeX entries (excludes failed conversions)
+            List of BibTeX entries in input order (excludes failed conversions)
         """
-        bibtex_entries = []
+        if delay is not None:
+            workers = 1
         
-        for i, doi in enumerate(dois):
-            print(f'Converting DOI {i+1}/{len(dois)}: {doi}', file=sys.stderr)
+        def convert(indexed_doi):
+            i, doi = indexed_doi
+            misses = self.cache.misses if self.cache else None
             bibtex = self.doi_to_bibtex(doi)
             
+            # Fixed delay (not needed when the answer came from the cache)
+            went_to_network = self.cache is None or self.cache.misses != misses
+            if delay and went_to_network and i < len(dois) - 1:  # Don't delay after last request
+                time.sleep(delay)
+            return bibtex
+        
+        bibtex_entries = []
+        results = map_concurrently(convert, list(enumerate(dois)), workers)
+        for i, (doi, bibtex) in enumerate(zip(dois, results)):
+            print(f'Converted DOI {i+1}/{len(dois)}: {doi}', file=sys.stderr)
             if bibtex:
                 bibtex_entries.append(bibtex)
-            
-            # Rate limiting
-            if i < len(dois) - 1:  # Don't delay after last request
-                time.sleep(delay)
         
         return bibtex_entries
 
@@ -122,8 +147,15 @@ def main():
     parser.add_argument(
         '--delay',
         type=float,
-        default=0.5,
-        help='Delay between requests in seconds (default: 0.5)'
+        help='Fixed delay between requests in seconds; converts one DOI at a time '
+             '(default: concurrent requests within doi.org\'s rate limit)'
+    )
+    
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Maximum requests in flight (default: {DEFAULT_WORKERS})'
     )
     
     parser.add_argument(
@@ -133,8 +165,23 @@ def main():
         help='Output format (default: bibtex)'
     )
     
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Use only cached responses, never the network'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the response cache'
+    )
+    
     args = parser.parse_args()
     
+    if args.offline and args.no_cache:
+        parser.error('--offline needs the cache; drop --no-cache')
+    
     # Collect DOIs from command line and/or file
     dois = []
     
@@ -158,7 +205,14 @@ def main():
         sys.exit(1)
     
     # Convert DOIs
-    converter = DOIConverter()
+    cache = None if args.no_cache else MetadataCache(offline=args.offline)
+    if args.offline:
+        try:
+            cache.open()  # Offline lookups cannot work without the cache
+        except CacheUnavailable as e:
+            print(f'Error: {e}', file=sys.stderr)
+            sys.exit(1)
+    converter = DOIConverter(cache=cache)
     
     if len(dois) == 1:
         bibtex = converter.doi_to_bibtex(dois[0])
@@ -167,7 +221,7 @@ def main():
         else:
             sys.exit(1)
     else:
-        bibtex_entries = converter.convert_multiple(dois, delay=args.delay)
+        bibtex_entries = converter.convert_multiple(dois, delay=args.delay, workers=args.workers)
     
     if not bibtex_entries:
         print('Error: No successful conversions', file=sys.stderr)
@@ -6,30 +6,45 @@ Extract citation metadata from DOI, PMID, arXiv ID, or URL using various APIs.
 
 import sys
 import os
-import requests
 import argparse
-import time
 import re
 import json
 import xml.etree.ElementTree as ET
-from typing import Optional, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Iterator, List, Tuple
 from urllib.parse import urlparse
 
+from metadata_cache import NOT_FOUND_STATUSES, CacheUnavailable, MetadataCache, cached_request
+from rate_limiter import DEFAULT_WORKERS, RateLimitedSession, crossref_mailto, user_agent
+
+# IDs per efetch call (as in search_pubmed.py) and per arXiv id_list query
+PUBMED_BATCH_SIZE = 200
+ARXIV_BATCH_SIZE = 200
+
+ARXIV_NS = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
+
 class MetadataExtractor:
     """Extract metadata from various sources and generate BibTeX."""
     
-    def __init__(self, email: Optional[str] = None):
+    def __init__(self, email: Optional[str] = None, cache: Optional[MetadataCache] = None):
         """
         Initialize extractor.
         
         Args:
-            email: Email for Entrez API (recommended for PubMed)
+            email: Email for Entrez API (recommended for PubMed), also sent to
+                CrossRef as the polite-pool contact address
+            cache: Optional response cache (see metadata_cache.py)
         """
-        self.session = requests.Session()
+        self.cache = cache
+        self.email = email or os.getenv('NCBI_EMAIL', '')
+        self.session = RateLimitedSession()
         self.session.headers.update({
-            'User-Agent': 'MetadataExtractor/1.0 (Citation Management Tool)'
+            'User-Agent': user_agent('MetadataExtractor/1.0', 'Citation Management Tool',
+                                     crossref_mailto(email))
         })
-        self.email = email or os.getenv('NCBI_EMAIL', '')
+        self.crossref_url = 'https://api.crossref.org/works/'
+        self.efetch_url = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi'
+        self.arxiv_url = 'http://export.arxiv.org/api/query'
     
     def identify_type(self, identifier: str) -> Tuple[str, str]:
         """
@@ -105,10 +120,10 @@ class MetadataExtractor:
         Returns:
             Metadata dictionary or None
         """
-        url = f'https://api.crossref.org/works/{doi}'
+        url = f'{self.crossref_url}{doi}'
         
         try:
-            response = self.session.get(url, timeout=15)
+            response = cached_request(self.session, self.cache, 'crossref/works', doi, url, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
@@ -148,23 +163,10 @@ class MetadataExtractor:
         Returns:
             Metadata dictionary or None
         """
-        url = f'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi'
-        params = {
-            'db': 'pubmed',
-            'id': pmid,
-            'retmode': 'xml',
-            'rettype': 'abstract'
-        }
-        
-        if self.email:
-            params['email'] = self.email
-        
-        api_key = os.getenv('NCBI_API_KEY')
-        if api_key:
-            params['api_key'] = api_key
-        
         try:
-            response = self.session.get(url, params=params, timeout=15)
+            response = cached_request(self.session, self.cache, 'pubmed/efetch', pmid, self.efetch_url,
+                                      params=self._efetch_params(pmid), timeout=15,
+                                      not_found=self._no_pubmed_article)
             
             if response.status_code == 200:
                 root = ET.fromstring(response.content)
@@ -174,34 +176,10 @@ class MetadataExtractor:
                     print(f'Error: No article found for PMID: {pmid}', file=sys.stderr)
                     return None
                 
-                # Extract metadata from XML
-                medline_citation = article.find('.//MedlineCitation')
-                article_elem = medline_citation.find('.//Article')
-                journal = article_elem.find('.//Journal')
-                
-                # Get DOI if available
-                doi = None
-                article_ids = article.findall('.//ArticleId')
-                for article_id in article_ids:
-                    if article_id.get('IdType') == 'doi':
-                        doi = article_id.text
-                        break
-                
-                metadata = {
-                    'type': 'pmid',
-                    'entry_type': 'article',
-                    'pmid': pmid,
-                    'title': article_elem.findtext('.//ArticleTitle', ''),
-                    'authors': self._format_authors_pubmed(article_elem.findall('.//Author')),
-                    'year': self._extract_year_pubmed(article_elem),
-                    'journal': journal.findtext('.//Title', ''),
-                    'volume': journal.findtext('.//JournalIssue/Volume', ''),
-                    'issue': journal.findtext('.//JournalIssue/Issue', ''),
-                    'pages': article_elem.findtext('.//Pagination/MedlinePgn', ''),
-                    'doi': doi
-                }
-                
-                return metadata
+                return self._pubmed_article_to_metadata(article, pmid)
+            elif response.status_code in NOT_FOUND_STATUSES:
+                print(f'Error: No article found for PMID: {pmid}', file=sys.stderr)
+                return None
             else:
                 print(f'Error: PubMed API returned status {response.status_code} for PMID: {pmid}', file=sys.stderr)
                 return None
@@ -210,6 +188,55 @@ class MetadataExtractor:
             print(f'Error extracting metadata from PMID {pmid}: {e}', file=sys.stderr)
             return None
     
+    def _efetch_params(self, ids: str) -> Dict:
+        """efetch parameters for a PMID or comma-separated PMIDs."""
+        params = {
+            'db': 'pubmed',
+            'id': ids,
+            'retmode': 'xml',
+            'rettype': 'abstract'
+        }
+        
+        if self.email:
+            params['email'] = self.email
+        
+        api_key = os.getenv('NCBI_API_KEY')
+        if api_key:
+            params['api_key'] = api_key
+        
+        return params
+    
+    def _pubmed_article_to_metadata(self, article: ET.Element, pmid: str) -> Dict:
+        """Build a metadata dictionary from a PubmedArticle element."""
+        # Extract metadata from XML
+        medline_citation = article.find('.//MedlineCitation')
+        article_elem = medline_citation.find('.//Article')
+        journal = article_elem.find('.//Journal')
+        
+        # Get DOI if available
+        doi = None
+        article_ids = article.findall('.//ArticleId')
+        for article_id in article_ids:
+            if article_id.get('IdType') == 'doi':
+                doi = article_id.text
+                break
+        
+        metadata = {
+            'type': 'pmid',
+            'entry_type': 'article',
+            'pmid': pmid,
+            'title': article_elem.findtext('.//ArticleTitle', ''),
+            'authors': self._format_authors_pubmed(article_elem.findall('.//Author')),
+            'year': self._extract_year_pubmed(article_elem),
+            'journal': journal.findtext('.//Title', ''),
+            'volume': journal.findtext('.//JournalIssue/Volume', ''),
+            'issue': journal.findtext('.//JournalIssue/Issue', ''),
+            'pages': article_elem.findtext('.//Pagination/MedlinePgn', ''),
+            'doi': doi
+        }
+        
+        return metadata
+    
     def extract_from_arxiv(self, arxiv_id: str) -> Optional[Dict]:
         """
         Extract metadata from arXiv ID using arXiv API.
@@ -220,58 +247,28 @@ class MetadataExtractor:
         Returns:
             Metadata dictionary or None
         """
-        url = 'http://export.arxiv.org/api/query'
         params = {
             'id_list': arxiv_id,
             'max_results': 1
         }
         
         try:
-            response = self.session.get(url, params=params, timeout=15)
+            response = cached_request(self.session, self.cache, 'arxiv/query', arxiv_id, self.arxiv_url,
+                                      params=params, timeout=15, not_found=self._no_arxiv_entry)
             
             if response.status_code == 200:
                 # Parse Atom XML
                 root = ET.fromstring(response.content)
-                ns = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
                 
-                entry = root.find('atom:entry', ns)
+                entry = root.find('atom:entry', ARXIV_NS)
                 if entry is None:
                     print(f'Error: No entry found for arXiv ID: {arxiv_id}', file=sys.stderr)
                     return None
                 
-                # Extract DOI if published
-                doi_elem = entry.find('arxiv:doi', ns)
-                doi = doi_elem.text if doi_elem is not None else None
-                
-                # Extract journal reference if published
-                journal_ref_elem = entry.find('arxiv:journal_ref', ns)
-                journal_ref = journal_ref_elem.text if journal_ref_elem is not None else None
-                
-                # Get publication date
-                published = entry.findtext('atom:published', '', ns)
-                year = published[:4] if published else ''
-                
-                # Get authors
-                authors = []
-                for author in entry.findall('atom:author', ns):
-                    name = author.findtext('atom:name', '', ns)
-                    if name:
-                        authors.append(name)
-                
-                metadata = {
-                    'type': 'arxiv',
-                    'entry_type': 'misc' if not doi else 'article',
-                    'arxiv_id': arxiv_id,
-                    'title': entry.findtext('atom:title', '', ns).strip().replace('\n', ' '),
-                    'authors': ' and '.join(authors),
-                    'year': year,
-                    'doi': doi,
-                    'journal_ref': journal_ref,
-                    'abstract': entry.findtext('atom:summary', '', ns).strip().replace('\n', ' '),
-                    'url': f'https://arxiv.org/abs/{arxiv_id}'
-                }
-                
-                return metadata
+                return self._arxiv_entry_to_metadata(entry, arxiv_id)
+            elif response.status_code in NOT_FOUND_STATUSES:
+                print(f'Error: No entry found for arXiv ID: {arxiv_id}', file=sys.stderr)
+                return None
             else:
                 print(f'Error: arXiv API returned status {response.status_code} for ID: {arxiv_id}', file=sys.stderr)
                 return None
@@ -280,6 +277,203 @@ class MetadataExtractor:
             print(f'Error extracting metadata from arXiv {arxiv_id}: {e}', file=sys.stderr)
             return None
     
+    def _arxiv_entry_to_metadata(self, entry: ET.Element, arxiv_id: str) -> Dict:
+        """Build a metadata dictionary from an arXiv Atom entry element."""
+        ns = ARXIV_NS
+        
+        # Extract DOI if published
+        doi_elem = entry.find('arxiv:doi', ns)
+        doi = doi_elem.text if doi_elem is not None else None
+        
+        # Extract journal reference if published
+        journal_ref_elem = entry.find('arxiv:journal_ref', ns)
+        journal_ref = journal_ref_elem.text if journal_ref_elem is not None else None
+        
+        # Get publication date
+        published = entry.findtext('atom:published', '', ns)
+        year = published[:4] if published else ''
+        
+        # Get authors
+        authors = []
+        for author in entry.findall('atom:author', ns):
+            name = author.findtext('atom:name', '', ns)
+            if name:
+                authors.append(name)
+        
+        metadata = {
+            'type': 'arxiv',
+            'entry_type': 'misc' if not doi else 'article',
+            'arxiv_id': arxiv_id,
+            'title': entry.findtext('atom:title', '', ns).strip().replace('\n', ' '),
+            'authors': ' and '.join(authors),
+            'year': year,
+            'doi': doi,
+            'journal_ref': journal_ref,
+            'abstract': entry.findtext('atom:summary', '', ns).strip().replace('\n', ' '),
+            'url': f'https://arxiv.org/abs/{arxiv_id}'
+        }
+        
+        return metadata
+    
+    def _cached_batch(self, endpoint: str, ids: List[str], parse) -> Tuple[Dict[str, Dict], List[str], List[str]]:
+        """
+        Split a batch into already-cached results and IDs still to fetch.
+        
+        Returns:
+            ({id: metadata} for cached IDs, [IDs to fetch], [IDs cached as not
+            found]); the second list is empty in offline mode, after reporting
+            the uncached IDs
+        """
+        results = {}
+        missing = []
+        not_found = []
+        for identifier in ids:
+            cached = self.cache.get(endpoint, identifier) if self.cache else None
+            if cached and cached.status_code in NOT_FOUND_STATUSES:
+                not_found.append(identifier)
+                continue
+            metadata = parse(cached.content, identifier) if cached and cached.status_code == 200 else None
+            if metadata:
+                results[identifier] = metadata
+            else:
+                missing.append(identifier)
+        
+        if missing and self.cache and self.cache.offline:
+            for identifier in missing:
+                print(f'Error: {endpoint} response for {identifier} is not cached (offline mode)', file=sys.stderr)
+            missing = []
+        return results, missing, not_found
+    
+    def _no_pubmed_article(self, content: bytes) -> bool:
+        """Whether an efetch response is an empty PubmedArticleSet (unknown PMID)."""
+        try:
+            return ET.fromstring(content).find('.//PubmedArticle') is None
+        except ET.ParseError:
+            return False
+    
+    def _no_arxiv_entry(self, content: bytes) -> bool:
+        """Whether an arXiv query response is a feed without entries (unknown ID)."""
+        try:
+            return ET.fromstring(content).find('atom:entry', ARXIV_NS) is None
+        except ET.ParseError:
+            return False
+    
+    def _parse_cached_pubmed(self, content: bytes, pmid: str) -> Optional[Dict]:
+        article = ET.fromstring(content).find('.//PubmedArticle')
+        return self._pubmed_article_to_metadata(article, pmid) if article is not None else None
+    
+    def _parse_cached_arxiv(self, content: bytes, arxiv_id: str) -> Optional[Dict]:
+        entry = ET.fromstring(content).find('atom:entry', ARXIV_NS)
+        return self._arxiv_entry_to_metadata(entry, arxiv_id) if entry is not None else None
+    
+    def extract_pmid_batch(self, pmids: List[str]) -> Dict[str, Dict]:
+        """
+        Extract metadata for up to PUBMED_BATCH_SIZE PMIDs with one efetch call.
+        
+        Each article is cached on its own, as if fetched by extract_from_pmid,
+        and PMIDs missing from a successful response are cached as not found.
+        
+        Args:
+            pmids: PubMed IDs
+            
+        Returns:
+            Dictionary of PMID -> metadata (PMIDs that were not found are left out)
+        """
+        results, missing, not_found = self._cached_batch('pubmed/efetch', pmids, self._parse_cached_pubmed)
+        for pmid in not_found:
+            print(f'Error: No article found for PMID: {pmid}', file=sys.stderr)
+        
+        if missing:
+            try:
+                response = self.session.get(self.efetch_url, params=self._efetch_params(','.join(missing)),
+                                            timeout=60)
+                if response.status_code == 200:
+                    for article in ET.fromstring(response.content).findall('.//PubmedArticle'):
+                        pmid = article.findtext('.//MedlineCitation/PMID', '').strip()
+                        if self.cache:
+                            body = b'<PubmedArticleSet>' + ET.tostring(article) + b'</PubmedArticleSet>'
+                            self.cache.put('pubmed/efetch', pmid, 200, body)
+                        results[pmid] = self._pubmed_article_to_metadata(article, pmid)
+                    self._cache_not_found('pubmed/efetch', missing, results)
+                else:
+                    print(f'Error: PubMed API returned status {response.status_code} for '
+                          f'{len(missing)} PMIDs', file=sys.stderr)
+            except Exception as e:
+                print(f'Error fetching metadata for PMID batch: {e}', file=sys.stderr)
+        
+            for pmid in missing:
+                if pmid not in results:
+                    print(f'Error: No article found for PMID: {pmid}', file=sys.stderr)
+        return results
+    
+    def extract_arxiv_batch(self, arxiv_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Extract metadata for up to ARXIV_BATCH_SIZE arXiv IDs with one id_list query.
+        
+        Each entry is cached on its own, as if fetched by extract_from_arxiv, and
+        IDs missing from a successful response are cached as not found. If
+        arXiv rejects the query (one malformed ID fails the whole list), the
+        IDs are looked up one at a time instead.
+        
+        Args:
+            arxiv_ids: arXiv identifiers, with or without version suffix
+            
+        Returns:
+            Dictionary of arXiv ID -> metadata (IDs that were not found are left out)
+        """
+        results, missing, not_found = self._cached_batch('arxiv/query', arxiv_ids, self._parse_cached_arxiv)
+        for arxiv_id in not_found:
+            print(f'Error: No entry found for arXiv ID: {arxiv_id}', file=sys.stderr)
+        
+        if missing:
+            params = {
+                'id_list': ','.join(missing),
+                'max_results': len(missing)
+            }
+            try:
+                response = self.session.get(self.arxiv_url, params=params, timeout=60)
+                if response.status_code == 400 and len(missing) > 1:
+                    for arxiv_id in missing:
+                        metadata = self.extract_from_arxiv(arxiv_id)
+                        if metadata:
+                            results[arxiv_id] = metadata
+                    return results
+                
+                if response.status_code == 200:
+                    # Entries are identified by their abs URL, which always has a version
+                    requested = {}
+                    for arxiv_id in missing:
+                        requested.setdefault(arxiv_id, arxiv_id)
+                        requested.setdefault(re.sub(r'v\d+$', '', arxiv_id), arxiv_id)
+                    for entry in ET.fromstring(response.content).findall('atom:entry', ARXIV_NS):
+                        abs_id = entry.findtext('atom:id', '', ARXIV_NS).rsplit('/abs/', 1)[-1]
+                        arxiv_id = requested.get(abs_id) or requested.get(re.sub(r'v\d+$', '', abs_id))
+                        if not arxiv_id:
+                            continue
+                        if self.cache:
+                            body = (b'<feed xmlns="http://www.w3.org/2005/Atom">'
+                                    + ET.tostring(entry) + b'</feed>')
+                            self.cache.put('arxiv/query', arxiv_id, 200, body)
+                        results[arxiv_id] = self._arxiv_entry_to_metadata(entry, arxiv_id)
+                    self._cache_not_found('arxiv/query', missing, results)
+                else:
+                    print(f'Error: arXiv API returned status {response.status_code} for '
+                          f'{len(missing)} IDs', file=sys.stderr)
+            except Exception as e:
+                print(f'Error fetching metadata for arXiv batch: {e}', file=sys.stderr)
+        
+            for arxiv_id in missing:
+                if arxiv_id not in results:
+                    print(f'Error: No entry found for arXiv ID: {arxiv_id}', file=sys.stderr)
+        return results
+    
+    def _cache_not_found(self, endpoint: str, requested: List[str], results: Dict[str, Dict]) -> None:
+        """Cache the IDs a successful batch response left out as not found."""
+        if self.cache:
+            for identifier in requested:
+                if identifier not in results:
+                    self.cache.put(endpoint, identifier, 404, b'')
+    
     def metadata_to_bibtex(self, metadata: Dict, citation_key: Optional[str] = None) -> str:
         """
         Convert metadata dictionary to BibTeX format.
@@ -482,6 +676,65 @@ class MetadataExtractor:
             return self.metadata_to_bibtex(metadata)
         else:
             return None
+    
+    def extract_many(self, identifiers: List[str],
+                     workers: int = DEFAULT_WORKERS) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Extract BibTeX for many identifiers, yielding results in input order.
+        
+        PMIDs are fetched PUBMED_BATCH_SIZE at a time with one efetch call,
+        arXiv IDs ARXIV_BATCH_SIZE at a time with one id_list query, and DOIs
+        with concurrent CrossRef lookups. Each result is yielded as soon as it
+        and all results before it are ready.
+        
+        Args:
+            identifiers: DOIs, PMIDs, arXiv IDs, or URLs
+            workers: Maximum requests in flight
+            
+        Yields:
+            Tuples of (identifier, BibTeX string or None)
+        """
+        typed = [self.identify_type(identifier) for identifier in identifiers]
+        batch_sizes = {'pmid': PUBMED_BATCH_SIZE, 'arxiv': ARXIV_BATCH_SIZE}
+        batch_fetchers = {'pmid': self.extract_pmid_batch, 'arxiv': self.extract_arxiv_batch}
+        
+        # Assign each distinct PMID and arXiv ID to a batch, in input order
+        batches = {'pmid': [], 'arxiv': []}
+        batch_of = {}
+        for id_type, clean_id in typed:
+            if id_type in batches and (id_type, clean_id) not in batch_of:
+                id_batches = batches[id_type]
+                if not id_batches or len(id_batches[-1]) == batch_sizes[id_type]:
+                    id_batches.append([])
+                id_batches[-1].append(clean_id)
+                batch_of[(id_type, clean_id)] = (id_type, len(id_batches) - 1)
+        
+        counts = {id_type: sum(1 for t, _ in typed if t == id_type) for id_type in ('doi', 'pmid', 'arxiv')}
+        print(f'Extracting {counts["doi"]} DOIs, {counts["pmid"]} PMIDs and {counts["arxiv"]} arXiv IDs '
+              f'({len(batches["pmid"])} efetch and {len(batches["arxiv"])} arXiv batch requests)',
+              file=sys.stderr)
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            # Submit in input order so that the first results are ready first
+            futures = {}
+            for id_type, clean_id in typed:
+                if id_type == 'doi' and ('doi', clean_id) not in futures:
+                    futures[('doi', clean_id)] = executor.submit(self.extract_from_doi, clean_id)
+                elif (id_type, clean_id) in batch_of:
+                    batch_key = batch_of[(id_type, clean_id)]
+                    if batch_key not in futures:
+                        batch = batches[id_type][batch_key[1]]
+                        futures[batch_key] = executor.submit(batch_fetchers[id_type], batch)
+            
+            for identifier, (id_type, clean_id) in zip(identifiers, typed):
+                if id_type == 'doi':
+                    metadata = futures[('doi', clean_id)].result()
+                elif id_type in batches:
+                    metadata = futures[batch_of[(id_type, clean_id)]].result().get(clean_id)
+                else:
+                    print(f'Error: Unknown identifier type: {identifier}', file=sys.stderr)
+                    metadata = None
+                yield identifier, self.metadata_to_bibtex(metadata) if metadata else None
 
 
 def main():
@@ -498,10 +751,17 @@ def main():
     parser.add_argument('-i', '--input', help='Input file with identifiers (one per line)')
     parser.add_argument('-o', '--output', help='Output file for BibTeX (default: stdout)')
     parser.add_argument('--format', choices=['bibtex', 'json'], default='bibtex', help='Output format')
-    parser.add_argument('--email', help='Email for NCBI E-utilities (recommended)')
+    parser.add_argument('--email', help='Email for NCBI E-utilities and the CrossRef polite pool (recommended)')
+    parser.add_argument('--offline', action='store_true', help='Use only cached responses, never the network')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the response cache')
+    parser.add_argument('-j', '--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Maximum requests in flight, within each API\'s rate limit (default: {DEFAULT_WORKERS})')
     
     args = parser.parse_args()
     
+    if args.offline and args.no_cache:
+        parser.error('--offline needs the cache; drop --no-cache')
+    
     # Collect identifiers
     identifiers = []
     if args.doi:
@@ -527,18 +787,23 @@ def main():
         sys.exit(1)
     
     # Extract metadata
-    extractor = MetadataExtractor(email=args.email)
+    cache = None if args.no_cache else MetadataCache(offline=args.offline)
+    if args.offline:
+        try:
+            cache.open()  # Offline lookups cannot work without the cache
+        except CacheUnavailable as e:
+            print(f'Error: {e}', file=sys.stderr)
+            sys.exit(1)
+    extractor = MetadataExtractor(email=args.email, cache=cache)
     bibtex_entries = []
     
-    for i, identifier in enumerate(identifiers):
-        print(f'\nProcessing {i+1}/{len(identifiers)}...', file=sys.stderr)
-        bibtex = extractor.extract(identifier)
+    # PMIDs and arXiv IDs are fetched in batches and DOIs concurrently; the
+    # session keeps each API within its rate limit
+    results = extractor.extract_many(identifiers, workers=args.workers)
+    for i, (identifier, bibtex) in enumerate(results):
+        print(f'\nProcessed {i+1}/{len(identifiers)}: {identifier}', file=sys.stderr)
         if bibtex:
             bibtex_entries.append(bibtex)
-        
-        # Rate limiting
-        if i < len(identifiers) - 1:
-            time.sleep(0.5)
     
     if not bibtex_entries:
         print('Error: No successful extractions', file=sys.stderr)
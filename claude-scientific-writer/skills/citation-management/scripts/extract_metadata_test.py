@@ -0,0 +1,195 @@
+import contextlib
+import io
+import json
+import tempfile
+import threading
+import time
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from extract_metadata import MetadataExtractor
+from metadata_cache import MetadataCache
+from rate_limiter import HostLimit, HostRateLimiter, RateLimitedSession
+
+LATENCY = 0.02
+
+
+def pubmed_article(pmid):
+    return (f'<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>'
+            f'<Journal><JournalIssue><Volume>1</Volume><PubDate><Year>2020</Year></PubDate></JournalIssue>'
+            f'<Title>Journal {pmid}</Title></Journal><ArticleTitle>Paper {pmid}</ArticleTitle>'
+            f'<AuthorList><Author><LastName>Pub</LastName><ForeName>A</ForeName></Author></AuthorList>'
+            f'</Article></MedlineCitation></PubmedArticle>')
+
+
+def arxiv_entry(arxiv_id):
+    return (f'<entry><id>http://arxiv.org/abs/{arxiv_id}v2</id><published>2021-01-01T00:00:00Z</published>'
+            f'<title>Preprint {arxiv_id}</title><summary>S</summary>'
+            f'<author><name>Ada Arx</name></author></entry>')
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    """CrossRef /works/<doi>, PubMed /efetch and arXiv /arxiv; IDs containing 999 do not exist."""
+
+    requests_by_endpoint = Counter()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        endpoint = url.path.split('/')[1]
+        with self.lock:
+            self.requests_by_endpoint[endpoint] += 1
+
+        status = 200
+        if endpoint == 'works':
+            doi = url.path[len('/works/'):]
+            if '999' in doi:
+                status, body = 404, 'Resource not found.'
+            else:
+                body = json.dumps({'message': {
+                    'type': 'journal-article', 'title': [f'Work {doi}'],
+                    'author': [{'family': 'Cross', 'given': 'R'}],
+                    'published-print': {'date-parts': [[2019]]}}})
+        elif endpoint == 'efetch':
+            ids = query['id'][0].split(',')
+            body = ('<PubmedArticleSet>' + ''.join(pubmed_article(i) for i in ids if '999' not in i)
+                    + '</PubmedArticleSet>')
+        else:
+            ids = query['id_list'][0].split(',')
+            if any(i == 'bad' for i in ids):
+                status, body = 400, 'incorrect id format'
+            else:
+                body = ('<feed xmlns="http://www.w3.org/2005/Atom">'
+                        + ''.join(arxiv_entry(i.split('v')[0]) for i in ids if '999' not in i) + '</feed>')
+
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeApiServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops some of 16 concurrent connects,
+    # which are then only retried after a second
+    request_queue_size = 64
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestExtractMany(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeApiServer(('127.0.0.1', 0), FakeApiHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FakeApiHandler.requests_by_endpoint.clear()
+
+    def extractor(self, cache=None):
+        extractor = MetadataExtractor(cache=cache)
+        extractor.session = RateLimitedSession(
+            HostRateLimiter({'127.0.0.1': HostLimit(rate=1000, burst=100, concurrency=16)}), pool_size=16)
+        extractor.crossref_url = f'{self.base_url}/works/'
+        extractor.efetch_url = f'{self.base_url}/efetch'
+        extractor.arxiv_url = f'{self.base_url}/arxiv'
+        return extractor
+
+    def test_batches_and_input_order(self):
+        pmids = [str(30000000 + i) for i in range(250)]
+        identifiers = ['10.1000/a', pmids[0], '2101.00001', 'not-an-id', '10.1000/999',
+                       *pmids, '2101.00002v1', '10.1000/a', '30009990']
+        with contextlib.redirect_stderr(io.StringIO()):
+            results = list(self.extractor().extract_many(identifiers))
+
+        self.assertEqual([identifier for identifier, _ in results], identifiers)
+        found = [identifier for identifier, bibtex in results if bibtex]
+        self.assertEqual(len(found), len(identifiers) - 3)
+        self.assertIn('Preprint 2101.00002', results[-3][1])
+        self.assertIn('Paper 30000000', results[1][1])
+        # 250 distinct PMIDs + 1 missing in two efetch calls, both arXiv IDs in one query
+        self.assertEqual(FakeApiHandler.requests_by_endpoint,
+                         Counter({'efetch': 2, 'arxiv': 1, 'works': 2}))
+
+    def test_batch_results_are_cached_per_identifier(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with contextlib.redirect_stderr(io.StringIO()):
+                list(self.extractor(MetadataCache(cache_dir)).extract_many(['31000001', '31000002', '2101.00003']))
+            offline = self.extractor(MetadataCache(cache_dir, offline=True))
+            self.assertEqual(offline.extract_from_pmid('31000002')['title'], 'Paper 31000002')
+            self.assertEqual(offline.extract_from_arxiv('2101.00003')['authors'], 'Ada Arx')
+            with contextlib.redirect_stderr(io.StringIO()):
+                results = dict(offline.extract_many(['31000001', '2101.00003', '31000003']))
+        self.assertIsNotNone(results['31000001'])
+        self.assertIsNone(results['31000003'])
+        self.assertEqual(sum(FakeApiHandler.requests_by_endpoint.values()), 2)
+
+    def test_unknown_ids_are_cached_as_not_found(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = MetadataCache(cache_dir)
+            extractor = self.extractor(cache)
+            with contextlib.redirect_stderr(io.StringIO()):
+                self.assertIsNone(extractor.extract_from_pmid('31999991'))
+                self.assertIsNone(extractor.extract_from_arxiv('2101.99991'))
+                extractor.extract_pmid_batch(['31000004', '31999992'])
+                extractor.extract_arxiv_batch(['2101.00006', '2101.99992'])
+            self.assertEqual(cache.stats(), {'arxiv/query 200': 1, 'arxiv/query 404': 2,
+                                             'pubmed/efetch 200': 1, 'pubmed/efetch 404': 2})
+            requests_made = sum(FakeApiHandler.requests_by_endpoint.values())
+
+            # Both paths see each other's "not found" entries without a request
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                self.assertIsNone(extractor.extract_from_pmid('31999992'))
+                self.assertIsNone(extractor.extract_from_arxiv('2101.99992'))
+                self.assertEqual(extractor.extract_pmid_batch(['31999991']), {})
+                self.assertEqual(extractor.extract_arxiv_batch(['2101.99991']), {})
+            self.assertEqual(sum(FakeApiHandler.requests_by_endpoint.values()), requests_made)
+            self.assertEqual(stderr.getvalue().count('found for'), 4)
+
+            # ...and only for the negative TTL
+            expired = self.extractor(MetadataCache(cache_dir, negative_ttl=0))
+            with contextlib.redirect_stderr(io.StringIO()):
+                expired.extract_pmid_batch(['31999991', '31000004'])
+            self.assertEqual(sum(FakeApiHandler.requests_by_endpoint.values()), requests_made + 1)
+
+    def test_rejected_arxiv_batch_falls_back_to_single_queries(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            results = dict(self.extractor().extract_many(['2101.00004', 'arXiv:bad', '2101.00005']))
+        self.assertIsNotNone(results['2101.00004'])
+        self.assertIsNotNone(results['2101.00005'])
+        self.assertIsNone(results['arXiv:bad'])
+
+    def test_benchmark_against_one_at_a_time(self):
+        identifiers = ([str(32000000 + i) for i in range(60)] + [f'2102.{i:05d}' for i in range(20)]
+                       + [f'10.1000/bench{i}' for i in range(20)])
+        extractor = self.extractor()
+        with contextlib.redirect_stderr(io.StringIO()):
+            start = time.monotonic()
+            one_at_a_time = [extractor.extract(identifier) for identifier in identifiers]
+            serial_time = time.monotonic() - start
+
+            start = time.monotonic()
+            batched = [bibtex for _, bibtex in extractor.extract_many(identifiers)]
+            batched_time = time.monotonic() - start
+
+        self.assertEqual(batched, one_at_a_time)
+        print(f'\n{len(identifiers)} identifiers: one at a time {serial_time:.2f}s, '
+              f'extract_many {batched_time:.2f}s')
+        self.assertLess(batched_time * 5, serial_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
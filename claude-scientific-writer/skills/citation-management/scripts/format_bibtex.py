@@ -7,9 +7,13 @@ Format, clean, sort, and deduplicate BibTeX files.
 import sys
 import re
 import argparse
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from collections import OrderedDict
 
+from bibtex_parser import parse_bibtex_file
+from near_duplicates import (DEFAULT_THRESHOLD, exact_groups, find_duplicate_groups, preferred_member,
+                             record_from_bibtex)
+
 class BibTeXFormatter:
     """Format and clean BibTeX entries."""
     
@@ -32,48 +36,9 @@ class BibTeXFormatter:
             filepath: Path to BibTeX file
             
         Returns:
-            List of entry dictionaries
+            List of entry dictionaries (see bibtex_parser.iter_bibtex_entries)
         """
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            print(f'Error reading file: {e}', file=sys.stderr)
-            return []
-        
-        entries = []
-        
-        # Match BibTeX entries
-        pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\}'
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        for match in matches:
-            entry_type = match.group(1).lower()
-            citation_key = match.group(2).strip()
-            fields_text = match.group(3)
-            
-            # Parse fields
-            fields = OrderedDict()
-            field_pattern = r'(\w+)\s*=\s*\{([^}]*)\}|(\w+)\s*=\s*"([^"]*)"'
-            field_matches = re.finditer(field_pattern, fields_text)
-            
-            for field_match in field_matches:
-                if field_match.group(1):
-                    field_name = field_match.group(1).lower()
-                    field_value = field_match.group(2)
-                else:
-                    field_name = field_match.group(3).lower()
-                    field_value = field_match.group(4)
-                
-                fields[field_name] = field_value.strip()
-            
-            entries.append({
-                'type': entry_type,
-                'key': citation_key,
-                'fields': fields
-            })
-        
-        return entries
+        return parse_bibtex_file(filepath)
     
     def format_entry(self, entry: Dict) -> str:
         """
@@ -163,30 +128,49 @@ class BibTeXFormatter:
         fixed['fields'] = fields
         return fixed
     
-    def deduplicate_entries(self, entries: List[Dict]) -> List[Dict]:
+    def deduplicate_entries(self, entries: List[Dict], similarity: Optional[float] = None) -> List[Dict]:
         """
-        Remove duplicate entries based on DOI or citation key.
+        Remove duplicate entries based on DOI, identical title, first author
+        and year, or citation key.
+        
+        Near-identical titles (typos, a preprint and its published version;
+        see near_duplicates.py) are only listed as possible duplicates, unless
+        similarity is given. Of each group of duplicates the published, most
+        complete entry is kept.
         
         Args:
             entries: List of entry dictionaries
+            similarity: Also remove entries at least this similar (0-1)
             
         Returns:
             List of unique entries
         """
-        seen_dois = set()
+        records = [record_from_bibtex(entry) for entry in entries]
+        field_counts = [len(entry['fields']) for entry in entries]
+        duplicate_indexes = set()
+        for group in find_duplicate_groups(records, similarity or DEFAULT_THRESHOLD):
+            if similarity is None:
+                merged = exact_groups(group)
+                if len(merged) != 1 or merged[0].members != group.members:
+                    keys = ', '.join(entries[index]['key'] for index in group.members)
+                    print(f'Possible duplicates (similarity {group.score:.2f}), kept: {keys}', file=sys.stderr)
+            else:
+                merged = [group]
+            for part in merged:
+                keep = preferred_member(part, records, field_counts)
+                for index in part.members:
+                    if index != keep:
+                        duplicate_indexes.add(index)
+                        print(f'Duplicate of {entries[keep]["key"]} (similarity {part.score:.2f}): '
+                              f'skipping {entries[index]["key"]}', file=sys.stderr)
+        
         seen_keys = set()
         unique_entries = []
         
-        for entry in entries:
-            doi = entry['fields'].get('doi', '').strip()
+        for index, entry in enumerate(entries):
             key = entry['key']
-            
-            # Check DOI first (more reliable)
-            if doi:
-                if doi in seen_dois:
-                    print(f'Duplicate DOI found: {doi} (skipping {key})', file=sys.stderr)
-                    continue
-                seen_dois.add(doi)
+            if index in duplicate_indexes:
+                continue
             
             # Check citation key
             if key in seen_keys:
@@ -232,7 +216,8 @@ class BibTeXFormatter:
     
     def format_file(self, filepath: str, output: str = None,
                    deduplicate: bool = False, sort_by: str = None,
-                   descending: bool = False, fix_issues: bool = True) -> None:
+                   descending: bool = False, fix_issues: bool = True,
+                   similarity: Optional[float] = None) -> None:
         """
         Format entire BibTeX file.
         
@@ -243,6 +228,7 @@ class BibTeXFormatter:
             sort_by: Field to sort by
             descending: Sort in descending order
             fix_issues: Fix common formatting issues
+            similarity: Also merge near-duplicates this similar when deduplicating
         """
         print(f'Parsing {filepath}...', file=sys.stderr)
         entries = self.parse_bibtex_file(filepath)
@@ -262,7 +248,7 @@ class BibTeXFormatter:
         if deduplicate:
             print('Removing duplicates...', file=sys.stderr)
             original_count = len(entries)
-            entries = self.deduplicate_entries(entries)
+            entries = self.deduplicate_entries(entries, similarity)
             removed = original_count - len(entries)
             if removed > 0:
                 print(f'Removed {removed} duplicate(s)', file=sys.stderr)
@@ -312,6 +298,13 @@ def main():
         help='Remove duplicate entries'
     )
     
+    parser.add_argument(
+        '--similarity',
+        type=float,
+        help=f'With --deduplicate, also remove near-duplicates at least this similar (0-1, '
+             f'e.g. {DEFAULT_THRESHOLD}); by default they are only listed'
+    )
+    
     parser.add_argument(
         '--sort',
         choices=['key', 'year', 'author', 'title'],
@@ -340,7 +333,8 @@ def main():
         deduplicate=args.deduplicate,
         sort_by=args.sort,
         descending=args.descending,
-        fix_issues=not args.no_fix
+        fix_issues=not args.no_fix,
+        similarity=args.similarity
     )
 
 
@@ -0,0 +1,168 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+from metadata_cache import CacheUnavailable, MetadataCache, OfflineCacheMiss, cached_request
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers /works/<doi> with JSON, 404 for DOIs containing 'missing', 503 for 'flaky'."""
+
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append(self.path)
+        if 'missing' in self.path:
+            self.send_response(404)
+            body = b'Resource not found.'
+        elif 'flaky' in self.path:
+            self.send_response(503)
+            body = b'Try again later'
+        else:
+            self.send_response(200)
+            body = ('{"message": {"title": ["Tést %s"]}}' % self.path).encode('utf-8')
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestMetadataCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubHandler.requests_seen.clear()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.session.close()
+        self.cache_dir.cleanup()
+
+    def fetch(self, cache, doi):
+        return cached_request(self.session, cache, 'crossref/works', doi,
+                              f'{self.base_url}/works/{doi}', timeout=5)
+
+    def test_hit_after_miss_and_normalized_keys(self):
+        cache = MetadataCache(self.cache_dir.name)
+        first = self.fetch(cache, '10.1000/ABC')
+        second = self.fetch(cache, 'https://doi.org/10.1000/abc')
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(len(StubHandler.requests_seen), 1)
+
+    def test_persists_between_instances(self):
+        self.fetch(MetadataCache(self.cache_dir.name), '10.1000/a')
+        reopened = MetadataCache(self.cache_dir.name, offline=True)
+        self.assertEqual(self.fetch(reopened, '10.1000/a').json()['message']['title'],
+                         ['Tést /works/10.1000/a'])
+        self.assertEqual(len(StubHandler.requests_seen), 1)
+
+    def test_not_found_is_cached_with_its_own_ttl(self):
+        cache = MetadataCache(self.cache_dir.name, negative_ttl=0.2)
+        self.assertEqual(self.fetch(cache, '10.1000/missing').status_code, 404)
+        self.assertEqual(self.fetch(cache, '10.1000/missing').status_code, 404)
+        self.assertEqual(len(StubHandler.requests_seen), 1)
+        time.sleep(0.3)
+        self.fetch(cache, '10.1000/missing')
+        self.assertEqual(len(StubHandler.requests_seen), 2)
+
+    def test_expired_entries_are_refetched(self):
+        cache = MetadataCache(self.cache_dir.name, ttl=0.2)
+        self.fetch(cache, '10.1000/a')
+        time.sleep(0.3)
+        self.assertFalse(self.fetch(cache, '10.1000/a').from_cache)
+        self.assertEqual(len(StubHandler.requests_seen), 2)
+
+    def test_server_errors_are_not_cached(self):
+        cache = MetadataCache(self.cache_dir.name)
+        self.assertEqual(self.fetch(cache, '10.1000/flaky').status_code, 503)
+        self.fetch(cache, '10.1000/flaky')
+        self.assertEqual(len(StubHandler.requests_seen), 2)
+
+    def test_offline_serves_stale_entries_and_never_touches_network(self):
+        MetadataCache(self.cache_dir.name).put('crossref/works', '10.1000/old', 200, b'{}')
+        offline = MetadataCache(self.cache_dir.name, ttl=0, offline=True)
+        self.assertEqual(self.fetch(offline, '10.1000/old').json(), {})
+        with self.assertRaises(OfflineCacheMiss):
+            self.fetch(offline, '10.1000/new')
+        self.assertEqual(StubHandler.requests_seen, [])
+
+    def test_endpoints_are_cached_separately(self):
+        cache = MetadataCache(self.cache_dir.name)
+        self.fetch(cache, '10.1000/a')
+        cached_request(self.session, cache, 'doi.org/bibtex', '10.1000/a',
+                       f'{self.base_url}/bibtex/10.1000/a', timeout=5)
+        self.assertEqual(len(StubHandler.requests_seen), 2)
+        self.assertEqual(cache.stats(), {'crossref/works 200': 1, 'doi.org/bibtex 200': 1})
+
+    def test_no_cache(self):
+        self.assertEqual(self.fetch(None, '10.1000/a').status_code, 200)
+        self.fetch(None, '10.1000/a')
+        self.assertEqual(len(StubHandler.requests_seen), 2)
+
+    def test_cache_is_created_on_first_lookup(self):
+        cache_dir = os.path.join(self.cache_dir.name, 'nested')
+        cache = MetadataCache(cache_dir)
+        self.assertFalse(os.path.exists(cache_dir))
+        self.fetch(cache, '10.1000/a')
+        self.assertTrue(os.path.exists(cache.path))
+
+    def test_unusable_cache_dir_falls_back_to_network(self):
+        blocker = os.path.join(self.cache_dir.name, 'file')
+        open(blocker, 'w').close()
+        cache = MetadataCache(os.path.join(blocker, 'cache'))
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(self.fetch(cache, '10.1000/a').status_code, 200)
+            self.assertEqual(self.fetch(cache, '10.1000/a').status_code, 200)
+        self.assertEqual(stderr.getvalue().count('Warning'), 1)
+        self.assertEqual(len(StubHandler.requests_seen), 2)
+
+        offline = MetadataCache(os.path.join(blocker, 'cache'), offline=True)
+        with self.assertRaises(CacheUnavailable):
+            offline.open()
+        with self.assertRaises(CacheUnavailable):
+            self.fetch(offline, '10.1000/a')
+
+    def test_scripts_start_without_a_usable_cache(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.bib', delete=False) as bib:
+            bib.write('@article{a, title = {T}, author = {A}, journal = {J}, year = {2020}}\n')
+        self.addCleanup(os.unlink, bib.name)
+        env = dict(os.environ, CITATION_CACHE_DIR='/proc/nocache')
+        result = subprocess.run([sys.executable, 'validate_citations.py', bib.name],
+                                capture_output=True, text=True, env=env)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        result = subprocess.run([sys.executable, 'validate_citations.py', bib.name, '--check-dois', '--offline'],
+                                capture_output=True, text=True, env=env)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn('Cannot open the response cache', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
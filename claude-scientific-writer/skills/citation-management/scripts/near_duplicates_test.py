@@ -0,0 +1,145 @@
+import random
+import time
+import unittest
+
+from near_duplicates import (DEFAULT_THRESHOLD, DuplicateRecord, exact_groups, find_duplicate_groups,
+                             first_author_surname, preferred_member, record_from_bibtex, similarity)
+
+
+def typo(title, rng):
+    """Drop or swap one character inside a random word."""
+    chars = list(title)
+    i = rng.randrange(1, len(chars) - 2)
+    if rng.random() < 0.5:
+        del chars[i]
+    else:
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return ''.join(chars)
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestNearDuplicates(unittest.TestCase):
+
+    def test_preprint_and_published_version(self):
+        records = [
+            DuplicateRecord('Attention Is All You Need', 'Vaswani, Ashish', '2017',
+                            '10.48550/arXiv.1706.03762'),
+            DuplicateRecord('Attention is all you need', 'Ashish Vaswani and Noam Shazeer', '2017',
+                            '10.5555/3295222.3295349'),
+        ]
+        groups = find_duplicate_groups(records)
+        self.assertEqual([group.members for group in groups], [[0, 1]])
+        self.assertEqual(preferred_member(groups[0], records), 1)
+
+    def test_typos_and_braces(self):
+        a = DuplicateRecord('Highly accurate protein structure prediction with AlphaFold', 'Jumper J', '2021')
+        b = DuplicateRecord('Highly acurate protein structure predicton with {AlphaFold}', 'Jumper, John', '2021')
+        self.assertGreater(similarity(a, b), 0.9)
+        self.assertEqual(len(find_duplicate_groups([a, b])), 1)
+
+    def test_same_title_different_papers(self):
+        records = [
+            DuplicateRecord('Deep learning', 'LeCun, Yann', '2015', '10.1038/nature14539'),
+            DuplicateRecord('Deep learning', 'Goodfellow, Ian', '2016'),
+            DuplicateRecord('The RNA world', 'Gilbert', '1986'),
+            DuplicateRecord('The DNA world', 'Smith', '1986'),
+        ]
+        self.assertEqual(find_duplicate_groups(records), [])
+
+    def test_distinct_published_dois_never_match(self):
+        a = DuplicateRecord('Deep learning for protein folding', 'Smith', '2020', '10.1000/a1')
+        b = DuplicateRecord('Deep learning for protein foldng', 'Smith', '2020', '10.1000/a2')
+        self.assertEqual(similarity(a, b), 0.0)
+        self.assertEqual(find_duplicate_groups([a, b]), [])
+
+    def test_parts_and_years_never_match(self):
+        pairs = [
+            ('Deep learning for protein folding: Part I', 'Deep learning for protein folding: Part II'),
+            ('Deep learning for protein folding, part 1', 'Deep learning for protein folding, part 2'),
+            ('Bleaching of coral reefs in 2019', 'Bleaching of coral reefs in 2020'),
+            ('Survey of marine mammals, volume IV', 'Survey of marine mammals, volume V'),
+        ]
+        for first, second in pairs:
+            records = [DuplicateRecord(first, 'Smith', '2020'), DuplicateRecord(second, 'Smith', '2020')]
+            self.assertEqual(similarity(*records), 0.0, first)
+            self.assertEqual(find_duplicate_groups(records, threshold=0.5), [], first)
+        # Roman and arabic numbering of the same part still match
+        self.assertGreater(similarity(DuplicateRecord('Protein folding, Part II', 'Smith'),
+                                      DuplicateRecord('Protein folding, part 2', 'Smith')), DEFAULT_THRESHOLD)
+
+    def test_exact_groups(self):
+        title = 'Bleaching of coral reefs'
+        records = [DuplicateRecord(title, 'Smith', '2020'),
+                   DuplicateRecord(title.replace('reefs', 'reeefs'), 'Smith', '2020'),
+                   DuplicateRecord(title.upper(), 'Smith, J.', '2020'),
+                   DuplicateRecord(title, 'Smith', '2021', '10.1000/x'),
+                   DuplicateRecord('Other', 'Doe', '1999', '10.1000/X')]
+        groups = find_duplicate_groups(records)
+        self.assertEqual([group.members for group in groups], [[0, 1, 2, 3, 4]])
+        self.assertEqual([part.members for part in exact_groups(groups[0])], [[0, 2], [3, 4]])
+
+    def test_shared_doi_groups_regardless_of_title(self):
+        records = [
+            DuplicateRecord('A title', 'Smith', '2020', 'https://doi.org/10.1000/ABC'),
+            DuplicateRecord('Completely different text', 'Doe', '2019', '10.1000/abc'),
+        ]
+        [group] = find_duplicate_groups(records)
+        self.assertEqual(group.members, [0, 1])
+        self.assertEqual(group.matches[0].reason, 'doi')
+
+    def test_groups_are_transitive(self):
+        title = 'Graph neural networks for molecular property prediction'
+        records = [DuplicateRecord(title, 'Li', '2020'),
+                   DuplicateRecord(title.lower() + '.', 'Li, X.', '2020'),
+                   DuplicateRecord(title.replace('molecular', 'moleculr'), 'Li X', '2021')]
+        [group] = find_duplicate_groups(records)
+        self.assertEqual(group.members, [0, 1, 2])
+        self.assertLessEqual(group.score, 1.0)
+        self.assertEqual(find_duplicate_groups(records, threshold=1.0)[0].members, [0, 1])
+
+    def test_record_from_bibtex(self):
+        record = record_from_bibtex({'type': 'article', 'key': 'k', 'fields': {
+            'title': '{The} {RNA} World', 'author': 'van der Berg, Jan and Doe, A.',
+            'year': '1986', 'doi': 'doi:10.1038/319618A0'}})
+        self.assertEqual(record, DuplicateRecord('{The} {RNA} World', 'vanderberg', '1986', 'doi:10.1038/319618A0'))
+
+    def test_first_author_surname(self):
+        cases = {
+            'Smith J, Doe A': 'smith',
+            'Li JA, Wu X': 'li',
+            'Smith, John and Doe, A.': 'smith',
+            'John Smith and Ann Doe': 'smith',
+            'Li, X.; Wang, Y.': 'li',
+            '{\\"O}zt{\\"u}rk, A.': 'ozturk',
+            '': '',
+        }
+        for authors, surname in cases.items():
+            self.assertEqual(first_author_surname(authors), surname, authors)
+        self.assertEqual(first_author_surname(['Jane Q. Public', 'X']), 'public')
+
+    def test_scales_sub_quadratically(self):
+        rng = random.Random(0)
+        vocabulary = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 10)))
+                      for _ in range(3000)]
+        records = [DuplicateRecord(' '.join(rng.choice(vocabulary) for _ in range(rng.randint(5, 12))),
+                                   rng.choice(vocabulary), str(rng.randint(1990, 2024)))
+                   for _ in range(5000)]
+        planted = {}
+        for i in range(0, 500, 5):
+            planted[len(records)] = i
+            records.append(records[i]._replace(title=typo(records[i].title, rng)))
+
+        start = time.monotonic()
+        groups = find_duplicate_groups(records)
+        elapsed = time.monotonic() - start
+
+        found = {tuple(group.members) for group in groups}
+        recall = sum((original, copy) in found for copy, original in planted.items()) / len(planted)
+        print(f'\n{len(records)} records: {len(groups)} groups in {elapsed:.2f}s, recall {recall:.0%}')
+        self.assertGreater(recall, 0.9)
+        self.assertLessEqual(len(groups), len(planted))
+        self.assertLess(elapsed, 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Per-Host Rate Limiter
+Token buckets and a requests.Session that keeps concurrent lookups within
+each API's published limits.
+
+Shared by citation-management/scripts (doi_to_bibtex.py, extract_metadata.py,
+validate_citations.py) and literature-review/scripts/verify_citations.py; keep
+the copies identical. All RateLimitedSessions in a process share one
+HostRateLimiter, so two scripts' lookups running together still stay within
+the limits.
+
+Each host gets a token bucket (requests per second, with a small burst) and a
+cap on requests in flight. The defaults follow each API's documented limits:
+CrossRef's public pool, or its polite pool for requests whose User-Agent
+carries a mailto: address, NCBI E-utilities (3/s, or 10/s with NCBI_API_KEY)
+and arXiv (one request every 3 seconds). A 429 or 503 response pauses its host
+for the Retry-After time and the request is retried; CrossRef's
+X-Rate-Limit-Limit and X-Rate-Limit-Interval headers lower the host's rate if
+they are stricter.
+
+The mailto: address comes from CROSSREF_MAILTO (or NCBI_EMAIL); see
+crossref_mailto() and user_agent().
+
+Usage:
+    from rate_limiter import RateLimitedSession, map_concurrently, user_agent
+
+    session = RateLimitedSession()
+    session.headers['User-Agent'] = user_agent('MyTool/1.0', 'Citation lookups')
+    responses = map_concurrently(
+        lambda doi: session.get(f'https://api.crossref.org/works/{doi}', timeout=15),
+        dois, workers=8)
+"""
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, TypeVar
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_WORKERS = 8
+
+# Times a request is retried after a 429 or 503
+MAX_RETRIES = 3
+
+# Longest Retry-After that is waited out rather than returned to the caller
+MAX_RETRY_AFTER = 60.0
+
+RETRY_STATUSES = {429, 503}
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class HostLimit(NamedTuple):
+    """Requests per second, burst size and maximum requests in flight for a host."""
+    rate: float
+    burst: int
+    concurrency: int
+
+
+DEFAULT_LIMIT = HostLimit(rate=5, burst=5, concurrency=4)
+
+
+def default_host_limits() -> Dict[str, HostLimit]:
+    """Limits for the APIs the citation scripts use."""
+    ncbi_rate = 10 if os.getenv('NCBI_API_KEY') else 3
+    return {
+        # CrossRef public pool (requests without a mailto: contact address)
+        'api.crossref.org': HostLimit(rate=5, burst=5, concurrency=1),
+        'doi.org': HostLimit(rate=10, burst=10, concurrency=5),
+        'eutils.ncbi.nlm.nih.gov': HostLimit(rate=ncbi_rate, burst=ncbi_rate, concurrency=ncbi_rate),
+        'export.arxiv.org': HostLimit(rate=1 / 3, burst=1, concurrency=1),
+    }
+
+
+def polite_host_limits() -> Dict[str, HostLimit]:
+    """Limits for requests that identify themselves with a mailto: address."""
+    return {
+        # CrossRef polite pool
+        'api.crossref.org': HostLimit(rate=10, burst=10, concurrency=3),
+    }
+
+
+def crossref_mailto(email: Optional[str] = None) -> Optional[str]:
+    """Contact address for CrossRef's polite pool: email, CROSSREF_MAILTO or NCBI_EMAIL."""
+    return email or os.getenv('CROSSREF_MAILTO') or os.getenv('NCBI_EMAIL') or None
+
+
+def user_agent(product: str, comment: str, mailto: Optional[str] = None) -> str:
+    """
+    Build a User-Agent header, adding mailto: when a contact address is known.
+
+    Args:
+        product: Tool name and version, e.g. 'DOIConverter/1.0'
+        comment: Short description of the tool
+        mailto: Contact address (default: crossref_mailto())
+
+    Returns:
+        e.g. 'DOIConverter/1.0 (Citation Management Tool; mailto:me@example.org)'
+    """
+    mailto = mailto or crossref_mailto()
+    if mailto:
+        comment = f'{comment}; mailto:{mailto}'
+    return f'{product} ({comment})'
+
+
+def is_polite(user_agent_header: Optional[str]) -> bool:
+    """Whether a User-Agent identifies its sender for CrossRef's polite pool."""
+    return 'mailto:' in (user_agent_header or '')
+
+
+class TokenBucket:
+    """Thread-safe token bucket that can also be paused (for Retry-After)."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next `seconds`."""
+        with self._lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0.0
+            self.updated = now
+
+    def limit_rate(self, rate: float) -> None:
+        """Lower the rate (never raises it above the configured one)."""
+        with self._lock:
+            if rate < self.rate:
+                self.rate = rate
+                self.capacity = max(1, min(self.capacity, int(rate)))
+                self.tokens = min(self.tokens, self.capacity)
+
+
+class HostRateLimiter:
+    """Token bucket and in-flight limit for each host, created on first use.
+
+    Hosts listed in polite_limits get a second, separate bucket for requests
+    that identify themselves, since those are served from a different pool.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, HostLimit]] = None,
+                 default: HostLimit = DEFAULT_LIMIT,
+                 polite_limits: Optional[Dict[str, HostLimit]] = None):
+        self.limits = default_host_limits() if limits is None else limits
+        self.polite_limits = polite_host_limits() if polite_limits is None else polite_limits
+        self.default = default
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def host(self, url: str, polite: bool = False):
+        """Return (bucket, in-flight semaphore) for the host of url."""
+        hostname = (urlparse(url).hostname or '').lower()
+        polite = polite and hostname in self.polite_limits
+        with self._lock:
+            if (hostname, polite) not in self._hosts:
+                if polite:
+                    limit = self.polite_limits[hostname]
+                else:
+                    limit = self.limits.get(hostname, self.default)
+                self._hosts[hostname, polite] = (
+                    TokenBucket(limit.rate, limit.burst),
+                    threading.BoundedSemaphore(limit.concurrency),
+                )
+            return self._hosts[hostname, polite]
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def shared_limiter() -> HostRateLimiter:
+    """The process-wide limiter used by RateLimitedSession by default."""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = HostRateLimiter()
+        return _shared_limiter
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if re.fullmatch(r'\d+(\.\d+)?', value):
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def advertised_rate(headers) -> Optional[float]:
+    """Requests per second from CrossRef's X-Rate-Limit-Limit/-Interval headers."""
+    limit = headers.get('X-Rate-Limit-Limit')
+    interval = re.fullmatch(r'(\d+)s', headers.get('X-Rate-Limit-Interval', '').strip())
+    if not (limit and limit.strip().isdigit() and interval and int(interval.group(1)) > 0):
+        return None
+    return int(limit) / int(interval.group(1))
+
+
+class RateLimitedSession(requests.Session):
+    """requests.Session that waits for its host's rate limit before each request."""
+
+    def __init__(self, limiter: Optional[HostRateLimiter] = None,
+                 max_retries: int = MAX_RETRIES, pool_size: int = DEFAULT_WORKERS):
+        """
+        Initialize session.
+
+        Args:
+            limiter: Per-host limits (default: the shared process-wide limiter)
+            max_retries: Retries after a 429 or 503 response
+            pool_size: Connections kept open per host (at least the worker count)
+        """
+        super().__init__()
+        self.limiter = limiter or shared_limiter()
+        self.max_retries = max_retries
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        headers = kwargs.get('headers') or {}
+        agent = headers.get('User-Agent') or self.headers.get('User-Agent')
+        bucket, in_flight = self.limiter.host(url, polite=is_polite(agent))
+        for attempt in range(self.max_retries + 1):
+            with in_flight:
+                bucket.acquire()
+                response = super().request(method, url, *args, **kwargs)
+
+            rate = advertised_rate(response.headers)
+            if rate:
+                bucket.limit_rate(rate)
+
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            wait = retry_after_seconds(response.headers.get('Retry-After'))
+            if wait is None:
+                if response.status_code != 429:
+                    return response  # a plain 503 is an outage, not throttling
+                wait = 2.0 ** attempt
+            if wait > MAX_RETRY_AFTER:
+                return response
+            bucket.pause(wait)
+            response.close()
+        return response
+
+
+def map_concurrently(fn: Callable[[T], R], items: Iterable[T],
+                     workers: int = DEFAULT_WORKERS) -> Iterator[R]:
+    """
+    Apply fn to items on a thread pool, yielding results in input order.
+
+    Args:
+        fn: Function to call for each item (usually one network lookup)
+        items: Inputs
+        workers: Maximum calls in flight; 1 runs them one at a time in this thread
+
+    Yields:
+        fn(item) for each item, in the order of items
+    """
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(fn, items)
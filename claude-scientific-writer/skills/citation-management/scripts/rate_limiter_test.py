@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from rate_limiter import (HostLimit, HostRateLimiter, RateLimitedSession, TokenBucket,
+                          map_concurrently, retry_after_seconds, user_agent)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/slow sleeps 0.1s, /throttled answers 429 with Retry-After once per path, /limited advertises 2 req/s."""
+
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    throttled = set()
+    request_times = []
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            cls.request_times.append(time.monotonic())
+        try:
+            headers = {}
+            status = 200
+            if self.path.startswith('/slow'):
+                time.sleep(0.1)
+            elif self.path.startswith('/throttled'):
+                with cls.lock:
+                    first = self.path not in cls.throttled
+                    cls.throttled.add(self.path)
+                if first:
+                    status, headers = 429, {'Retry-After': '1'}
+            elif self.path.startswith('/limited'):
+                headers = {'X-Rate-Limit-Limit': '2', 'X-Rate-Limit-Interval': '1s'}
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(self.path)))
+            self.end_headers()
+            self.wfile.write(self.path.encode())
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestRateLimiter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubHandler.max_in_flight = 0
+        StubHandler.throttled.clear()
+        StubHandler.request_times.clear()
+
+    def session(self, limit):
+        return RateLimitedSession(HostRateLimiter({'127.0.0.1': limit}))
+
+    def test_token_bucket_rate(self):
+        bucket = TokenBucket(rate=20, burst=5)
+        start = time.monotonic()
+        for _ in range(15):
+            bucket.acquire()
+        # 5 from the burst, then 10 at 20/s
+        self.assertAlmostEqual(time.monotonic() - start, 0.5, delta=0.1)
+
+    def test_results_in_input_order_and_concurrency_cap(self):
+        session = self.session(HostLimit(rate=1000, burst=100, concurrency=4))
+        paths = [f'/slow/{i}' for i in range(16)]
+        start = time.monotonic()
+        bodies = list(map_concurrently(lambda p: session.get(self.base_url + p).text, paths, workers=8))
+        elapsed = time.monotonic() - start
+        self.assertEqual(bodies, paths)
+        self.assertEqual(StubHandler.max_in_flight, 4)
+        # 16 requests of 0.1s, 4 at a time
+        self.assertAlmostEqual(elapsed, 0.4, delta=0.2)
+
+    def test_rate_is_shared_across_workers(self):
+        session = self.session(HostLimit(rate=10, burst=1, concurrency=8))
+        list(map_concurrently(lambda i: session.get(f'{self.base_url}/fast/{i}'), range(6), workers=6))
+        gaps = [b - a for a, b in zip(StubHandler.request_times, StubHandler.request_times[1:])]
+        self.assertGreater(min(gaps), 0.07)
+
+    def test_retry_after_pauses_host_and_retries(self):
+        session = self.session(HostLimit(rate=100, burst=10, concurrency=4))
+        start = time.monotonic()
+        responses = list(map_concurrently(
+            lambda i: session.get(f'{self.base_url}/throttled/{i}'), range(3), workers=3))
+        self.assertEqual([r.status_code for r in responses], [200, 200, 200])
+        self.assertGreaterEqual(time.monotonic() - start, 1.0)
+
+    def test_advertised_rate_lowers_limit(self):
+        session = self.session(HostLimit(rate=100, burst=10, concurrency=1))
+        start = time.monotonic()
+        for i in range(6):
+            session.get(f'{self.base_url}/limited/{i}')
+        # After the first response: a burst of 2, then 2/s
+        self.assertAlmostEqual(time.monotonic() - start, 1.5, delta=0.2)
+
+    def test_polite_requests_use_their_own_pool(self):
+        limiter = HostRateLimiter({'127.0.0.1': HostLimit(rate=1000, burst=100, concurrency=1)},
+                                  polite_limits={'127.0.0.1': HostLimit(rate=1000, burst=100, concurrency=4)})
+        session = RateLimitedSession(limiter)
+        paths = [f'/slow/{i}' for i in range(8)]
+
+        list(map_concurrently(lambda p: session.get(self.base_url + p), paths, workers=8))
+        self.assertEqual(StubHandler.max_in_flight, 1)
+
+        StubHandler.max_in_flight = 0
+        session.headers['User-Agent'] = user_agent('Test/1.0', 'Tests', 'me@example.org')
+        list(map_concurrently(lambda p: session.get(self.base_url + p), paths, workers=8))
+        self.assertEqual(StubHandler.max_in_flight, 4)
+
+    def test_crossref_defaults_to_public_pool(self):
+        limiter = HostRateLimiter()
+        public = limiter.host('https://api.crossref.org/works/10.1/x')
+        polite = limiter.host('https://api.crossref.org/works/10.1/x', polite=True)
+        self.assertIsNot(public, polite)
+        self.assertEqual(public[0].rate, 5)
+        self.assertEqual(polite[0].rate, 10)
+        # Hosts without a polite pool share one bucket
+        self.assertIs(limiter.host('https://doi.org/10.1/x', polite=True),
+                      limiter.host('https://doi.org/10.1/x'))
+
+    def test_user_agent_mailto(self):
+        with mock.patch.dict(os.environ, {'CROSSREF_MAILTO': '', 'NCBI_EMAIL': ''}):
+            self.assertEqual(user_agent('Test/1.0', 'Tests'), 'Test/1.0 (Tests)')
+        with mock.patch.dict(os.environ, {'CROSSREF_MAILTO': 'me@example.org'}):
+            self.assertEqual(user_agent('Test/1.0', 'Tests'), 'Test/1.0 (Tests; mailto:me@example.org)')
+
+    def test_retry_after_parsing(self):
+        self.assertEqual(retry_after_seconds('3'), 3.0)
+        self.assertIsNone(retry_after_seconds('soon'))
+        self.assertIsNone(retry_after_seconds(None))
+        self.assertAlmostEqual(retry_after_seconds(
+            time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(time.time() + 10))), 10, delta=1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
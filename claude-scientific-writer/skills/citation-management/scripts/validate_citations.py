@@ -6,19 +6,30 @@ Validate BibTeX files for accuracy, completeness, and format compliance.
 
 import sys
 import re
-import requests
 import argparse
 import json
 from typing import Dict, List, Tuple, Optional
 from collections import defaultdict
 
+from bibtex_parser import parse_bibtex_file
+from metadata_cache import CacheUnavailable, MetadataCache, OfflineCacheMiss, cached_request
+from near_duplicates import find_duplicate_groups, record_from_bibtex
+from rate_limiter import DEFAULT_WORKERS, RateLimitedSession, map_concurrently, user_agent
+
 class CitationValidator:
     """Validate BibTeX entries for errors and inconsistencies."""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, cache: Optional[MetadataCache] = None):
+        """
+        Initialize validator.
+        
+        Args:
+            cache: Optional response cache for DOI checks (see metadata_cache.py)
+        """
+        self.cache = cache
+        self.session = RateLimitedSession()
         self.session.headers.update({
-            'User-Agent': 'CitationValidator/1.0 (Citation Management Tool)'
+            'User-Agent': user_agent('CitationValidator/1.0', 'Citation Management Tool')
         })
         
         # Required fields by entry type
@@ -48,49 +59,9 @@ class CitationValidator:
             filepath: Path to BibTeX file
             
         Returns:
-            List of entry dictionaries
+            List of entry dictionaries (see bibtex_parser.iter_bibtex_entries)
         """
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            print(f'Error reading file: {e}', file=sys.stderr)
-            return []
-        
-        entries = []
-        
-        # Match BibTeX entries
-        pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,(.*?)\n\}'
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        for match in matches:
-            entry_type = match.group(1).lower()
-            citation_key = match.group(2).strip()
-            fields_text = match.group(3)
-            
-            # Parse fields
-            fields = {}
-            field_pattern = r'(\w+)\s*=\s*\{([^}]*)\}|(\w+)\s*=\s*"([^"]*)"'
-            field_matches = re.finditer(field_pattern, fields_text)
-            
-            for field_match in field_matches:
-                if field_match.group(1):
-                    field_name = field_match.group(1).lower()
-                    field_value = field_match.group(2)
-                else:
-                    field_name = field_match.group(3).lower()
-                    field_value = field_match.group(4)
-                
-                fields[field_name] = field_value.strip()
-            
-            entries.append({
-                'type': entry_type,
-                'key': citation_key,
-                'fields': fields,
-                'raw': match.group(0)
-            })
-        
-        return entries
+        return parse_bibtex_file(filepath)
     
     def validate_entry(self, entry: Dict) -> Tuple[List[Dict], List[Dict]]:
         """
@@ -207,15 +178,23 @@ class CitationValidator:
             
         Returns:
             Tuple of (is_valid, metadata)
+            
+        Raises:
+            OfflineCacheMiss: In offline mode, if the DOI has not been checked before
         """
         try:
             url = f'https://doi.org/{doi}'
-            response = self.session.head(url, timeout=10, allow_redirects=True)
+            response = cached_request(self.session, self.cache, 'doi.org/head', doi, url,
+                                      method='HEAD', timeout=10, allow_redirects=True)
             
             if response.status_code < 400:
                 # DOI resolves, now get metadata from CrossRef
                 crossref_url = f'https://api.crossref.org/works/{doi}'
-                metadata_response = self.session.get(crossref_url, timeout=10)
+                try:
+                    metadata_response = cached_request(self.session, self.cache, 'crossref/works', doi,
+                                                       crossref_url, timeout=10)
+                except OfflineCacheMiss:
+                    return True, None
                 
                 if metadata_response.status_code == 200:
                     data = metadata_response.json()
@@ -233,6 +212,8 @@ class CitationValidator:
             else:
                 return False, None
                 
+        except OfflineCacheMiss:
+            raise
         except Exception:
             return False, None
     
@@ -280,33 +261,33 @@ class CitationValidator:
                     'message': f'Citation key "{key}" appears {count} times'
                 })
         
-        # Check for similar titles (possible duplicates)
-        titles = {}
-        for entry in entries:
-            title = entry['fields'].get('title', '').lower()
-            title = re.sub(r'[^\w\s]', '', title)  # Remove punctuation
-            title = ' '.join(title.split())  # Normalize whitespace
-            
-            if title:
-                if title in titles:
-                    duplicates.append({
-                        'type': 'similar_title',
-                        'entries': [titles[title], entry['key']],
-                        'severity': 'medium',
-                        'message': f'Possible duplicate: "{titles[title]}" and "{entry["key"]}" have identical titles'
-                    })
-                else:
-                    titles[title] = entry['key']
+        # Check for near duplicates (typo'd titles, preprint and published versions)
+        records = [record_from_bibtex(entry) for entry in entries]
+        for group in find_duplicate_groups(records):
+            if all(match.reason == 'doi' for match in group.matches):
+                continue  # already reported as duplicate_doi
+            keys = [entries[i]['key'] for i in group.members]
+            duplicates.append({
+                'type': 'similar_title',
+                'entries': keys,
+                'lines': [entries[i]['line'] for i in group.members],
+                'score': round(group.score, 3),
+                'severity': 'medium',
+                'message': f'Possible duplicates (similarity {group.score:.2f}): '
+                           + ', '.join(f'"{key}"' for key in keys)
+            })
         
         return duplicates
     
-    def validate_file(self, filepath: str, check_dois: bool = False) -> Dict:
+    def validate_file(self, filepath: str, check_dois: bool = False,
+                      workers: int = DEFAULT_WORKERS) -> Dict:
         """
         Validate entire BibTeX file.
         
         Args:
             filepath: Path to BibTeX file
             check_dois: Whether to verify DOIs (slow)
+            workers: Maximum DOI checks in flight
             
         Returns:
             Validation report dictionary
@@ -334,10 +315,12 @@ class CitationValidator:
             
             for error in errors:
                 error['entry'] = entry['key']
+                error['line'] = entry['line']
                 all_errors.append(error)
             
             for warning in warnings:
                 warning['entry'] = entry['key']
+                warning['line'] = entry['line']
                 all_warnings.append(warning)
         
         # Check for duplicates
@@ -348,20 +331,40 @@ class CitationValidator:
         doi_errors = []
         if check_dois:
             print('Verifying DOIs...', file=sys.stderr)
-            for i, entry in enumerate(entries):
-                doi = entry['fields'].get('doi', '')
-                if doi:
-                    print(f'Verifying DOI {i+1}: {doi}', file=sys.stderr)
-                    is_valid, metadata = self.verify_doi(doi)
-                    
-                    if not is_valid:
-                        doi_errors.append({
-                            'type': 'invalid_doi',
-                            'entry': entry['key'],
-                            'doi': doi,
-                            'severity': 'high',
-                            'message': f'Entry {entry["key"]}: DOI does not resolve: {doi}'
-                        })
+            doi_entries = [entry for entry in entries if entry['fields'].get('doi', '')]
+            
+            def verify(entry):
+                try:
+                    return self.verify_doi(entry['fields']['doi'])
+                except OfflineCacheMiss:
+                    return None
+            
+            # Checks run concurrently; the session keeps each host within its rate limit
+            results = map_concurrently(verify, doi_entries, workers)
+            for i, (entry, result) in enumerate(zip(doi_entries, results)):
+                doi = entry['fields']['doi']
+                print(f'Verified DOI {i+1}/{len(doi_entries)}: {doi}', file=sys.stderr)
+                if result is None:
+                    all_warnings.append({
+                        'type': 'unverified_doi',
+                        'entry': entry['key'],
+                        'line': entry['line'],
+                        'doi': doi,
+                        'severity': 'low',
+                        'message': f'Entry {entry["key"]}: DOI not verified (not cached, offline): {doi}'
+                    })
+                    continue
+                
+                is_valid, metadata = result
+                if not is_valid:
+                    doi_errors.append({
+                        'type': 'invalid_doi',
+                        'entry': entry['key'],
+                        'line': entry['line'],
+                        'doi': doi,
+                        'severity': 'high',
+                        'message': f'Entry {entry["key"]}: DOI does not resolve: {doi}'
+                    })
         
         all_errors.extend(doi_errors)
         
@@ -437,11 +440,40 @@ def main():
         help='Show detailed output'
     )
     
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Maximum DOI checks in flight, within each host\'s rate limit (default: {DEFAULT_WORKERS})'
+    )
+    
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Verify DOIs using only cached responses, never the network'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the response cache'
+    )
+    
     args = parser.parse_args()
     
+    if args.offline and args.no_cache:
+        parser.error('--offline needs the cache; drop --no-cache')
+    
     # Validate file
-    validator = CitationValidator()
-    report = validator.validate_file(args.file, check_dois=args.check_dois)
+    cache = None if args.no_cache else MetadataCache(offline=args.offline)
+    if args.offline and args.check_dois:
+        try:
+            cache.open()  # Offline lookups cannot work without the cache
+        except CacheUnavailable as e:
+            print(f'Error: {e}', file=sys.stderr)
+            sys.exit(1)
+    validator = CitationValidator(cache=cache)
+    report = validator.validate_file(args.file, check_dois=args.check_dois, workers=args.workers)
     
     # Print summary
     print('\n' + '='*60)
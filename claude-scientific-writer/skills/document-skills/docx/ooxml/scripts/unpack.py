@@ -1,29 +1,279 @@
 #!/usr/bin/env python3
-"""Unpack and format XML contents of Office files (.docx, .pptx, .xlsx)"""
+"""
+Unpack and format XML contents of Office files (.docx, .pptx, .xlsx).
 
+Example usage:
+    python unpack.py <office_file> <output_dir>
+
+    # Only extract the parts you need
+    python unpack.py <office_file> <output_dir> --only "word/*.xml"
+
+XML and .rels parts are pretty-printed exactly as minidom's toprettyxml would,
+but by a streaming serializer, so large parts are never held in memory as a DOM.
+"""
+
+import argparse
+import fnmatch
+import os
 import random
-import sys
-import defusedxml.minidom
+import shutil
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from xml.parsers import expat
+
+from defusedxml import EntitiesForbidden, ExternalReferenceForbidden
+
+# Below this much XML, starting worker processes costs more than it saves
+PARALLEL_MIN_BYTES = 1024 * 1024
+
+# Formatted output is written to disk in chunks of about this many characters
+WRITE_CHUNK_SIZE = 256 * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unpack and format an Office file")
+    parser.add_argument("office_file", help="Office file (.docx/.pptx/.xlsx)")
+    parser.add_argument("output_dir", help="Directory to unpack into")
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        metavar="PATTERN",
+        help='Only extract parts matching these glob patterns, e.g. "word/*.xml"',
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes for pretty-printing XML (default: CPU count)",
+    )
+    args = parser.parse_args()
+
+    unpack_document(args.office_file, args.output_dir, only=args.only, jobs=args.jobs)
+
+    # For .docx files, suggest an RSID for tracked changes
+    if args.office_file.endswith(".docx"):
+        suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
+        print(f"Suggested RSID for edit session: {suggested_rsid}")
+
+
+def unpack_document(input_file, output_dir, only=None, jobs=None):
+    """Unpack an Office file, pretty-printing its XML and .rels parts.
+
+    Members are streamed out of the archive one at a time. XML parts are
+    formatted across a pool of worker processes when there is enough XML to
+    make that worthwhile.
+
+    Args:
+        input_file: Path to the Office file (.docx/.pptx/.xlsx)
+        output_dir: Directory to unpack into (created if missing)
+        only: Optional list of glob patterns; only matching part names (e.g.
+            "word/*.xml") are extracted. "*" also matches "/".
+        jobs: Worker processes for pretty-printing (default: CPU count)
+
+    Returns:
+        List of part names that were extracted, in archive order
+
+    Raises:
+        ValueError: If a member name would be extracted outside output_dir
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+
+    extracted = []
+    xml_members = []
+    with zipfile.ZipFile(input_file) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            if only and not any(
+                fnmatch.fnmatchcase(info.filename, pattern) for pattern in only
+            ):
+                continue
+
+            target = _member_target(output_path, info.filename)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            extracted.append(info.filename)
+
+            if info.filename.endswith((".xml", ".rels")):
+                xml_members.append((info.filename, info.file_size, target))
+            else:
+                with zf.open(info) as source, open(target, "wb") as dest:
+                    shutil.copyfileobj(source, dest)
+
+    total_xml_bytes = sum(size for _, size, _ in xml_members)
+    tasks = [(str(input_file), name, str(target)) for name, _, target in xml_members]
+    if jobs > 1 and len(tasks) > 1 and total_xml_bytes >= PARALLEL_MIN_BYTES:
+        # Largest parts first so one big document.xml doesn't finish last
+        sizes = {name: size for name, size, _ in xml_members}
+        tasks.sort(key=lambda task: sizes[task[1]], reverse=True)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+            list(executor.map(_format_member, tasks))
+    else:
+        with zipfile.ZipFile(input_file) as zf:
+            for _, name, target in tasks:
+                with zf.open(name) as source:
+                    pretty_print_xml(source, target)
+
+    return extracted
+
+
+def pretty_print_xml(source, output_file):
+    """Pretty-print XML from a binary stream into a file.
+
+    The output is the same as
+    minidom.parseString(content).toprettyxml(indent="  ", encoding="ascii"),
+    except that tabs and line breaks inside attribute values are kept as
+    character references.
+
+    Args:
+        source: Binary file-like object with the XML content
+        output_file: Path to write the formatted XML to
+    """
+    with open(output_file, "wb") as out:
+        writer = _PrettyXMLWriter(out)
+        parser = expat.ParserCreate()
+        parser.ordered_attributes = True
+        parser.buffer_text = True
+        parser.StartElementHandler = writer.start_element
+        parser.EndElementHandler = writer.end_element
+        parser.CharacterDataHandler = writer.characters
+        parser.CommentHandler = writer.comment
+        parser.ProcessingInstructionHandler = writer.processing_instruction
+        parser.EntityDeclHandler = _forbid_entity
+        parser.UnparsedEntityDeclHandler = _forbid_unparsed_entity
+        parser.ExternalEntityRefHandler = _forbid_external_entity
+        parser.ParseFile(source)
+        writer.close()
+
+
+def _format_member(task):
+    """Worker: pretty-print one archive member into its target file."""
+    input_file, name, target = task
+    with zipfile.ZipFile(input_file) as zf, zf.open(name) as source:
+        pretty_print_xml(source, target)
+
+
+def _member_target(output_path, name):
+    """Return the path a member extracts to, refusing to leave output_path."""
+    target = (output_path / name).resolve()
+    if not target.is_relative_to(output_path.resolve()):
+        raise ValueError(f"Refusing to extract {name} outside {output_path}")
+    return target
+
+
+def _escape(data):
+    """Escape text the way minidom writes it."""
+    return (
+        data.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace('"', "&quot;")
+        .replace(">", "&gt;")
+    )
+
+
+def _escape_attribute(value):
+    """Escape an attribute value, keeping whitespace that parsing would normalize."""
+    return (
+        _escape(value)
+        .replace("\r", "&#13;")
+        .replace("\n", "&#10;")
+        .replace("\t", "&#9;")
+    )
+
+
+class _PrettyXMLWriter:
+    """Expat event handler that writes minidom-style pretty-printed XML.
+
+    minidom prints an element with a single text child on one line and puts
+    every other child on its own indented line. Each open element therefore
+    only needs its pending text and whether it has had any other children.
+    """
+
+    INDENT = "  "
+
+    def __init__(self, out):
+        self._out = out
+        self._parts = ['<?xml version="1.0" encoding="ascii"?>\n']
+        self._size = 0
+        # Open elements as [tag, indent, has_element_children, pending_text]
+        self._stack = []
+
+    def start_element(self, tag, attributes):
+        self._start_child()
+        indent = self._stack[-1][1] + self.INDENT if self._stack else ""
+        parts = [indent, "<", tag]
+        for i in range(0, len(attributes), 2):
+            parts.append(f' {attributes[i]}="{_escape_attribute(attributes[i + 1])}"')
+        self._write("".join(parts))
+        self._stack.append([tag, indent, False, None])
+
+    def end_element(self, tag):
+        _, indent, has_children, text = self._stack.pop()
+        if has_children:
+            self._flush_text(indent + self.INDENT, text)
+            self._write(f"{indent}</{tag}>\n")
+        elif text is not None:
+            self._write(f">{_escape(text)}</{tag}>\n")
+        else:
+            self._write("/>\n")
+
+    def characters(self, data):
+        # Text outside the root element is not kept by minidom
+        if self._stack:
+            frame = self._stack[-1]
+            frame[3] = data if frame[3] is None else frame[3] + data
+
+    def comment(self, data):
+        indent = self._start_child()
+        self._write(f"{indent}<!--{data}-->\n")
+
+    def processing_instruction(self, target, data):
+        indent = self._start_child()
+        self._write(f"{indent}<?{target} {data}?>\n")
+
+    def close(self):
+        self._out.write("".join(self._parts).encode("ascii", "xmlcharrefreplace"))
+        self._parts = []
+
+    def _start_child(self):
+        """Prepare the current element for a non-text child; return its indent."""
+        if not self._stack:
+            return ""
+        frame = self._stack[-1]
+        child_indent = frame[1] + self.INDENT
+        if not frame[2]:
+            self._write(">\n")
+            frame[2] = True
+        self._flush_text(child_indent, frame[3])
+        frame[3] = None
+        return child_indent
+
+    def _flush_text(self, indent, text):
+        if text is not None:
+            self._write(_escape(f"{indent}{text}\n"))
+
+    def _write(self, data):
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size >= WRITE_CHUNK_SIZE:
+            self.close()
+            self._size = 0
+
+
+def _forbid_entity(name, is_parameter_entity, value, base, sysid, pubid, notation_name):
+    raise EntitiesForbidden(name, value, base, sysid, pubid, notation_name)
+
+
+def _forbid_unparsed_entity(name, base, sysid, pubid, notation_name):
+    raise EntitiesForbidden(name, None, base, sysid, pubid, notation_name)
+
+
+def _forbid_external_entity(context, base, sysid, pubid):
+    raise ExternalReferenceForbidden(context, base, sysid, pubid)
+
 
-# Get command line arguments
-assert len(sys.argv) == 3, "Usage: python unpack.py <office_file> <output_dir>"
-input_file, output_dir = sys.argv[1], sys.argv[2]
-
-# Extract and format
-output_path = Path(output_dir)
-output_path.mkdir(parents=True, exist_ok=True)
-zipfile.ZipFile(input_file).extractall(output_path)
-
-# Pretty print all XML files
-xml_files = list(output_path.rglob("*.xml")) + list(output_path.rglob("*.rels"))
-for xml_file in xml_files:
-    content = xml_file.read_text(encoding="utf-8")
-    dom = defusedxml.minidom.parseString(content)
-    xml_file.write_bytes(dom.toprettyxml(indent="  ", encoding="ascii"))
-
-# For .docx files, suggest an RSID for tracked changes
-if input_file.endswith(".docx"):
-    suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
-    print(f"Suggested RSID for edit session: {suggested_rsid}")
+if __name__ == "__main__":
+    main()
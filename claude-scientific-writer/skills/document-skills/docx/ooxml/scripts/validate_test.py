@@ -0,0 +1,199 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from validation import DOCXSchemaValidator
+from validation.base import _schema_fingerprint
+
+
+CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+  <Default Extension="xml" ContentType="application/xml"/>
+  <Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>
+"""
+
+ROOT_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>
+"""
+
+DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:body>
+    <w:p><w:r><w:t>First paragraph</w:t></w:r></w:p>
+    <w:p><w:r><w:t>Second paragraph</w:t></w:r></w:p>
+  </w:body>
+</w:document>
+"""
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestParseOnceValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        temp_path = Path(self.temp_dir.name)
+
+        self.parts = {
+            "[Content_Types].xml": CONTENT_TYPES_XML,
+            "_rels/.rels": ROOT_RELS_XML,
+            "word/document.xml": DOCUMENT_XML,
+        }
+
+        self.original_file = temp_path / "original.docx"
+        with zipfile.ZipFile(self.original_file, "w") as zf:
+            for name, content in self.parts.items():
+                zf.writestr(name, content)
+
+        self.unpacked_dir = temp_path / "unpacked"
+        for name, content in self.parts.items():
+            part_path = self.unpacked_dir / name
+            part_path.parent.mkdir(parents=True, exist_ok=True)
+            part_path.write_text(content, encoding="utf-8")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_validator(self, **kwargs):
+        validator = DOCXSchemaValidator(
+            self.unpacked_dir, self.original_file, **kwargs
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = validator.validate()
+        return validator, result
+
+    def add_schema_errors(self):
+        """Make document.xml fail XSD validation, in the original and unpacked copy.
+
+        The unpacked copy gets one error more than the original, so the
+        baseline errors have to be computed and filtered out.
+        """
+        original = DOCUMENT_XML.replace(
+            "<w:p><w:r><w:t>First", "<w:p><w:bogus/><w:r><w:t>First"
+        )
+        modified = original.replace(
+            "<w:p><w:r><w:t>Second", "<w:p><w:unknown/><w:r><w:t>Second"
+        )
+        with zipfile.ZipFile(self.original_file, "w") as zf:
+            for name, content in self.parts.items():
+                if name == "word/document.xml":
+                    content = original
+                zf.writestr(name, content)
+        (self.unpacked_dir / "word" / "document.xml").write_text(
+            modified, encoding="utf-8"
+        )
+
+    def validate_output(self, **kwargs):
+        validator = DOCXSchemaValidator(
+            self.unpacked_dir, self.original_file, **kwargs
+        )
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            validator.run_part_checks()
+            result = validator.validate()
+        return result, output.getvalue()
+
+    def test_validation_passes(self):
+        """Test that an unmodified document validates cleanly"""
+        _, result = self.run_validator()
+        self.assertTrue(result)
+
+    def test_each_part_parsed_once(self):
+        """Test that every check shares a single parse of each part"""
+        validator, _ = self.run_validator()
+        parse_counts = validator.package.parse_counts
+        self.assertEqual(len(parse_counts), len(validator.xml_files))
+        self.assertTrue(all(count == 1 for count in parse_counts.values()))
+        self.assertEqual(validator.package.parse_count, len(validator.xml_files))
+
+    def test_unique_id_check_does_not_modify_tree(self):
+        """Test that skipping mc:AlternateContent leaves the shared tree intact"""
+        document_xml = self.unpacked_dir / "word" / "document.xml"
+        document_xml.write_text(
+            DOCUMENT_XML.replace(
+                "<w:body>",
+                '<w:body><mc:AlternateContent xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006">'
+                '<mc:Choice Requires="w14"><w:bookmarkStart w:id="1" w:name="a"/></mc:Choice>'
+                '</mc:AlternateContent><w:bookmarkStart w:id="1" w:name="b"/>',
+            ),
+            encoding="utf-8",
+        )
+        validator = DOCXSchemaValidator(self.unpacked_dir, self.original_file)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(validator.validate_unique_ids())
+        root = validator.package.get_root(document_xml)
+        self.assertEqual(
+            len(root.findall(f".//{{{validator.MC_NAMESPACE}}}AlternateContent")), 1
+        )
+
+
+    def test_parallel_run_reports_same_errors(self):
+        """Test that --jobs 2 and --jobs 1 report identical errors"""
+        self.add_schema_errors()
+        serial = self.validate_output(jobs=1)
+        parallel = self.validate_output(jobs=2)
+        self.assertFalse(serial[0])
+        self.assertIn("unknown", serial[1])
+        self.assertNotIn("bogus", serial[1])
+        self.assertEqual(parallel, serial)
+
+    def test_baseline_cache_is_reused(self):
+        """Test that a second run reads the baseline errors from the cache"""
+        self.add_schema_errors()
+        cache_dir = Path(self.temp_dir.name) / "baseline-cache"
+        first = self.validate_output(baseline_cache_dir=cache_dir)
+        cache_files = list(cache_dir.glob("*.json"))
+        self.assertEqual(len(cache_files), 1)
+
+        with mock.patch.object(
+            DOCXSchemaValidator,
+            "_validate_original_part",
+            side_effect=AssertionError("original file was re-validated"),
+        ):
+            self.assertEqual(self.validate_output(baseline_cache_dir=cache_dir), first)
+            self.assertEqual(
+                self.validate_output(baseline_cache_dir=cache_dir, jobs=2), first
+            )
+        self.assertEqual(list(cache_dir.glob("*.json")), cache_files)
+
+    def test_baseline_cache_key(self):
+        """Test that the cache key covers validator class, checks and schemas"""
+        cache_dir = Path(self.temp_dir.name) / "baseline-cache"
+        validator = DOCXSchemaValidator(
+            self.unpacked_dir, self.original_file, baseline_cache_dir=cache_dir
+        )
+        cache_file = validator._baseline_cache_file()
+        self.assertEqual(validator._baseline_cache_file(), cache_file)
+
+        class FewerChecksValidator(DOCXSchemaValidator):
+            PART_CHECKS = ("xsd",)
+
+        subclass = FewerChecksValidator(
+            self.unpacked_dir, self.original_file, baseline_cache_dir=cache_dir
+        )
+        self.assertNotEqual(subclass._baseline_cache_file(), cache_file)
+
+        schemas_dir = Path(self.temp_dir.name) / "schemas"
+        schema = schemas_dir / "ISO-IEC29500-4_2016" / "wml.xsd"
+        schema.parent.mkdir(parents=True)
+        schema.write_text("<xsd:schema/>", encoding="utf-8")
+        validator.schemas_dir = schemas_dir
+        cache_file = validator._baseline_cache_file()
+        fingerprint = _schema_fingerprint(schemas_dir)
+
+        stat = schema.stat()
+        os.utime(schema, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertNotEqual(_schema_fingerprint(schemas_dir), fingerprint)
+        self.assertNotEqual(validator._baseline_cache_file(), cache_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Parsed document model shared by all checks of a validation run.
+"""
+
+from pathlib import Path
+
+import lxml.etree
+
+
+class OOXMLPackage:
+    """Unpacked Office document whose XML parts are parsed at most once."""
+
+    def __init__(self, unpacked_dir):
+        self.unpacked_dir = Path(unpacked_dir).resolve()
+
+        # Number of times each part was actually parsed from disk.
+        # Every value should stay at 1 for the whole validation run.
+        self.parse_counts = {}
+
+        # Cache of parsed trees and of parse failures, keyed by resolved path
+        self._trees = {}
+        self._errors = {}
+
+    @property
+    def parse_count(self):
+        """Total number of parses performed across all parts."""
+        return sum(self.parse_counts.values())
+
+    def get_tree(self, xml_file):
+        """Return the parsed lxml ElementTree for an XML part.
+
+        The returned tree is shared between checks and must not be modified;
+        checks that need to change it should work on a copy.
+
+        Args:
+            xml_file: Path to the XML or .rels file inside the unpacked directory
+
+        Raises:
+            lxml.etree.XMLSyntaxError: If the part is not well-formed. The error
+                from the first parse is re-raised on every later call.
+        """
+        key = Path(xml_file).resolve()
+
+        if key in self._trees:
+            return self._trees[key]
+        if key in self._errors:
+            raise self._errors[key]
+
+        self.parse_counts[key] = self.parse_counts.get(key, 0) + 1
+        try:
+            tree = lxml.etree.parse(str(key))
+        except Exception as e:
+            self._errors[key] = e
+            raise
+
+        self._trees[key] = tree
+        return tree
+
+    def get_root(self, xml_file):
+        """Return the root element of an XML part (see get_tree)."""
+        return self.get_tree(xml_file).getroot()
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
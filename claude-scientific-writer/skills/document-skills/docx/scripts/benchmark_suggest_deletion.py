@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk suggest_deletion over a large synthetic document.xml.
+
+Tracked change IDs come from a counter seeded once per editor, so the cost of
+each suggestion should stay flat as the number of w:del elements grows.
+
+Example usage (from the docx directory):
+    python -m scripts.benchmark_suggest_deletion --paragraphs 5000 --deletions 2000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from .document import DocxXMLEditor
+
+DOCUMENT_TEMPLATE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:body>
+{paragraphs}
+  </w:body>
+</w:document>
+"""
+
+PARAGRAPH_TEMPLATE = (
+    '    <w:p><w:r w:rsidR="00AB12CD"><w:t>Paragraph {index} with some text</w:t></w:r>'
+    '<w:r w:rsidR="00AB12CD"><w:t xml:space="preserve"> and a second run</w:t></w:r></w:p>'
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk suggest_deletion")
+    parser.add_argument(
+        "--paragraphs", type=int, default=5000, help="Paragraphs in the document"
+    )
+    parser.add_argument(
+        "--deletions", type=int, default=2000, help="Runs to mark as deleted"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        xml_path = Path(temp_dir) / "document.xml"
+        paragraphs = "\n".join(
+            PARAGRAPH_TEMPLATE.format(index=i) for i in range(args.paragraphs)
+        )
+        xml_path.write_text(
+            DOCUMENT_TEMPLATE.format(paragraphs=paragraphs), encoding="utf-8"
+        )
+
+        start = time.perf_counter()
+        editor = DocxXMLEditor(xml_path, rsid="00EF34AB")
+        load_time = time.perf_counter() - start
+
+        runs = editor.dom.getElementsByTagName("w:r")[: args.deletions]
+        start = time.perf_counter()
+        for run in runs:
+            editor.suggest_deletion(run)
+        edit_time = time.perf_counter() - start
+
+        ids = [
+            elem.getAttribute("w:id") for elem in editor.dom.getElementsByTagName("w:del")
+        ]
+        assert len(set(ids)) == len(ids), "Duplicate tracked change IDs"
+
+    print(f"Paragraphs: {args.paragraphs}, deletions: {len(runs)}")
+    print(f"Load: {load_time:.2f}s")
+    print(
+        f"suggest_deletion: {edit_time:.2f}s "
+        f"({edit_time / max(len(runs), 1) * 1000:.2f} ms per edit)"
+    )
+
+
+if __name__ == "__main__":
+    main()
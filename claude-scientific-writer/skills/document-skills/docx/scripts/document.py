@@ -8,6 +8,7 @@ Usage:
     # Initialize
     doc = Document('workspace/unpacked')
     doc = Document('workspace/unpacked', author="John Doe", initials="JD")
+    doc = Document('workspace/unpacked', original_file='workspace/original.docx')
 
     # Find nodes
     node = doc["word/document.xml"].get_node(tag="w:del", attrs={"w:id": "1"})
@@ -19,6 +20,8 @@ Usage:
 
     # Suggest tracked changes
     doc["word/document.xml"].suggest_deletion(node)  # Delete content
+    with doc.batch() as batch:  # Apply many edits together
+        batch.replace_node(node, "<w:del>...</w:del><w:ins>...</w:ins>")
     doc["word/document.xml"].revert_insertion(ins_node)  # Reject insertion
     doc["word/document.xml"].revert_deletion(del_node)  # Reject deletion
 
@@ -30,6 +33,7 @@ import html
 import random
 import shutil
 import tempfile
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -72,19 +76,31 @@ class DocxXMLEditor(XMLEditor):
         self.author = author
         self.initials = initials
 
+        # Highest tracked change ID in use, found on the first allocation
+        self._max_change_id = None
+
     def _get_next_change_id(self):
-        """Get the next available change ID by checking all tracked change elements."""
-        max_id = -1
-        for tag in ("w:ins", "w:del"):
-            elements = self.dom.getElementsByTagName(tag)
-            for elem in elements:
-                change_id = elem.getAttribute("w:id")
-                if change_id:
-                    try:
-                        max_id = max(max_id, int(change_id))
-                    except ValueError:
-                        pass
-        return max_id + 1
+        """Get the next available change ID.
+
+        All tracked change elements are scanned once on the first call; after
+        that IDs are handed out from a counter.
+        """
+        if self._max_change_id is None:
+            self._max_change_id = -1
+            for tag in ("w:ins", "w:del"):
+                for elem in self.dom.getElementsByTagName(tag):
+                    self._track_change_id(elem)
+        self._max_change_id += 1
+        return self._max_change_id
+
+    def _track_change_id(self, elem):
+        """Raise the change ID counter past the w:id of a w:ins or w:del element."""
+        change_id = elem.getAttribute("w:id")
+        if change_id:
+            try:
+                self._max_change_id = max(self._max_change_id, int(change_id))
+            except ValueError:
+                pass
 
     def _ensure_w16du_namespace(self):
         """Ensure w16du namespace is declared on the root element."""
@@ -113,7 +129,7 @@ class DocxXMLEditor(XMLEditor):
                 "http://schemas.microsoft.com/office/word/2010/wordml",
             )
 
-    def _inject_attributes_to_nodes(self, nodes):
+    def _inject_attributes_to_nodes(self, nodes, timestamp=None):
         """Inject RSID, author, and date attributes into DOM nodes where applicable.
 
         Adds attributes to elements that support them:
@@ -124,12 +140,25 @@ class DocxXMLEditor(XMLEditor):
         - w:comment: gets w:author, w:date, w:initials
         - w16cex:commentExtensible: gets w16cex:dateUtc
 
+        Each node's subtree is walked once, in document order.
+
         Args:
             nodes: List of DOM nodes to process
+            timestamp: Date to apply (default: now, in UTC)
         """
-        from datetime import datetime, timezone
-
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        # Account for explicit IDs in the new content before assigning any
+        if self._max_change_id is not None:
+            for node in nodes:
+                if node.nodeType != node.ELEMENT_NODE:
+                    continue
+                if node.tagName in ("w:ins", "w:del"):
+                    self._track_change_id(node)
+                for tag in ("w:ins", "w:del"):
+                    for elem in node.getElementsByTagName(tag):
+                        self._track_change_id(elem)
 
         def is_inside_deletion(elem):
             """Check if element is inside a w:del element."""
@@ -155,9 +184,9 @@ class DocxXMLEditor(XMLEditor):
                 self._ensure_w14_namespace()
                 elem.setAttribute("w14:textId", _generate_hex_id())
 
-        def add_rsid_to_r(elem):
+        def add_rsid_to_r(elem, inside_deletion):
             # Use w:rsidDel for <w:r> inside <w:del>, otherwise w:rsidR
-            if is_inside_deletion(elem):
+            if inside_deletion:
                 if not elem.hasAttribute("w:rsidDel"):
                     elem.setAttribute("w:rsidDel", self.rsid)
             else:
@@ -208,34 +237,31 @@ class DocxXMLEditor(XMLEditor):
             if node.nodeType != node.ELEMENT_NODE:
                 continue
 
-            # Handle the node itself
-            if node.tagName == "w:p":
-                add_rsid_to_p(node)
-            elif node.tagName == "w:r":
-                add_rsid_to_r(node)
-            elif node.tagName == "w:t":
-                add_xml_space_to_t(node)
-            elif node.tagName in ("w:ins", "w:del"):
-                add_tracked_change_attrs(node)
-            elif node.tagName == "w:comment":
-                add_comment_attrs(node)
-            elif node.tagName == "w16cex:commentExtensible":
-                add_comment_extensible_date(node)
-
-            # Process descendants (getElementsByTagName doesn't return the element itself)
-            for elem in node.getElementsByTagName("w:p"):
-                add_rsid_to_p(elem)
-            for elem in node.getElementsByTagName("w:r"):
-                add_rsid_to_r(elem)
-            for elem in node.getElementsByTagName("w:t"):
-                add_xml_space_to_t(elem)
-            for tag in ("w:ins", "w:del"):
-                for elem in node.getElementsByTagName(tag):
+            # Walk the subtree, tracking whether we are inside a w:del so runs
+            # don't each have to search their ancestors
+            stack = [(node, is_inside_deletion(node))]
+            while stack:
+                elem, inside_deletion = stack.pop()
+                tag = elem.tagName
+                if tag == "w:p":
+                    add_rsid_to_p(elem)
+                elif tag == "w:r":
+                    add_rsid_to_r(elem, inside_deletion)
+                elif tag == "w:t":
+                    add_xml_space_to_t(elem)
+                elif tag in ("w:ins", "w:del"):
                     add_tracked_change_attrs(elem)
-            for elem in node.getElementsByTagName("w:comment"):
-                add_comment_attrs(elem)
-            for elem in node.getElementsByTagName("w16cex:commentExtensible"):
-                add_comment_extensible_date(elem)
+                elif tag == "w:comment":
+                    add_comment_attrs(elem)
+                elif tag == "w16cex:commentExtensible":
+                    add_comment_extensible_date(elem)
+
+                inside_deletion = inside_deletion or tag == "w:del"
+                stack.extend(
+                    (child, inside_deletion)
+                    for child in reversed(elem.childNodes)
+                    if child.nodeType == child.ELEMENT_NODE
+                )
 
     def replace_node(self, elem, new_content):
         """Replace node with automatic attribute injection."""
@@ -609,6 +635,99 @@ def _generate_rsid() -> str:
     return "".join(random.choices("0123456789ABCDEF", k=8))
 
 
+class EditBatch:
+    """Edits queued by Document.batch() and applied together when the block exits.
+
+    Supports the fragment-based editing methods of DocxXMLEditor. Each method
+    returns an empty list that is filled with the inserted nodes on commit.
+    """
+
+    def __init__(self, document):
+        self._document = document
+        self._edits = []
+
+    def replace_node(self, elem, new_content):
+        """Queue replacing an element with new XML content."""
+        return self._queue("replace", elem, new_content)
+
+    def insert_after(self, elem, xml_content):
+        """Queue inserting XML content after an element."""
+        return self._queue("after", elem, xml_content)
+
+    def insert_before(self, elem, xml_content):
+        """Queue inserting XML content before an element."""
+        return self._queue("before", elem, xml_content)
+
+    def append_to(self, elem, xml_content):
+        """Queue appending XML content as a child of an element."""
+        return self._queue("append", elem, xml_content)
+
+    def commit(self):
+        """Apply all queued edits in order.
+
+        For each part, all fragments are parsed with one wrapper document and
+        RSID/author/date attributes are injected in one pass with one timestamp.
+        Every edit is checked before any is applied, so a failing batch leaves
+        the document unchanged.
+
+        Raises:
+            ValueError: If an edit targets an element that is no longer in the
+                document, or that an earlier edit in the batch replaces
+        """
+        edits_by_editor = {}
+        for edit in self._edits:
+            edits_by_editor.setdefault(id(edit[0]), []).append(edit)
+        self._edits = []
+
+        for edits in edits_by_editor.values():
+            _check_batch_targets(edits)
+        parsed = [
+            (edits, edits[0][0]._parse_fragments([edit[3] for edit in edits]))
+            for edits in edits_by_editor.values()
+        ]
+
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        for edits, fragments in parsed:
+            editor = edits[0][0]
+            inserted = []
+            for (_, operation, elem, _, result), nodes in zip(edits, fragments):
+                editor._place_nodes(operation, elem, nodes)
+                result.extend(nodes)
+                inserted.extend(nodes)
+
+            editor._inject_attributes_to_nodes(inserted, timestamp=timestamp)
+
+    def _queue(self, operation, elem, xml_content):
+        editor = self._document._editor_for_node(elem)
+        result = []
+        self._edits.append((editor, operation, elem, xml_content, result))
+        return result
+
+
+def _check_batch_targets(edits):
+    """Raise ValueError unless every edit's element will still be in the document.
+
+    An element is lost if it is already detached, or if it or an ancestor is
+    replaced by an earlier edit of the same batch.
+    """
+    replaced = set()
+    for _, operation, elem, _, _ in edits:
+        node = elem
+        while node is not None and node.nodeType != node.DOCUMENT_NODE:
+            if id(node) in replaced:
+                raise ValueError(
+                    f"Cannot apply batched edit: <{elem.tagName}> is removed "
+                    f"by an earlier edit in the same batch"
+                )
+            node = node.parentNode
+        if node is None or (operation != "append" and elem.parentNode is node):
+            raise ValueError(
+                f"Cannot apply batched edit: <{elem.tagName}> is not in the document"
+            )
+        if operation == "replace":
+            replaced.add(id(elem))
+
+
 class Document:
     """Manages comments in unpacked Word documents."""
 
@@ -619,6 +738,7 @@ class Document:
         track_revisions=False,
         author="Scientific-Writer",
         initials="SW",
+        original_file=None,
     ):
         """
         Initialize with path to unpacked Word document directory.
@@ -630,20 +750,28 @@ class Document:
             track_revisions: If True, enables track revisions in settings.xml (default: False)
             author: Default author name for comments (default: "Scientific-Writer")
             initials: Default author initials for comments (default: "SW")
+            original_file: Optional path to the .docx the directory was unpacked from.
+                Used directly as the validation baseline instead of repacking the directory.
         """
         self.original_path = Path(unpacked_dir)
 
         if not self.original_path.exists() or not self.original_path.is_dir():
             raise ValueError(f"Directory not found: {unpacked_dir}")
+        if original_file is not None and not Path(original_file).is_file():
+            raise ValueError(f"Original file not found: {original_file}")
 
         # Create temporary directory with subdirectories for unpacked content and baseline
         self.temp_dir = tempfile.mkdtemp(prefix="docx_")
         self.unpacked_path = Path(self.temp_dir) / "unpacked"
         shutil.copytree(self.original_path, self.unpacked_path)
 
-        # Pack original directory into temporary .docx for validation baseline (outside unpacked dir)
-        self.original_docx = Path(self.temp_dir) / "original.docx"
-        pack_document(self.original_path, self.original_docx, validate=False)
+        # Validation baseline: the original .docx if known, otherwise pack the
+        # original directory into a temporary .docx (outside unpacked dir)
+        if original_file is not None:
+            self.original_docx = Path(original_file)
+        else:
+            self.original_docx = Path(self.temp_dir) / "original.docx"
+            pack_document(self.original_path, self.original_docx, validate=False)
 
         self.word_path = self.unpacked_path / "word"
 
@@ -710,6 +838,45 @@ class Document:
             )
         return self._editors[xml_path]
 
+    @contextmanager
+    def batch(self):
+        """
+        Queue many edits and apply them together when the block exits.
+
+        Fragments are parsed once per part and attributes are injected in a
+        single pass, which is much faster for thousands of small tracked
+        changes. Nothing is applied if the block raises. Anchor elements must
+        be found before the block; the returned lists are filled on exit.
+
+        Example:
+            with doc.batch() as batch:
+                for node, replacement in edits:
+                    batch.replace_node(node, replacement)
+
+        Yields:
+            EditBatch with replace_node, insert_after, insert_before and append_to
+        """
+        batch = EditBatch(self)
+        yield batch
+        batch.commit()
+
+    @property
+    def dirty_parts(self):
+        """
+        Parts that may have been modified in this session.
+
+        Every part opened through an editor is included, so this is a superset
+        of the parts actually changed. Pass it to pack_document() together with
+        the original .docx to recompress only these parts:
+
+            pack_document(unpacked_dir, "out.docx", original_file="in.docx",
+                          dirty_parts=doc.dirty_parts)
+
+        Returns:
+            Set of relative part paths (e.g. {"word/document.xml", "word/comments.xml"})
+        """
+        return {Path(xml_path).as_posix() for xml_path in self._editors}
+
     def add_comment(self, start, end, text: str) -> int:
         """
         Add a comment spanning from one element to another.
@@ -883,10 +1050,23 @@ class Document:
         target_path = Path(destination) if destination else self.original_path
         shutil.copytree(self.unpacked_path, target_path, dirs_exist_ok=True)
 
+    # ==================== Private: Editing ====================
+
+    def _editor_for_node(self, node):
+        """Return the open editor whose DOM contains a node."""
+        for editor in self._editors.values():
+            if editor.dom is node.ownerDocument:
+                return editor
+        raise ValueError("Node does not belong to a part opened through this Document")
+
     # ==================== Private: Initialization ====================
 
     def _get_next_comment_id(self):
-        """Get the next available comment ID."""
+        """Get the next available comment ID.
+
+        Called once at load to seed next_comment_id, which add_comment and
+        reply_to_comment then increment.
+        """
         if not self.comments_path.exists():
             return 0
 
@@ -1073,7 +1253,7 @@ class Document:
             shutil.copy(TEMPLATE_DIR / "comments.xml", self.comments_path)
 
         editor = self["word/comments.xml"]
-        root = editor.get_node(tag="w:comments")
+        root = editor.dom.documentElement  # <w:comments>
 
         escaped_text = (
             text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
@@ -1096,7 +1276,7 @@ class Document:
             )
 
         editor = self["word/commentsExtended.xml"]
-        root = editor.get_node(tag="w15:commentsEx")
+        root = editor.dom.documentElement  # <w15:commentsEx>
 
         if parent_para_id:
             xml = f'<w15:commentEx w15:paraId="{para_id}" w15:paraIdParent="{parent_para_id}" w15:done="0"/>'
@@ -1110,7 +1290,7 @@ class Document:
             shutil.copy(TEMPLATE_DIR / "commentsIds.xml", self.comments_ids_path)
 
         editor = self["word/commentsIds.xml"]
-        root = editor.get_node(tag="w16cid:commentsIds")
+        root = editor.dom.documentElement  # <w16cid:commentsIds>
 
         xml = f'<w16cid:commentId w16cid:paraId="{para_id}" w16cid:durableId="{durable_id}"/>'
         editor.append_to(root, xml)
@@ -1123,7 +1303,7 @@ class Document:
             )
 
         editor = self["word/commentsExtensible.xml"]
-        root = editor.get_node(tag="w16cex:commentsExtensible")
+        root = editor.dom.documentElement  # <w16cex:commentsExtensible>
 
         xml = f'<w16cex:commentExtensible w16cex:durableId="{durable_id}"/>'
         editor.append_to(root, xml)
@@ -0,0 +1,142 @@
+import contextlib
+import io
+import re
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+import docx
+
+from .document import Document
+
+# Tracked change dates and paragraph IDs differ between runs
+VOLATILE_ATTRIBUTES = re.compile(
+    r' (w:date|w16du:dateUtc|w14:paraId|w14:textId)="[^"]*"'
+)
+
+EDITS = [
+    (
+        "replace",
+        "Second",
+        "<w:del><w:r><w:delText>Second</w:delText></w:r></w:del>"
+        "<w:ins><w:r><w:t>2nd</w:t></w:r></w:ins>",
+    ),
+    ("after", "Third", "<w:p><w:ins><w:r><w:t>Added</w:t></w:r></w:ins></w:p>"),
+    ("before", "First", "<w:p><w:r><w:t> Lead</w:t></w:r></w:p>"),
+    ("append", "Third", "<w:ins><w:r><w:t>, continued</w:t></w:r></w:ins>"),
+]
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestEditBatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.docx_path = Path(self.temp_dir.name) / "original.docx"
+        source = docx.Document()
+        for text in ("First", "Second", "Third"):
+            source.add_paragraph(text)
+        source.save(str(self.docx_path))
+
+        self.unpacked = Path(self.temp_dir.name) / "unpacked"
+        with zipfile.ZipFile(self.docx_path) as archive:
+            archive.extractall(self.unpacked)
+
+    def open_document(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            doc = Document(self.unpacked, rsid="00AB12CD", original_file=self.docx_path)
+        self.addCleanup(doc.__del__)
+        return doc
+
+    def apply(self, target, operation, anchor, xml):
+        """Apply one of EDITS through target, a DocxXMLEditor or an EditBatch."""
+        method = {
+            "replace": "replace_node",
+            "after": "insert_after",
+            "before": "insert_before",
+            "append": "append_to",
+        }[operation]
+        return getattr(target, method)(anchor, xml)
+
+    def anchor(self, editor, operation, text):
+        tag = "w:r" if operation == "replace" else "w:p"
+        return editor.get_node(tag=tag, contains=text)
+
+    def document_xml(self, doc):
+        return VOLATILE_ATTRIBUTES.sub("", doc["word/document.xml"].dom.toxml())
+
+    def test_batch_matches_unbatched_edits(self):
+        unbatched = self.open_document()
+        editor = unbatched["word/document.xml"]
+        for operation, text, xml in EDITS:
+            self.apply(editor, operation, self.anchor(editor, operation, text), xml)
+
+        batched = self.open_document()
+        editor = batched["word/document.xml"]
+        anchors = [
+            self.anchor(editor, operation, text) for operation, text, _ in EDITS
+        ]
+        with batched.batch() as batch:
+            results = [
+                self.apply(batch, operation, anchor, xml)
+                for (operation, _, xml), anchor in zip(EDITS, anchors)
+            ]
+            self.assertEqual(results, [[], [], [], []])
+
+        self.assertEqual(self.document_xml(batched), self.document_xml(unbatched))
+        self.assertEqual([len(nodes) for nodes in results], [2, 1, 1, 1])
+
+        xml = self.document_xml(batched)
+        self.assertIn('<w:del w:id="0" w:author="Scientific-Writer">', xml)
+        self.assertIn('<w:r w:rsidDel="00AB12CD"><w:delText>Second', xml)
+        self.assertIn('<w:ins w:id="1" w:author="Scientific-Writer">', xml)
+        self.assertIn('<w:r w:rsidR="00AB12CD"><w:t>2nd', xml)
+        self.assertIn('<w:t xml:space="preserve"> Lead', xml)
+        ids = re.findall(r'<w:(?:ins|del) w:id="(\d+)"', xml)
+        self.assertEqual(sorted(ids, key=int), ["0", "1", "2", "3"])
+
+        # One timestamp for the whole batch
+        dates = re.findall(r'w:date="([^"]*)"', editor.dom.toxml())
+        self.assertEqual(len(dates), 4)
+        self.assertEqual(len(set(dates)), 1)
+
+    def test_failed_batch_leaves_document_unchanged(self):
+        doc = self.open_document()
+        editor = doc["word/document.xml"]
+        before = editor.dom.toxml()
+
+        paragraph = editor.get_node(tag="w:p", contains="Second")
+        run = editor.get_node(tag="w:r", contains="Second")
+        first = editor.get_node(tag="w:p", contains="First")
+        with self.assertRaisesRegex(ValueError, "removed by an earlier edit"):
+            with doc.batch() as batch:
+                inserted = batch.insert_after(
+                    first, "<w:p><w:r><w:t>New</w:t></w:r></w:p>"
+                )
+                batch.replace_node(
+                    paragraph, "<w:p><w:r><w:t>Gone</w:t></w:r></w:p>"
+                )
+                batch.insert_after(run, "<w:r><w:t>Lost</w:t></w:r>")
+        self.assertEqual(editor.dom.toxml(), before)
+        self.assertEqual(inserted, [])
+
+        # An anchor removed before the batch is rejected the same way
+        removed = editor.get_node(tag="w:p", contains="Third")
+        editor.replace_node(removed, "<w:p><w:r><w:t>Replaced</w:t></w:r></w:p>")
+        before = editor.dom.toxml()
+        with self.assertRaisesRegex(ValueError, "not in the document"):
+            with doc.batch() as batch:
+                batch.insert_after(first, "<w:p><w:r><w:t>New</w:t></w:r></w:p>")
+                batch.append_to(removed, "<w:r><w:t>Lost</w:t></w:r>")
+        self.assertEqual(editor.dom.toxml(), before)
+
+        # Nothing was left queued by the failed batches
+        with doc.batch() as batch:
+            batch.insert_after(first, "<w:p><w:r><w:t>Kept</w:t></w:r></w:p>")
+        self.assertIn("Kept", editor.dom.toxml())
+        self.assertNotIn("New", editor.dom.toxml())
+
+
+if __name__ == "__main__":
+    unittest.main()
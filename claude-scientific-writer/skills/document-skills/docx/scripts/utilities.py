@@ -6,6 +6,9 @@ This module provides XMLEditor, a tool for manipulating XML files with support f
 line-number-based node finding and DOM manipulation. Each element is automatically
 annotated with its original line and column position during parsing.
 
+LxmlXMLEditor offers the same API on top of lxml for large documents, using indexed
+lookups instead of scanning the whole tree on every get_node call.
+
 Example usage:
     editor = XMLEditor("document.xml")
 
@@ -30,12 +33,14 @@ Example usage:
     editor.save()
 """
 
+import bisect
 import html
 from pathlib import Path
 from typing import Optional, Union
 
 import defusedxml.minidom
 import defusedxml.sax
+import lxml.etree
 
 
 class XMLEditor:
@@ -73,6 +78,9 @@ class XMLEditor:
         parser = _create_line_tracking_parser()
         self.dom = defusedxml.minidom.parse(str(self.xml_path), parser)
 
+        # Highest rId number in use, found on the first get_next_rid() call
+        self._max_rid = None
+
     def get_node(
         self,
         tag: str,
@@ -217,11 +225,8 @@ class XMLEditor:
         Example:
             new_nodes = editor.replace_node(old_elem, "<w:r><w:t>text</w:t></w:r>")
         """
-        parent = elem.parentNode
         nodes = self._parse_fragment(new_content)
-        for node in nodes:
-            parent.insertBefore(node, elem)
-        parent.removeChild(elem)
+        self._place_nodes("replace", elem, nodes)
         return nodes
 
     def insert_after(self, elem, xml_content):
@@ -238,14 +243,8 @@ class XMLEditor:
         Example:
             new_nodes = editor.insert_after(elem, "<w:r><w:t>text</w:t></w:r>")
         """
-        parent = elem.parentNode
-        next_sibling = elem.nextSibling
         nodes = self._parse_fragment(xml_content)
-        for node in nodes:
-            if next_sibling:
-                parent.insertBefore(node, next_sibling)
-            else:
-                parent.appendChild(node)
+        self._place_nodes("after", elem, nodes)
         return nodes
 
     def insert_before(self, elem, xml_content):
@@ -262,10 +261,8 @@ class XMLEditor:
         Example:
             new_nodes = editor.insert_before(elem, "<w:r><w:t>text</w:t></w:r>")
         """
-        parent = elem.parentNode
         nodes = self._parse_fragment(xml_content)
-        for node in nodes:
-            parent.insertBefore(node, elem)
+        self._place_nodes("before", elem, nodes)
         return nodes
 
     def append_to(self, elem, xml_content):
@@ -283,21 +280,68 @@ class XMLEditor:
             new_nodes = editor.append_to(elem, "<w:r><w:t>text</w:t></w:r>")
         """
         nodes = self._parse_fragment(xml_content)
-        for node in nodes:
-            elem.appendChild(node)
+        self._place_nodes("append", elem, nodes)
         return nodes
 
     def get_next_rid(self):
-        """Get the next available rId for relationships files."""
-        max_id = 0
-        for rel_elem in self.dom.getElementsByTagName("Relationship"):
-            rel_id = rel_elem.getAttribute("Id")
-            if rel_id.startswith("rId"):
-                try:
-                    max_id = max(max_id, int(rel_id[3:]))
-                except ValueError:
-                    pass
-        return f"rId{max_id + 1}"
+        """
+        Get the next available rId for relationships files.
+
+        The file is scanned once on the first call. After that every call hands
+        out a new, higher rId, and rIds in content inserted through this editor
+        are taken into account.
+        """
+        if self._max_rid is None:
+            self._max_rid = 0
+            for rel_elem in self.dom.getElementsByTagName("Relationship"):
+                self._max_rid = max(
+                    self._max_rid, _parse_rid(rel_elem.getAttribute("Id"))
+                )
+        self._max_rid += 1
+        return f"rId{self._max_rid}"
+
+    def _place_nodes(self, operation, elem, nodes):
+        """
+        Insert already imported nodes relative to a DOM element.
+
+        Args:
+            operation: "replace", "after", "before" or "append"
+            elem: defusedxml.minidom.Element the nodes are placed relative to
+            nodes: Nodes returned by _parse_fragment or _parse_fragments
+        """
+        if operation == "append":
+            for node in nodes:
+                elem.appendChild(node)
+        else:
+            parent = elem.parentNode
+            if operation == "after":
+                next_sibling = elem.nextSibling
+                for node in nodes:
+                    if next_sibling:
+                        parent.insertBefore(node, next_sibling)
+                    else:
+                        parent.appendChild(node)
+            else:
+                for node in nodes:
+                    parent.insertBefore(node, elem)
+                if operation == "replace":
+                    parent.removeChild(elem)
+        self._track_inserted_rids(nodes)
+
+    def _track_inserted_rids(self, nodes):
+        """Raise the rId allocator past any rIds in newly inserted nodes."""
+        if self._max_rid is None:
+            return
+        for node in nodes:
+            if node.nodeType != node.ELEMENT_NODE:
+                continue
+            rel_elems = node.getElementsByTagName("Relationship")
+            if node.tagName == "Relationship":
+                rel_elems = [node, *rel_elems]
+            for rel_elem in rel_elems:
+                self._max_rid = max(
+                    self._max_rid, _parse_rid(rel_elem.getAttribute("Id"))
+                )
 
     def save(self):
         """
@@ -322,6 +366,21 @@ class XMLEditor:
         Raises:
             AssertionError: If fragment contains no element nodes
         """
+        return self._parse_fragments([xml_content])[0]
+
+    def _parse_fragments(self, xml_contents):
+        """
+        Parse several XML fragments with a single parse of one wrapper document.
+
+        Args:
+            xml_contents: List of strings containing XML fragments
+
+        Returns:
+            List with one list of imported nodes per fragment, in input order
+
+        Raises:
+            AssertionError: If any fragment contains no element nodes
+        """
         # Extract namespace declarations from the root document element
         root_elem = self.dom.documentElement
         namespaces = []
@@ -332,16 +391,468 @@ class XMLEditor:
                     namespaces.append(f'{attr.name}="{attr.value}"')  # type: ignore
 
         ns_decl = " ".join(namespaces)
-        wrapper = f"<root {ns_decl}>{xml_content}</root>"
+        fragments = "".join(
+            f"<fragment>{xml_content}</fragment>" for xml_content in xml_contents
+        )
+        wrapper = f"<root {ns_decl}>{fragments}</root>"
         fragment_doc = defusedxml.minidom.parseString(wrapper)
-        nodes = [
-            self.dom.importNode(child, deep=True)
-            for child in fragment_doc.documentElement.childNodes  # type: ignore
-        ]
-        elements = [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
-        assert elements, "Fragment must contain at least one element"
+
+        results = []
+        for fragment in fragment_doc.documentElement.childNodes:  # type: ignore
+            nodes = [
+                self.dom.importNode(child, deep=True) for child in fragment.childNodes
+            ]
+            elements = [n for n in nodes if n.nodeType == n.ELEMENT_NODE]
+            assert elements, "Fragment must contain at least one element"
+            results.append(nodes)
+        return results
+
+
+class LxmlXMLEditor:
+    """
+    lxml-based editor with the same API as XMLEditor, for large documents.
+
+    Elements are lxml elements, which carry their original line number natively
+    (elem.sourceline). Lookups in get_node use lazily built indexes by tag, by
+    attribute value and by line, plus a cached text projection for contains=
+    searches. All indexes are discarded whenever the tree is modified through
+    replace_node, insert_after, insert_before or append_to.
+
+    Differences from XMLEditor:
+    - Returned nodes are lxml elements rather than minidom nodes.
+    - For start tags spanning several lines, the line of the closing '>' is used.
+    - Comments in the original file are kept; XMLEditor's parser drops them.
+    - Text in inserted fragments is kept as the tail of the node before it, so
+      the returned lists hold only elements and comments.
+
+    Attributes:
+        xml_path: Path to the XML file being edited
+        encoding: Detected encoding of the XML file ('ascii' or 'utf-8')
+        tree: Parsed lxml ElementTree
+    """
+
+    def __init__(self, xml_path):
+        """
+        Initialize with path to XML file and parse it.
+
+        Args:
+            xml_path: Path to XML file to edit (str or Path)
+
+        Raises:
+            ValueError: If the XML file does not exist
+        """
+        self.xml_path = Path(xml_path)
+        if not self.xml_path.exists():
+            raise ValueError(f"XML file not found: {xml_path}")
+
+        with open(self.xml_path, "rb") as f:
+            header = f.read(200).decode("utf-8", errors="ignore")
+        self.encoding = "ascii" if 'encoding="ascii"' in header else "utf-8"
+        # docinfo.standalone cannot tell a missing declaration from "no"
+        self._standalone = None
+        if "standalone=" in header:
+            self._standalone = 'standalone="yes"' in header
+
+        parser = lxml.etree.XMLParser(
+            resolve_entities=False, no_network=True, huge_tree=True
+        )
+        self.tree = lxml.etree.parse(str(self.xml_path), parser)
+        self._invalidate_indexes()
+
+        # Highest rId number in use, found on the first get_next_rid() call
+        self._max_rid = None
+
+    def get_node(
+        self,
+        tag: str,
+        attrs: Optional[dict[str, str]] = None,
+        line_number: Optional[Union[int, range]] = None,
+        contains: Optional[str] = None,
+    ):
+        """
+        Get an element by tag and identifier.
+
+        Same filters and errors as XMLEditor.get_node.
+
+        Args:
+            tag: The XML tag name (e.g., "w:del", "w:ins", "w:r")
+            attrs: Dictionary of attribute name-value pairs to match (e.g., {"w:id": "1"})
+            line_number: Line number (int) or line range (range) in original XML file (1-indexed)
+            contains: Text string that must appear in any text node within the element.
+                      Supports both entity notation (&#8220;) and Unicode characters (\u201c).
+
+        Returns:
+            lxml.etree._Element: The matching element
+
+        Raises:
+            ValueError: If node not found or multiple matches found
+        """
+        qualified_tag = self._qualify(tag, is_attribute=False)
+        qualified_attrs = {
+            self._qualify(name, is_attribute=True): value
+            for name, value in (attrs or {}).items()
+        }
+
+        # Start from the smallest indexed candidate list
+        candidate_lists = [self._elements_by_tag().get(qualified_tag, [])]
+        for attr_name, attr_value in qualified_attrs.items():
+            # As with minidom's getAttribute, "" also matches a missing attribute,
+            # which the attribute index does not list
+            if attr_value == "":
+                continue
+            candidate_lists.append(
+                self._elements_by_attribute(attr_name).get(attr_value, [])
+            )
+        if line_number is not None:
+            candidate_lists.append(self._elements_by_line(line_number))
+        candidates = min(candidate_lists, key=len)
+
+        normalized_contains = html.unescape(contains) if contains is not None else None
+
+        matches = []
+        for elem in candidates:
+            if elem.tag != qualified_tag:
+                continue
+
+            # Check line_number filter
+            if line_number is not None:
+                elem_line = elem.sourceline
+                if isinstance(line_number, range):
+                    if elem_line not in line_number:
+                        continue
+                elif elem_line != line_number:
+                    continue
+
+            # Check attrs filter
+            if any(
+                elem.get(attr_name, "") != attr_value
+                for attr_name, attr_value in qualified_attrs.items()
+            ):
+                continue
+
+            # Check contains filter
+            if normalized_contains is not None:
+                if normalized_contains not in self._get_element_text(elem):
+                    continue
+
+            matches.append(elem)
+
+        if not matches:
+            # Build descriptive error message
+            filters = []
+            if line_number is not None:
+                line_str = (
+                    f"lines {line_number.start}-{line_number.stop - 1}"
+                    if isinstance(line_number, range)
+                    else f"line {line_number}"
+                )
+                filters.append(f"at {line_str}")
+            if attrs is not None:
+                filters.append(f"with attributes {attrs}")
+            if contains is not None:
+                filters.append(f"containing '{contains}'")
+
+            filter_desc = " ".join(filters) if filters else ""
+            base_msg = f"Node not found: <{tag}> {filter_desc}".strip()
+
+            # Add helpful hint based on filters used
+            if contains:
+                hint = "Text may be split across elements or use different wording."
+            elif line_number:
+                hint = "Line numbers may have changed if document was modified."
+            elif attrs:
+                hint = "Verify attribute values are correct."
+            else:
+                hint = "Try adding filters (attrs, line_number, or contains)."
+
+            raise ValueError(f"{base_msg}. {hint}")
+        if len(matches) > 1:
+            raise ValueError(
+                f"Multiple nodes found: <{tag}>. "
+                f"Add more filters (attrs, line_number, or contains) to narrow the search."
+            )
+        return matches[0]
+
+    def replace_node(self, elem, new_content):
+        """
+        Replace an element with new XML content.
+
+        Args:
+            elem: lxml element to replace
+            new_content: String containing XML to replace the node with
+
+        Returns:
+            List[lxml.etree._Element]: All inserted elements and comments
+        """
+        text, nodes = self._parse_fragment(new_content)
+        self._place_nodes("replace", elem, text, nodes)
+        return nodes
+
+    def insert_after(self, elem, xml_content):
+        """
+        Insert XML content after an element.
+
+        Args:
+            elem: lxml element to insert after
+            xml_content: String containing XML to insert
+
+        Returns:
+            List[lxml.etree._Element]: All inserted elements and comments
+        """
+        text, nodes = self._parse_fragment(xml_content)
+        self._place_nodes("after", elem, text, nodes)
+        return nodes
+
+    def insert_before(self, elem, xml_content):
+        """
+        Insert XML content before an element.
+
+        Args:
+            elem: lxml element to insert before
+            xml_content: String containing XML to insert
+
+        Returns:
+            List[lxml.etree._Element]: All inserted elements and comments
+        """
+        text, nodes = self._parse_fragment(xml_content)
+        self._place_nodes("before", elem, text, nodes)
+        return nodes
+
+    def append_to(self, elem, xml_content):
+        """
+        Append XML content as a child of an element.
+
+        Args:
+            elem: lxml element to append to
+            xml_content: String containing XML to append
+
+        Returns:
+            List[lxml.etree._Element]: All inserted elements and comments
+        """
+        text, nodes = self._parse_fragment(xml_content)
+        self._place_nodes("append", elem, text, nodes)
         return nodes
 
+    def _place_nodes(self, operation, elem, text, nodes):
+        """
+        Insert parsed nodes relative to an element and drop the indexes.
+
+        Args:
+            operation: "replace", "after", "before" or "append"
+            elem: lxml element the nodes are placed relative to
+            text: Text that came before the first node of the fragment
+            nodes: Elements and comments returned by _parse_fragment
+        """
+        if operation == "append":
+            for node in nodes:
+                elem.append(node)
+        elif operation == "after":
+            # Inserted content goes directly after elem, before its trailing text
+            nodes[-1].tail = (nodes[-1].tail or "") + (elem.tail or "")
+            elem.tail = None
+            for node in reversed(nodes):
+                elem.addnext(node)
+        else:
+            for node in nodes:
+                elem.addprevious(node)
+            if operation == "replace":
+                # Keep the text that followed the replaced element
+                nodes[-1].tail = (nodes[-1].tail or "") + (elem.tail or "")
+                elem.tail = None
+                elem.getparent().remove(elem)
+
+        if text:
+            previous = nodes[0].getprevious()
+            if previous is not None:
+                previous.tail = (previous.tail or "") + text
+            else:
+                parent = nodes[0].getparent()
+                parent.text = (parent.text or "") + text
+
+        self._invalidate_indexes()
+        self._track_inserted_rids(nodes)
+
+    def get_next_rid(self):
+        """Get the next available rId for relationships files (see XMLEditor)."""
+        if self._max_rid is None:
+            self._max_rid = 0
+            relationship_tag = self._qualify("Relationship", is_attribute=False)
+            for rel_elem in self._elements_by_tag().get(relationship_tag, []):
+                self._max_rid = max(self._max_rid, _parse_rid(rel_elem.get("Id", "")))
+        self._max_rid += 1
+        return f"rId{self._max_rid}"
+
+    def _track_inserted_rids(self, nodes):
+        """Raise the rId allocator past any rIds in newly inserted elements."""
+        if self._max_rid is None:
+            return
+        relationship_tag = self._qualify("Relationship", is_attribute=False)
+        for node in nodes:
+            for rel_elem in node.iter(relationship_tag):
+                self._max_rid = max(self._max_rid, _parse_rid(rel_elem.get("Id", "")))
+
+    def save(self):
+        """
+        Save the edited XML back to the file, preserving the original encoding.
+        """
+        content = lxml.etree.tostring(
+            self.tree,
+            encoding=self.encoding,
+            xml_declaration=True,
+            standalone=self._standalone,
+        )
+        self.xml_path.write_bytes(content)
+
+    # ==================== Private: Indexes ====================
+
+    def _invalidate_indexes(self):
+        """Drop all lookup indexes; they are rebuilt lazily on the next lookup."""
+        self._tag_index = None
+        self._attribute_indexes = {}
+        self._line_index = None
+        self._text_cache = {}
+
+    def _elements_by_tag(self):
+        """Index of elements in document order, keyed by qualified tag."""
+        if self._tag_index is None:
+            self._tag_index = {}
+            for elem in self.tree.getroot().iter(lxml.etree.Element):
+                self._tag_index.setdefault(elem.tag, []).append(elem)
+        return self._tag_index
+
+    def _elements_by_attribute(self, attr_name):
+        """Index of elements in document order, keyed by value of one attribute."""
+        index = self._attribute_indexes.get(attr_name)
+        if index is None:
+            index = {}
+            for elem in self.tree.getroot().iter(lxml.etree.Element):
+                value = elem.get(attr_name)
+                if value is not None:
+                    index.setdefault(value, []).append(elem)
+            self._attribute_indexes[attr_name] = index
+        return index
+
+    def _elements_by_line(self, line_number):
+        """Elements in document order whose start tag is on a line or in a range."""
+        if self._line_index is None:
+            by_line = {}
+            for elem in self.tree.getroot().iter(lxml.etree.Element):
+                if elem.sourceline is not None:
+                    by_line.setdefault(elem.sourceline, []).append(elem)
+            self._line_index = (sorted(by_line), by_line)
+
+        lines, by_line = self._line_index
+        if not isinstance(line_number, range):
+            return by_line.get(line_number, [])
+
+        # Ranges are usually small slices of a large file, so bisect the line list
+        if line_number.step != 1:
+            return [
+                elem
+                for line in lines
+                if line in line_number
+                for elem in by_line[line]
+            ]
+        start = bisect.bisect_left(lines, line_number.start)
+        stop = bisect.bisect_left(lines, line_number.stop)
+        return [elem for line in lines[start:stop] for elem in by_line[line]]
+
+    def _get_element_text(self, elem):
+        """
+        Extract all text content from an element, skipping whitespace-only text.
+
+        Results are cached per element until the tree is modified, so repeated
+        contains= searches over nested candidates share the work.
+        """
+        cached = self._text_cache.get(elem)
+        if cached is not None:
+            return cached
+
+        text_parts = []
+        if elem.text and elem.text.strip():
+            text_parts.append(elem.text)
+        for child in elem:
+            # Comments and processing instructions contribute only their tail
+            if isinstance(child.tag, str):
+                text_parts.append(self._get_element_text(child))
+            if child.tail and child.tail.strip():
+                text_parts.append(child.tail)
+
+        text = "".join(text_parts)
+        self._text_cache[elem] = text
+        return text
+
+    # ==================== Private: Namespaces and fragments ====================
+
+    def _qualify(self, name, is_attribute):
+        """Convert a prefixed name such as "w:p" to lxml's {namespace}local form."""
+        nsmap = self.tree.getroot().nsmap
+        if ":" not in name:
+            # Unprefixed attributes have no namespace; elements use the default one
+            if is_attribute or None not in nsmap:
+                return name
+            return f"{{{nsmap[None]}}}{name}"
+
+        prefix, local_name = name.split(":", 1)
+        if prefix == "xml":
+            return f"{{http://www.w3.org/XML/1998/namespace}}{local_name}"
+        namespace = nsmap.get(prefix)
+        if namespace is None:
+            # Fall back to declarations below the root element
+            for elem in self.tree.getroot().iter(lxml.etree.Element):
+                namespace = elem.nsmap.get(prefix)
+                if namespace is not None:
+                    break
+            else:
+                raise ValueError(f"Unknown namespace prefix: {prefix}")
+        return f"{{{namespace}}}{local_name}"
+
+    def _parse_fragment(self, xml_content):
+        """
+        Parse XML fragment using the root element's namespace declarations.
+
+        Args:
+            xml_content: String containing XML fragment
+
+        Returns:
+            Tuple of the text before the first node, and the list of lxml
+            elements and comments, detached from the wrapper and ready to insert
+
+        Raises:
+            AssertionError: If fragment contains no element nodes
+        """
+        namespaces = []
+        for prefix, uri in self.tree.getroot().nsmap.items():
+            attr_name = f"xmlns:{prefix}" if prefix else "xmlns"
+            namespaces.append(f'{attr_name}="{html.escape(uri, quote=True)}"')
+
+        ns_decl = " ".join(namespaces)
+        wrapper_xml = f"<root {ns_decl}>{xml_content}</root>"
+        parser = lxml.etree.XMLParser(resolve_entities=False, no_network=True)
+        wrapper = lxml.etree.fromstring(wrapper_xml.encode("utf-8"), parser)
+
+        # Comments and processing instructions are kept, like minidom nodes
+        nodes = list(wrapper)
+        assert any(
+            isinstance(node.tag, str) for node in nodes
+        ), "Fragment must contain at least one element"
+
+        # New content has no line in the original file
+        for node in nodes:
+            for descendant in node.iter():
+                descendant.sourceline = 0
+        return wrapper.text, nodes
+
+
+def _parse_rid(rel_id):
+    """Return the number of an "rIdN" relationship ID, or 0 for other IDs."""
+    if rel_id.startswith("rId"):
+        try:
+            return int(rel_id[3:])
+        except ValueError:
+            pass
+    return 0
+
 
 def _create_line_tracking_parser():
     """
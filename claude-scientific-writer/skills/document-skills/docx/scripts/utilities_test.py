@@ -0,0 +1,176 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import lxml.etree
+
+from .utilities import LxmlXMLEditor, XMLEditor
+
+DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" xmlns:w14="http://schemas.microsoft.com/office/word/2010/wordml">
+  <w:body>
+    <w:p w14:paraId="00000001">
+      <w:r><w:t>The first paragraph</w:t></w:r>
+    </w:p>
+    <w:p w14:paraId="00000002">
+      <w:ins w:id="1" w:author="A"><w:r><w:t>inserted &#8220;text&#8221;</w:t></w:r></w:ins>
+      <w:del w:id="2" w:author="A"><w:r><w:delText>deleted</w:delText></w:r></w:del>
+    </w:p>
+    <w:p w14:paraId="00000003">
+      <w:r w:rsidR=""><w:t>Third</w:t></w:r>
+      <w:r><w:t>paragraph</w:t></w:r>
+    </w:p>
+  </w:body>
+</w:document>
+"""
+
+QUERIES = [
+    {"tag": "w:p", "attrs": {"w14:paraId": "00000002"}},
+    {"tag": "w:ins", "attrs": {"w:id": "1"}},
+    {"tag": "w:del", "attrs": {"w:id": "2", "w:author": "A"}},
+    {"tag": "w:r", "attrs": {"w:rsidR": ""}, "contains": "paragraph"},
+    {"tag": "w:r", "line_number": 5},
+    {"tag": "w:r", "line_number": 14},
+    {"tag": "w:p", "line_number": range(6, 9)},
+    {"tag": "w:p", "line_number": range(1, 20), "contains": "deleted"},
+    {"tag": "w:t", "contains": "&#8220;text"},
+    {"tag": "w:t", "contains": "“text”"},
+    {"tag": "w:p", "contains": "Thirdparagraph"},
+    {"tag": "w:p", "contains": "added"},
+    {"tag": "w:r", "attrs": {"w:id": "99"}},
+    {"tag": "w:r", "line_number": 99},
+    {"tag": "w:r"},
+]
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestLxmlXMLEditorParity(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.editors = []
+        for engine in (XMLEditor, LxmlXMLEditor):
+            path = Path(self.temp_dir.name) / f"{engine.__name__}.xml"
+            path.write_text(DOCUMENT_XML, encoding="utf-8")
+            self.editors.append(engine(path))
+
+    def describe(self, editor, elem):
+        """Engine-independent summary of an element: tag, attribute values, text."""
+        if isinstance(elem, lxml.etree._Element):
+            tag = lxml.etree.QName(elem).localname
+            values = list(elem.attrib.values())
+        else:
+            tag = elem.localName
+            values = [
+                value
+                for name, value in elem.attributes.items()
+                if not name.startswith("xmlns")
+            ]
+        return tag, sorted(values), editor._get_element_text(elem)
+
+    def lookup(self, editor, query):
+        try:
+            return self.describe(editor, editor.get_node(**query))
+        except ValueError as e:
+            return str(e)
+
+    def assert_same_lookups(self, queries):
+        minidom_editor, lxml_editor = self.editors
+        for query in queries:
+            self.assertEqual(
+                self.lookup(lxml_editor, query),
+                self.lookup(minidom_editor, query),
+                query,
+            )
+
+    def saved_documents(self):
+        documents = []
+        for editor in self.editors:
+            editor.save()
+            tree = lxml.etree.parse(str(editor.xml_path))
+            documents.append(lxml.etree.tostring(tree, method="c14n"))
+        return documents
+
+    def test_lookups_match(self):
+        self.assert_same_lookups(QUERIES)
+        lxml_editor = self.editors[1]
+        node = lxml_editor.get_node("w:ins", attrs={"w:id": "1"})
+        self.assertEqual(
+            self.describe(lxml_editor, node),
+            ("ins", ["1", "A"], "inserted “text”"),
+        )
+
+    def test_lookups_match_after_edits(self):
+        # Build the indexes before editing, so stale entries would show up
+        self.assert_same_lookups(QUERIES)
+        for editor in self.editors:
+            run = editor.get_node("w:r", contains="The first")
+            editor.replace_node(
+                run, "<w:r><w:t>The edited</w:t></w:r><w:r><w:t>paragraph</w:t></w:r>"
+            )
+            paragraph = editor.get_node("w:p", attrs={"w14:paraId": "00000002"})
+            editor.insert_after(
+                paragraph,
+                '<!-- added --><w:p w14:paraId="00000004">'
+                '<w:ins w:id="3"><w:r><w:t>added</w:t></w:r></w:ins></w:p>',
+            )
+            deletion = editor.get_node("w:del", attrs={"w:id": "2"})
+            editor.insert_before(
+                deletion, '<w:ins w:id="4"><w:r><w:t>before</w:t></w:r></w:ins>'
+            )
+            editor.append_to(editor.get_node("w:body"), '<w:sectPr w:rsidR="1"/>')
+
+        self.assert_same_lookups(
+            QUERIES
+            + [
+                {"tag": "w:p", "attrs": {"w14:paraId": "00000004"}},
+                {"tag": "w:ins", "attrs": {"w:id": "3"}},
+                {"tag": "w:ins", "contains": "before"},
+                {"tag": "w:p", "contains": "The edited"},
+                {"tag": "w:r", "contains": "The first"},
+                {"tag": "w:r", "line_number": 5, "contains": "edited"},
+                {"tag": "w:sectPr", "attrs": {"w:rsidR": "1"}},
+            ]
+        )
+        minidom_document, lxml_document = self.saved_documents()
+        self.assertEqual(lxml_document, minidom_document)
+
+    def test_fragment_text_and_comments_are_kept(self):
+        for editor in self.editors:
+            run = editor.get_node("w:r", contains="Third")
+            editor.replace_node(
+                run, " lead <!-- note --><w:r><w:t>New</w:t></w:r> tail "
+            )
+            paragraph = editor.get_node("w:p", attrs={"w14:paraId": "00000001"})
+            editor.append_to(
+                paragraph, "<!-- first -->\n<w:r><w:t>Appended</w:t></w:r>"
+            )
+
+        minidom_document, lxml_document = self.saved_documents()
+        self.assertIn(
+            b" lead <!-- note --><w:r><w:t>New</w:t></w:r> tail ", lxml_document
+        )
+        self.assertIn(
+            b"<!-- first -->\n<w:r><w:t>Appended</w:t></w:r>", lxml_document
+        )
+        self.assertEqual(lxml_document, minidom_document)
+
+    def test_get_next_rid(self):
+        for engine in (XMLEditor, LxmlXMLEditor):
+            path = Path(self.temp_dir.name) / f"{engine.__name__}.rels"
+            path.write_text(
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                '<Relationship Id="rId3" Type="t" Target="a"/></Relationships>',
+                encoding="utf-8",
+            )
+            editor = engine(path)
+            self.assertEqual(editor.get_next_rid(), "rId4")
+            editor.append_to(
+                editor.get_node("Relationships"),
+                '<Relationship Id="rId9" Type="t" Target="b"/>',
+            )
+            self.assertEqual(editor.get_next_rid(), "rId10")
+
+
+if __name__ == "__main__":
+    unittest.main()
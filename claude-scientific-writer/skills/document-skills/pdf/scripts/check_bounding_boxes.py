@@ -2,6 +2,8 @@ from dataclasses import dataclass
 import json
 import sys
 
+from rect_overlap import candidate_pairs
+
 
 # Script to check that the `fields.json` file that Claude creates when analyzing PDFs
 # does not have overlapping bounding boxes. See forms.md.
@@ -30,12 +32,20 @@ def get_bounding_box_messages(fields_json_stream) -> list[str]:
         rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
         rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
 
+    # Sweep for boxes whose extents meet (per page), in the order of the original all-pairs loop
+    by_page = {}
+    for i, r in enumerate(rects_and_fields):
+        by_page.setdefault(r.field["page_number"], []).append(i)
+    candidates = {}
+    for indices in by_page.values():
+        for a, b in candidate_pairs([rects_and_fields[i].rect for i in indices]):
+            candidates.setdefault(indices[a], []).append(indices[b])
+
     has_error = False
     for i, ri in enumerate(rects_and_fields):
-        # This is O(N^2); we can optimize if it becomes a problem.
-        for j in range(i + 1, len(rects_and_fields)):
+        for j in sorted(candidates.get(i, [])):
             rj = rects_and_fields[j]
-            if ri.field["page_number"] == rj.field["page_number"] and rects_intersect(ri.rect, rj.rect):
+            if rects_intersect(ri.rect, rj.rect):
                 has_error = True
                 if ri.field is rj.field:
                     messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
@@ -220,7 +220,39 @@ class TestGetBoundingBoxMessages(unittest.TestCase):
         messages = get_bounding_box_messages(stream)
         self.assertTrue(any("SUCCESS" in msg for msg in messages))
         self.assertFalse(any("FAILURE" in msg for msg in messages))
-    
+
+    def test_failures_reported_in_field_order(self):
+        """Test that failures come out in field order regardless of box positions"""
+        data = {
+            "form_fields": [
+                {
+                    "description": "Right",
+                    "page_number": 1,
+                    "label_bounding_box": [300, 10, 350, 30],
+                    "entry_bounding_box": [340, 10, 400, 30]  # Overlaps its label
+                },
+                {
+                    "description": "Left",
+                    "page_number": 1,
+                    "label_bounding_box": [10, 10, 50, 30],
+                    "entry_bounding_box": [40, 10, 100, 30]  # Overlaps its label
+                },
+                {
+                    "description": "Other page",
+                    "page_number": 2,
+                    "label_bounding_box": [10, 10, 50, 30],  # Same box as "Left", different page
+                    "entry_bounding_box": [60, 10, 150, 30]
+                }
+            ]
+        }
+
+        stream = self.create_json_stream(data)
+        messages = get_bounding_box_messages(stream)
+        failures = [msg for msg in messages if "FAILURE" in msg]
+        self.assertEqual(len(failures), 2)
+        self.assertIn("`Right`", failures[0])
+        self.assertIn("`Left`", failures[1])
+
 
 if __name__ == '__main__':
     unittest.main()
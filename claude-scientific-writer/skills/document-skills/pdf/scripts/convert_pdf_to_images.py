@@ -1,29 +1,27 @@
 import os
 import sys
 
-from pdf2image import convert_from_path
+from pdf_rasterizer import literal_pattern, rasterize_pdf
 
 
 # Converts each page of a PDF to a PNG image.
 
 
 def convert(pdf_path, output_dir, max_dim=1000):
-    images = convert_from_path(pdf_path, dpi=200)
-
-    for i, image in enumerate(images):
-        # Scale image if needed to keep width/height under `max_dim`
-        width, height = image.size
-        if width > max_dim or height > max_dim:
-            scale_factor = min(max_dim / width, max_dim / height)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height))
-        
-        image_path = os.path.join(output_dir, f"page_{i+1}.png")
-        image.save(image_path)
-        print(f"Saved page {i+1} as {image_path} (size: {image.size})")
-
-    print(f"Converted {len(images)} pages to PNG images")
+    # Pages are rendered straight at the size that fits within `max_dim`,
+    # across worker processes, and written to disk one at a time
+    def report(page):
+        print(f"Saved page {page.number} as {page.path} (size: {page.size})")
+
+    pages = rasterize_pdf(
+        pdf_path,
+        os.path.join(literal_pattern(output_dir), "page_{page}.png"),
+        dpi=200,
+        max_dim=max_dim,
+        on_page=report,
+    )
+
+    print(f"Converted {len(pages)} pages to PNG images")
 
 
 if __name__ == "__main__":
@@ -60,6 +60,16 @@ def make_field_dict(field, field_id):
 #   },
 # ]
 def get_field_info(reader: PdfReader):
+    field_info, _ = get_field_info_and_widgets(reader)
+    return field_info
+
+
+# Like `get_field_info`, but also returns where each field's widget annotations
+# are, from the same walk over the page annotations:
+# {field_id: [(page index, index in the page's /Annots), ...]}
+# The positions are the same in a PdfWriter cloned from the reader, so the
+# fields can be filled without searching the annotations again.
+def get_field_info_and_widgets(reader: PdfReader):
     fields = reader.get_fields()
 
     field_info_by_id = {}
@@ -80,11 +90,15 @@ def get_field_info(reader: PdfReader):
     # all choices have the same field name.
     # See https://westhealth.github.io/exploring-fillable-forms-with-pdfrw.html
     radio_fields_by_id = {}
+    widgets_by_id = {}
 
     for page_index, page in enumerate(reader.pages):
         annotations = page.get('/Annots', [])
-        for ann in annotations:
+        for ann_index, ann in enumerate(annotations):
+            ann = ann.get_object()
             field_id = get_full_annotation_field_id(ann)
+            if field_id in field_info_by_id or field_id in possible_radio_names:
+                widgets_by_id.setdefault(field_id, []).append((page_index, ann_index))
             if field_id in field_info_by_id:
                 field_info_by_id[field_id]["page"] = page_index + 1
                 field_info_by_id[field_id]["rect"] = ann.get('/Rect')
@@ -134,7 +148,7 @@ def get_field_info(reader: PdfReader):
     sorted_fields = fields_with_location + list(radio_fields_by_id.values())
     sorted_fields.sort(key=sort_key)
 
-    return sorted_fields
+    return sorted_fields, widgets_by_id
 
 
 def write_field_info(pdf_path: str, json_output_path: str):
@@ -1,34 +1,65 @@
 import json
+import os
 import sys
+from typing import NamedTuple
 
 from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, NameObject
 
-from extract_form_field_info import get_field_info
+from extract_form_field_info import get_field_info_and_widgets
 
 
 # Fills fillable form fields in a PDF. See forms.md.
 
 
+# A parsed template PDF with its fields indexed by ID, so that any number of
+# value files can be validated and filled against it without parsing it again.
+class FormTemplate(NamedTuple):
+    reader: PdfReader
+    fields_by_ids: dict
+    # {field_id: [(page index, annotation index), ...]}, see `get_field_info_and_widgets`
+    widgets_by_id: dict
+
+
+def load_template(input_pdf_path: str) -> FormTemplate:
+    reader = PdfReader(input_pdf_path)
+    field_info, widgets_by_id = get_field_info_and_widgets(reader)
+    return FormTemplate(reader, {f["field_id"]: f for f in field_info}, widgets_by_id)
+
+
 def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path: str):
+    if not fill_from_template(load_template(input_pdf_path), fields_json_path, output_pdf_path):
+        sys.exit(1)
+
+
+# Fills the template once for each values file, writing `<values file name>.pdf`
+# files to `output_dir`. Value files with errors are reported and skipped.
+def fill_pdf_fields_bulk(input_pdf_path: str, fields_json_paths: list, output_dir: str):
+    template = load_template(input_pdf_path)
+    os.makedirs(output_dir, exist_ok=True)
+    failed = 0
+    for fields_json_path in fields_json_paths:
+        name = os.path.splitext(os.path.basename(fields_json_path))[0]
+        output_pdf_path = os.path.join(output_dir, name + ".pdf")
+        if fill_from_template(template, fields_json_path, output_pdf_path):
+            print(f"Wrote {output_pdf_path}")
+        else:
+            print(f"Skipped {output_pdf_path}; fix the errors above in {fields_json_path}")
+            failed += 1
+    if failed:
+        print(f"{failed} of {len(fields_json_paths)} value files had errors")
+        sys.exit(1)
+
+
+# Validates the values in `fields_json_path` and writes the filled PDF.
+# Returns False (after printing the errors) if any field ID, page or value is invalid.
+def fill_from_template(template: FormTemplate, fields_json_path: str, output_pdf_path: str) -> bool:
     with open(fields_json_path) as f:
         fields = json.load(f)
-    # Group by page number.
-    fields_by_page = {}
-    for field in fields:
-        if "value" in field:
-            field_id = field["field_id"]
-            page = field["page"]
-            if page not in fields_by_page:
-                fields_by_page[page] = {}
-            fields_by_page[page][field_id] = field["value"]
-    
-    reader = PdfReader(input_pdf_path)
 
     has_error = False
-    field_info = get_field_info(reader)
-    fields_by_ids = {f["field_id"]: f for f in field_info}
     for field in fields:
-        existing_field = fields_by_ids.get(field["field_id"])
+        existing_field = template.fields_by_ids.get(field["field_id"])
         if not existing_field:
             has_error = True
             print(f"ERROR: `{field['field_id']}` is not a valid field ID")
@@ -42,18 +73,41 @@ def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path:
                     print(err)
                     has_error = True
     if has_error:
-        sys.exit(1)
+        return False
 
-    writer = PdfWriter(clone_from=reader)
-    for page, field_values in fields_by_page.items():
-        writer.update_page_form_field_values(writer.pages[page - 1], field_values, auto_regenerate=False)
+    writer = PdfWriter(clone_from=template.reader)
+    for field in fields:
+        if "value" in field:
+            field_id = field["field_id"]
+            update_field_value(writer, template.widgets_by_id[field_id], field_id, field["value"])
 
     # This seems to be necessary for many PDF viewers to format the form values correctly.
     # It may cause the viewer to show a "save changes" dialog even if the user doesn't make any changes.
     writer.set_need_appearances_writer(True)
-    
+
     with open(output_pdf_path, "wb") as f:
         writer.write(f)
+    return True
+
+
+# pypdf's `update_page_form_field_values` compares every annotation on the page with every
+# field it is given, so filling a page with N fields takes N^2 comparisons. Instead, the page's
+# /Annots is temporarily replaced with just this field's widgets (found once when the template
+# was loaded), and pypdf is called with only this field.
+def update_field_value(writer: PdfWriter, widgets: list, field_id: str, value):
+    annotation_indexes_by_page = {}
+    for page_index, annotation_index in widgets:
+        annotation_indexes_by_page.setdefault(page_index, []).append(annotation_index)
+
+    for page_index, annotation_indexes in annotation_indexes_by_page.items():
+        page = writer.pages[page_index]
+        original_annotations = page.raw_get("/Annots")
+        annotations = page["/Annots"]
+        page[NameObject("/Annots")] = ArrayObject(annotations[i] for i in annotation_indexes)
+        try:
+            writer.update_page_form_field_values(page, {field_id: value}, auto_regenerate=None)
+        finally:
+            page[NameObject("/Annots")] = original_annotations
 
 
 def validation_error_for_field_value(field_info, field_value):
@@ -104,8 +158,13 @@ def monkeypatch_pydpf_method():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) >= 5 and sys.argv[1] == "--bulk":
+        monkeypatch_pydpf_method()
+        fill_pdf_fields_bulk(sys.argv[2], sys.argv[4:], sys.argv[3])
+        sys.exit(0)
     if len(sys.argv) != 4:
         print("Usage: fill_fillable_fields.py [input pdf] [field_values.json] [output pdf]")
+        print("       fill_fillable_fields.py --bulk [input pdf] [output dir] [field_values.json]...")
         sys.exit(1)
     monkeypatch_pydpf_method()
     input_pdf = sys.argv[1]
@@ -0,0 +1,149 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from pypdf import PdfReader, PdfWriter
+
+from fill_fillable_fields import load_template, update_field_value
+
+try:
+    import pymupdf
+except ImportError:
+    try:
+        import fitz as pymupdf
+    except ImportError:
+        pymupdf = None
+
+SCRIPT = Path(__file__).resolve().parent / "fill_fillable_fields.py"
+
+VALUES = {
+    "ada": [
+        {"field_id": "name", "page": 1, "value": "Ada Lovelace"},
+        {"field_id": "agree", "page": 1, "value": "/Yes"},
+        {"field_id": "color", "page": 1, "value": "green"},
+        {"field_id": "city", "page": 2, "value": "London"},
+    ],
+    "alan": [
+        {"field_id": "name", "page": 1, "value": "Alan Turing"},
+        {"field_id": "agree", "page": 1, "value": "/Off"},
+        {"field_id": "color", "page": 1, "value": "blue"},
+        {"field_id": "notes", "page": 2, "value": "Bletchley"},
+    ],
+}
+
+
+def add_widget(page, field_type, name, rect, **attributes):
+    widget = pymupdf.Widget()
+    widget.field_type = field_type
+    widget.field_name = name
+    widget.rect = pymupdf.Rect(rect)
+    for attribute, value in attributes.items():
+        setattr(widget, attribute, value)
+    page.add_widget(widget)
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+@unittest.skipIf(pymupdf is None, "PyMuPDF is needed to build the test form")
+class TestFillFillableFields(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.temp_path = Path(self.temp_dir.name)
+
+        self.form_path = self.temp_path / "form.pdf"
+        with pymupdf.open() as doc:
+            page = doc.new_page()
+            add_widget(page, pymupdf.PDF_WIDGET_TYPE_TEXT, "name", (50, 50, 250, 70))
+            add_widget(page, pymupdf.PDF_WIDGET_TYPE_CHECKBOX, "agree", (50, 90, 65, 105))
+            add_widget(
+                page,
+                pymupdf.PDF_WIDGET_TYPE_COMBOBOX,
+                "color",
+                (50, 120, 250, 140),
+                choice_values=[["red", "Red"], ["green", "Green"], ["blue", "Blue"]],
+            )
+            page = doc.new_page()
+            add_widget(page, pymupdf.PDF_WIDGET_TYPE_TEXT, "city", (50, 50, 250, 70))
+            add_widget(page, pymupdf.PDF_WIDGET_TYPE_TEXT, "notes", (50, 90, 250, 110))
+            doc.save(str(self.form_path))
+
+        self.values_paths = []
+        for name, values in VALUES.items():
+            path = self.temp_path / f"{name}.json"
+            path.write_text(json.dumps(values))
+            self.values_paths.append(path)
+
+    def run_script(self, *args):
+        result = subprocess.run(
+            [sys.executable, str(SCRIPT), *map(str, args)],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+    def filled_fields(self, pdf_path):
+        """Each widget's field name, value and appearance state, page by page."""
+        reader = PdfReader(pdf_path)
+        return [
+            [
+                (
+                    annotation.get("/T"),
+                    annotation.get("/V"),
+                    annotation.get("/AS"),
+                )
+                for annotation in (a.get_object() for a in page.get("/Annots", []))
+            ]
+            for page in reader.pages
+        ]
+
+    def test_bulk_output_matches_single_file_output(self):
+        bulk_dir = self.temp_path / "bulk"
+        self.run_script("--bulk", self.form_path, bulk_dir, *self.values_paths)
+
+        for values_path in self.values_paths:
+            single_path = self.temp_path / f"{values_path.stem}-single.pdf"
+            self.run_script(self.form_path, values_path, single_path)
+            bulk_path = bulk_dir / f"{values_path.stem}.pdf"
+            self.assertEqual(
+                self.filled_fields(bulk_path), self.filled_fields(single_path)
+            )
+
+        fields = PdfReader(bulk_dir / "ada.pdf").get_fields()
+        self.assertEqual(fields["name"]["/V"], "Ada Lovelace")
+        self.assertEqual(fields["agree"]["/V"], "/Yes")
+        self.assertEqual(fields["color"]["/V"], "green")
+        self.assertEqual(fields["city"]["/V"], "London")
+        self.assertNotEqual(fields["notes"].get("/V"), "Bletchley")
+        fields = PdfReader(bulk_dir / "alan.pdf").get_fields()
+        self.assertEqual(fields["name"]["/V"], "Alan Turing")
+        self.assertEqual(fields["notes"]["/V"], "Bletchley")
+        # Filling one values file leaves nothing behind in the shared template
+        self.assertNotEqual(fields["city"].get("/V"), "London")
+
+    def test_annots_restored_when_filling_fails(self):
+        template = load_template(str(self.form_path))
+        writer = PdfWriter(clone_from=template.reader)
+        page = writer.pages[0]
+        original_annotations = page.raw_get("/Annots")
+        widgets = template.widgets_by_id["color"]
+
+        with mock.patch.object(
+            writer, "update_page_form_field_values", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                update_field_value(writer, widgets, "color", "red")
+        self.assertIs(page.raw_get("/Annots"), original_annotations)
+        self.assertEqual(len(page["/Annots"]), 3)
+
+        update_field_value(writer, widgets, "color", "red")
+        self.assertIs(page.raw_get("/Annots"), original_annotations)
+        self.assertEqual(len(page["/Annots"]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
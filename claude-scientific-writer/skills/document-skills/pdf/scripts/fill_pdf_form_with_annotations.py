@@ -1,4 +1,5 @@
 import json
+import os
 import sys
 
 from pypdf import PdfReader, PdfWriter
@@ -27,31 +28,63 @@ def transform_coordinates(bbox, image_width, image_height, pdf_width, pdf_height
 
 def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
     """Fill the PDF form with data from fields.json"""
+    reader = PdfReader(input_pdf_path)
+    fill_from_reader(reader, get_pdf_dimensions(reader), fields_json_path, output_pdf_path)
+
+
+def fill_pdf_forms_bulk(input_pdf_path, fields_json_paths, output_dir):
+    """Fill the same PDF once for each fields.json, parsing the PDF only once.
+
+    Writes `<fields file name>.pdf` files to output_dir.
+    """
+    reader = PdfReader(input_pdf_path)
+    pdf_dimensions = get_pdf_dimensions(reader)
+    os.makedirs(output_dir, exist_ok=True)
+    for fields_json_path in fields_json_paths:
+        name = os.path.splitext(os.path.basename(fields_json_path))[0]
+        output_pdf_path = os.path.join(output_dir, name + ".pdf")
+        fill_from_reader(reader, pdf_dimensions, fields_json_path, output_pdf_path)
+
+
+def get_pdf_dimensions(reader):
+    """Get PDF dimensions for each page, by 1-based page number"""
+    pdf_dimensions = {}
+    for i, page in enumerate(reader.pages):
+        mediabox = page.mediabox
+        pdf_dimensions[i + 1] = [mediabox.width, mediabox.height]
+    return pdf_dimensions
+
+
+def fill_from_reader(reader, pdf_dimensions, fields_json_path, output_pdf_path):
+    """Add the annotations from fields.json to a copy of an already parsed PDF"""
     
     # `fields.json` format described in forms.md.
     with open(fields_json_path, "r") as f:
         fields_data = json.load(f)
     
-    # Open the PDF
-    reader = PdfReader(input_pdf_path)
     writer = PdfWriter()
     
     # Copy all pages to writer
     writer.append(reader)
     
-    # Get PDF dimensions for each page
-    pdf_dimensions = {}
-    for i, page in enumerate(reader.pages):
-        mediabox = page.mediabox
-        pdf_dimensions[i + 1] = [mediabox.width, mediabox.height]
+    # Index the page info once instead of searching it for every field
+    page_info_by_number = {p["page_number"]: p for p in fields_data["pages"]}
     
     # Process each form field
     annotations = []
     for field in fields_data["form_fields"]:
+        # Skip empty fields
+        if "entry_text" not in field or "text" not in field["entry_text"]:
+            continue
+        entry_text = field["entry_text"]
+        text = entry_text["text"]
+        if not text:
+            continue
+        
         page_num = field["page_number"]
         
         # Get page dimensions and transform coordinates.
-        page_info = next(p for p in fields_data["pages"] if p["page_number"] == page_num)
+        page_info = page_info_by_number[page_num]
         image_width = page_info["image_width"]
         image_height = page_info["image_height"]
         pdf_width, pdf_height = pdf_dimensions[page_num]
@@ -62,14 +95,6 @@ def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
             pdf_width, pdf_height
         )
         
-        # Skip empty fields
-        if "entry_text" not in field or "text" not in field["entry_text"]:
-            continue
-        entry_text = field["entry_text"]
-        text = entry_text["text"]
-        if not text:
-            continue
-        
         font_name = entry_text.get("font", "Arial")
         font_size = str(entry_text.get("font_size", 14)) + "pt"
         font_color = entry_text.get("font_color", "000000")
@@ -98,8 +123,12 @@ def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
 
 
 if __name__ == "__main__":
+    if len(sys.argv) >= 5 and sys.argv[1] == "--bulk":
+        fill_pdf_forms_bulk(sys.argv[2], sys.argv[4:], sys.argv[3])
+        sys.exit(0)
     if len(sys.argv) != 4:
         print("Usage: fill_pdf_form_with_annotations.py [input pdf] [fields.json] [output pdf]")
+        print("       fill_pdf_form_with_annotations.py --bulk [input pdf] [output dir] [fields.json]...")
         sys.exit(1)
     input_pdf = sys.argv[1]
     fields_json = sys.argv[2]
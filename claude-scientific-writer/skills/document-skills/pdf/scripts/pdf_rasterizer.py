@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Parallel, memory-bounded rasterization of PDF pages to image files.
+
+Shared by pdf/scripts/convert_pdf_to_images.py and
+scientific-slides/scripts/pdf_to_images.py; keep the two copies identical.
+
+Pages are split into contiguous ranges that are rendered across a pool of
+worker processes. Each worker opens the PDF once and writes every page to disk
+as soon as it is rendered, so only about one page per worker is in memory at a
+time, however long the document is.
+
+With PyMuPDF, a max_dim limit is turned into the zoom for each page before
+rendering, rather than rendering at full resolution and downscaling. Without
+PyMuPDF, pdf2image (poppler) is used: pages are rendered at the requested DPI
+to a temporary folder and downscaled one at a time.
+
+Usage:
+    from pdf_rasterizer import literal_pattern, rasterize_pdf
+
+    pages = rasterize_pdf("doc.pdf", "out/page_{page}.png", dpi=200, max_dim=1000)
+    for page in pages:
+        print(page.number, page.path, page.size)
+
+    # Braces in a directory or prefix must be escaped in the pattern
+    pages = rasterize_pdf(pdf, literal_pattern(prefix) + "-{page:03d}.jpg")
+"""
+
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+try:
+    import pymupdf
+except ImportError:
+    try:
+        import fitz as pymupdf  # PyMuPDF before 1.24
+    except ImportError:
+        pymupdf = None
+
+# Below this many pages, starting worker processes costs more than it saves
+PARALLEL_MIN_PAGES = 4
+
+# Ranges handed out per worker, so a few slow pages don't leave workers idle
+RANGES_PER_WORKER = 4
+
+IMAGE_FORMATS = {"png": "png", "jpg": "jpeg", "jpeg": "jpeg"}
+
+
+class RenderedPage(NamedTuple):
+    number: int  # 1-based page number
+    path: Path
+    size: Tuple[int, int]  # (width, height) in pixels
+
+
+def rasterize_pdf(
+    pdf_path,
+    output_pattern: str,
+    dpi: int = 150,
+    max_dim: Optional[int] = None,
+    first_page: Optional[int] = None,
+    last_page: Optional[int] = None,
+    jobs: Optional[int] = None,
+    on_page: Optional[Callable[[RenderedPage], None]] = None,
+) -> List[RenderedPage]:
+    """Render PDF pages to image files.
+
+    Args:
+        pdf_path: PDF to render
+        output_pattern: Path for each image, formatted with the 1-based page
+            number, e.g. "out/page_{page}.png" or "slides-{page:03d}.jpg". The
+            extension selects the format (png, jpg or jpeg). Literal braces
+            must be doubled; see literal_pattern.
+        dpi: Resolution to render at
+        max_dim: If given, pages are scaled down (never up) so that neither
+            side exceeds max_dim pixels
+        first_page: First page to render (1-based, default: 1)
+        last_page: Last page to render (1-based, inclusive, default: last)
+        jobs: Worker processes (default: CPU count)
+        on_page: Optional callback, called for each page in page order, as
+            soon as its range and every earlier range have finished
+
+    Returns:
+        RenderedPage for every rendered page, in page order
+
+    Raises:
+        ValueError: If the output format is not supported
+    """
+    sample_path = Path(output_pattern.format(page=1))
+    image_format = sample_path.suffix.lower().lstrip(".")
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported format: {image_format}. Use jpg or png.")
+
+    page_count = _page_count(pdf_path)
+    start = max(first_page or 1, 1)
+    end = min(last_page or page_count, page_count)
+    if start > end:
+        return []
+
+    sample_path.parent.mkdir(parents=True, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    ranges = _split_range(start, end, jobs * RANGES_PER_WORKER)
+    tasks = [(str(pdf_path), output_pattern, dpi, max_dim, a, b) for a, b in ranges]
+
+    pages = []
+    if jobs == 1 or end - start + 1 < PARALLEL_MIN_PAGES:
+        for task in tasks:
+            pages.extend(_report(_render_range(task), on_page))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+            futures = [executor.submit(_render_range, task) for task in tasks]
+            # Ranges are in page order; a range that finishes early waits for
+            # the ones before it, so on_page sees the same order as with jobs=1
+            for future in futures:
+                pages.extend(_report(future.result(), on_page))
+
+    return pages
+
+
+def literal_pattern(text) -> str:
+    """Escape text, such as an output directory or prefix, for an output_pattern."""
+    return str(text).replace("{", "{{").replace("}", "}}")
+
+
+def _report(pages, on_page):
+    if on_page:
+        for page in pages:
+            on_page(page)
+    return pages
+
+
+def _split_range(start, end, parts):
+    """Split pages start..end (inclusive) into at most parts contiguous ranges."""
+    size = max(1, math.ceil((end - start + 1) / parts))
+    return [(a, min(a + size - 1, end)) for a in range(start, end + 1, size)]
+
+
+def _page_count(pdf_path):
+    if pymupdf is not None:
+        with pymupdf.open(pdf_path) as doc:
+            return doc.page_count
+
+    from pdf2image import pdfinfo_from_path
+
+    return pdfinfo_from_path(str(pdf_path))["Pages"]
+
+
+def _render_range(task):
+    """Worker: render pages first..last of a PDF; return their RenderedPages."""
+    if pymupdf is not None:
+        return _render_range_pymupdf(*task)
+    return _render_range_pdf2image(*task)
+
+
+def _render_range_pymupdf(pdf_path, output_pattern, dpi, max_dim, first, last):
+    output = IMAGE_FORMATS[
+        Path(output_pattern.format(page=first)).suffix.lower().lstrip(".")
+    ]
+    pages = []
+    with pymupdf.open(pdf_path) as doc:
+        for number in range(first, last + 1):
+            page = doc[number - 1]
+            zoom = _zoom(page.rect.width, page.rect.height, dpi, max_dim)
+            pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom))
+            # Rounding the page box out to whole pixels can add one
+            while max_dim and max(pixmap.width, pixmap.height) > max_dim:
+                zoom *= 0.999
+                pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom))
+
+            path = Path(output_pattern.format(page=number))
+            pixmap.save(str(path), output=output)
+            pages.append(RenderedPage(number, path, (pixmap.width, pixmap.height)))
+            del pixmap
+    return pages
+
+
+def _zoom(width_pt, height_pt, dpi, max_dim):
+    """Zoom that renders a page at dpi, or smaller to fit within max_dim."""
+    zoom = dpi / 72
+    if max_dim:
+        zoom = min(zoom, max_dim / width_pt, max_dim / height_pt)
+    return zoom
+
+
+def _render_range_pdf2image(pdf_path, output_pattern, dpi, max_dim, first, last):
+    from pdf2image import convert_from_path
+    from PIL import Image
+
+    pages = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # pdftoppm writes each page to disk as it goes; they are then loaded
+        # one at a time
+        rendered = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=first,
+            last_page=last,
+            output_folder=temp_dir,
+            fmt="png",
+            paths_only=True,
+        )
+        for number, rendered_path in zip(range(first, last + 1), sorted(rendered)):
+            with Image.open(rendered_path) as image:
+                width, height = image.size
+                if max_dim and (width > max_dim or height > max_dim):
+                    scale_factor = min(max_dim / width, max_dim / height)
+                    image = image.resize(
+                        (int(width * scale_factor), int(height * scale_factor))
+                    )
+                path = Path(output_pattern.format(page=number))
+                image.save(path)
+                pages.append(RenderedPage(number, path, image.size))
+            os.unlink(rendered_path)
+    return pages
@@ -0,0 +1,87 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from pdf_rasterizer import literal_pattern, pymupdf, rasterize_pdf
+
+# (width, height) in points: letter portrait, A4 landscape, and a tall strip
+PAGE_SIZES = [(612, 792), (842, 595), (200, 900)] * 3
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+@unittest.skipIf(pymupdf is None, "PyMuPDF is not installed")
+class TestRasterizePdf(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.temp_path = Path(self.temp_dir.name)
+        self.pdf_path = self.temp_path / "doc.pdf"
+        with pymupdf.open() as doc:
+            for number, (width, height) in enumerate(PAGE_SIZES, start=1):
+                page = doc.new_page(width=width, height=height)
+                page.insert_text((20, 40), f"Page {number}")
+            doc.save(str(self.pdf_path))
+
+    def rasterize(self, directory, jobs, **kwargs):
+        """Rasterize into directory; return (pages, pages passed to on_page)."""
+        reported = []
+        prefix = self.temp_path / directory / "deck{}"
+        pages = rasterize_pdf(
+            self.pdf_path,
+            literal_pattern(prefix) + "-{page:03d}.png",
+            jobs=jobs,
+            on_page=reported.append,
+            **kwargs,
+        )
+        return pages, reported
+
+    def test_max_dim_caps_longer_side(self):
+        pages, _ = self.rasterize("capped", jobs=1, dpi=200, max_dim=300)
+        self.assertEqual(len(pages), len(PAGE_SIZES))
+        for page, (width, height) in zip(pages, PAGE_SIZES):
+            with Image.open(page.path) as image:
+                self.assertEqual(image.size, page.size)
+            self.assertLessEqual(max(page.size), 300)
+            self.assertGreaterEqual(max(page.size), 298)
+            # Aspect ratio is kept
+            self.assertAlmostEqual(
+                page.size[0] / page.size[1], width / height, delta=0.02
+            )
+
+        # Pages already smaller than max_dim are not scaled up
+        pages, _ = self.rasterize("uncapped", jobs=1, dpi=72, max_dim=5000)
+        self.assertEqual(pages[0].size, (612, 792))
+
+    def test_parallel_run_writes_same_files(self):
+        serial, serial_reported = self.rasterize("serial", jobs=1, max_dim=200)
+        parallel, parallel_reported = self.rasterize("parallel", jobs=2, max_dim=200)
+
+        names = [page.path.name for page in serial]
+        self.assertEqual(names[0], "deck{}-001.png")
+        self.assertEqual([page.path.name for page in parallel], names)
+        self.assertEqual(
+            sorted(path.name for path in (self.temp_path / "parallel").iterdir()),
+            names,
+        )
+        self.assertEqual(
+            [page.size for page in parallel], [page.size for page in serial]
+        )
+
+        # on_page is called in page order in both modes
+        numbers = list(range(1, len(PAGE_SIZES) + 1))
+        self.assertEqual([page.number for page in serial_reported], numbers)
+        self.assertEqual([page.number for page in parallel_reported], numbers)
+
+    def test_page_range(self):
+        pages, reported = self.rasterize(
+            "range", jobs=2, max_dim=100, first_page=3, last_page=8
+        )
+        self.assertEqual([page.number for page in pages], [3, 4, 5, 6, 7, 8])
+        self.assertEqual(reported, pages)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,28 +4,73 @@ Tool to pack a directory into a .docx, .pptx, or .xlsx file with XML formatting
 
 Example usage:
     python pack.py <input_directory> <office_file> [--force]
+
+    # Only recompress the listed parts, copying everything else from the original
+    python pack.py <input_directory> <office_file> --original <original_file> --dirty word/document.xml
 """
 
 import argparse
-import shutil
-import subprocess
+import struct
 import sys
 import tempfile
 import defusedxml.minidom
 import zipfile
 from pathlib import Path
 
+# soffice_pool.py is shared by the docx, pptx and xlsx skills
+sys.path.append(str(Path(__file__).resolve().parents[3] / "shared"))
+from soffice_pool import convert_document
+
+# Media formats that are already compressed; deflating them again only costs CPU
+STORED_EXTENSIONS = {
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".tif",
+    ".tiff",
+    ".wdp",
+    ".jxr",
+    ".mp3",
+    ".m4a",
+    ".mp4",
+    ".mov",
+    ".zip",
+}
+
+# copy_raw_member appends already-compressed data through ZipFile internals;
+# without them (a future Python), members are recompressed instead
+ZIPFILE_INTERNALS = ("structFileHeader", "sizeFileHeader", "stringFileHeader")
+ZIPFILE_WRITER_INTERNALS = ("fp", "start_dir", "filelist", "NameToInfo", "_didModify")
+
 
 def main():
     parser = argparse.ArgumentParser(description="Pack a directory into an Office file")
     parser.add_argument("input_directory", help="Unpacked Office document directory")
     parser.add_argument("output_file", help="Output Office file (.docx/.pptx/.xlsx)")
     parser.add_argument("--force", action="store_true", help="Skip validation")
+    parser.add_argument(
+        "--original",
+        help="Original Office file to copy unchanged parts from (requires --dirty)",
+    )
+    parser.add_argument(
+        "--dirty",
+        nargs="+",
+        metavar="PART",
+        help="Parts modified since unpacking, e.g. word/document.xml (requires --original)",
+    )
     args = parser.parse_args()
 
+    if (args.original is None) != (args.dirty is None):
+        parser.error("--original and --dirty must be used together")
+
     try:
         success = pack_document(
-            args.input_directory, args.output_file, validate=not args.force
+            args.input_directory,
+            args.output_file,
+            validate=not args.force,
+            original_file=args.original,
+            dirty_parts=args.dirty,
         )
 
         # Show warning if validation was skipped
@@ -42,13 +87,24 @@ def main():
         sys.exit(f"Error: {e}")
 
 
-def pack_document(input_dir, output_file, validate=False):
+def pack_document(
+    input_dir, output_file, validate=False, original_file=None, dirty_parts=None
+):
     """Pack a directory into an Office file (.docx/.pptx/.xlsx).
 
+    When both original_file and dirty_parts are given, the file is repacked
+    incrementally: only dirty parts and parts that are new since unpacking are
+    read from input_dir and compressed, while every other part is copied
+    from original_file as already-compressed bytes. Parts missing from
+    input_dir are dropped.
+
     Args:
         input_dir: Path to unpacked Office document directory
         output_file: Path to output Office file
         validate: If True, validates with soffice (default: False)
+        original_file: Optional Office file that input_dir was unpacked from
+        dirty_parts: Optional iterable of part names modified since unpacking
+            (e.g. "word/document.xml"), such as Document.dirty_parts
 
     Returns:
         bool: True if successful, False if validation failed
@@ -60,35 +116,148 @@ def pack_document(input_dir, output_file, validate=False):
         raise ValueError(f"{input_dir} is not a directory")
     if output_file.suffix.lower() not in {".docx", ".pptx", ".xlsx"}:
         raise ValueError(f"{output_file} must be a .docx, .pptx, or .xlsx file")
+    if (original_file is None) != (dirty_parts is None):
+        raise ValueError("original_file and dirty_parts must be given together")
+    if original_file is not None and not Path(original_file).is_file():
+        raise ValueError(f"{original_file} is not a file")
 
-    # Work in temporary directory to avoid modifying original
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_content_dir = Path(temp_dir) / "content"
-        shutil.copytree(input_dir, temp_content_dir)
-
-        # Process XML files to remove pretty-printing whitespace
-        for pattern in ["*.xml", "*.rels"]:
-            for xml_file in temp_content_dir.rglob(pattern):
-                condense_xml(xml_file)
-
-        # Create final Office file as zip archive
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    if original_file is not None:
+        # Write next to the output first, so the original may be overwritten in place
+        temp_output = output_file.with_name(f".{output_file.name}.tmp")
+        try:
+            with zipfile.ZipFile(temp_output, "w", zipfile.ZIP_DEFLATED) as zf:
+                write_incremental(zf, input_dir, Path(original_file), dirty_parts)
+            temp_output.replace(output_file)
+        finally:
+            temp_output.unlink(missing_ok=True)
+    else:
+        # Stream parts straight into the archive; the input directory is never modified
         with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
-            for f in temp_content_dir.rglob("*"):
+            for f in input_dir.rglob("*"):
                 if f.is_file():
-                    zf.write(f, f.relative_to(temp_content_dir))
+                    write_part(zf, f, f.relative_to(input_dir).as_posix())
 
-        # Validate if requested
-        if validate:
-            if not validate_document(output_file):
-                output_file.unlink()  # Delete the corrupt file
-                return False
+    # Validate if requested
+    if validate:
+        if not validate_document(output_file):
+            output_file.unlink()  # Delete the corrupt file
+            return False
 
     return True
 
 
+def write_part(zf, source_file, arcname):
+    """Write a single part of an unpacked Office file into an open archive.
+
+    XML and .rels parts are condensed in memory before being deflated. Binary
+    parts are copied byte for byte, and stored without recompression if they
+    are already compressed media.
+    """
+    if source_file.name.endswith((".xml", ".rels")):
+        zf.writestr(arcname, condense_xml_bytes(source_file.read_bytes()))
+    elif source_file.suffix.lower() in STORED_EXTENSIONS:
+        zf.write(source_file, arcname, compress_type=zipfile.ZIP_STORED)
+    else:
+        zf.write(source_file, arcname)
+
+
+def write_incremental(zf, input_dir, original_file, dirty_parts):
+    """Write parts into an open archive, reusing unchanged parts of original_file.
+
+    Parts are written in the original archive's order, followed by parts that
+    only exist in input_dir.
+    """
+    dirty = {Path(part).as_posix().lstrip("/") for part in dirty_parts}
+    current = {
+        f.relative_to(input_dir).as_posix(): f
+        for f in input_dir.rglob("*")
+        if f.is_file()
+    }
+
+    with zipfile.ZipFile(original_file, "r") as original:
+        for info in original.infolist():
+            source_file = current.pop(info.filename, None)
+            if source_file is None:
+                continue  # Directory entry, or part removed since unpacking
+            if info.filename in dirty:
+                write_part(zf, source_file, info.filename)
+            else:
+                copy_raw_member(original, zf, info)
+
+    # Parts added since unpacking (e.g. comments.xml, people.xml)
+    for arcname, source_file in current.items():
+        write_part(zf, source_file, arcname)
+
+
+def copy_raw_member(source_zip, target_zip, info):
+    """Copy a member between archives without decompressing and recompressing it.
+
+    Falls back to recompressing the member when the zipfile internals this
+    relies on are missing, or the member's local header is not as expected.
+    """
+    new_info = zipfile.ZipInfo(info.filename, info.date_time)
+    new_info.compress_type = info.compress_type
+    new_info.create_system = info.create_system
+    new_info.external_attr = info.external_attr
+
+    # Encrypted or unusually compressed members take the regular route, as
+    # does everything when the zipfile internals are not available
+    if (
+        not _supports_raw_copy(source_zip, target_zip)
+        or info.flag_bits & 0x1
+        or info.compress_type not in {zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED}
+    ):
+        target_zip.writestr(new_info, source_zip.read(info.filename))
+        return
+
+    # Locate the compressed data after the member's local file header
+    source_zip.fp.seek(info.header_offset)
+    header = source_zip.fp.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader:
+        target_zip.writestr(new_info, source_zip.read(info.filename))
+        return
+    file_header = struct.unpack(zipfile.structFileHeader, header)
+    filename_length, extra_length = file_header[-2], file_header[-1]
+    source_zip.fp.seek(filename_length + extra_length, 1)
+    data = source_zip.fp.read(info.compress_size)
+    if file_header[0] != zipfile.stringFileHeader or len(data) != info.compress_size:
+        target_zip.writestr(new_info, source_zip.read(info.filename))
+        return
+
+    # Sizes and CRC go in the local header, so no data descriptor is needed
+    new_info.flag_bits = info.flag_bits & ~0x08
+    new_info.CRC = info.CRC
+    new_info.compress_size = info.compress_size
+    new_info.file_size = info.file_size
+
+    # Append to the target the same way ZipFile.write does
+    new_info.header_offset = target_zip.fp.tell()
+    target_zip.fp.write(new_info.FileHeader())
+    target_zip.fp.write(data)
+    target_zip.start_dir = target_zip.fp.tell()
+    target_zip.filelist.append(new_info)
+    target_zip.NameToInfo[new_info.filename] = new_info
+    target_zip._didModify = True
+
+
+def _supports_raw_copy(source_zip, target_zip):
+    """Whether the zipfile internals copy_raw_member writes through exist."""
+    return (
+        all(hasattr(zipfile, name) for name in ZIPFILE_INTERNALS)
+        and hasattr(zipfile.ZipInfo, "FileHeader")
+        and hasattr(source_zip, "fp")
+        and all(hasattr(target_zip, name) for name in ZIPFILE_WRITER_INTERNALS)
+        # An open ZipFile.open(..., "w") handle owns the file position
+        and not getattr(target_zip, "_writing", False)
+    )
+
+
 def validate_document(doc_path):
-    """Validate document by converting to HTML with soffice."""
+    """Validate document by converting to HTML with soffice.
+
+    Uses the persistent soffice pool when one is running (see soffice_pool.py).
+    """
     # Determine the correct filter based on file extension
     match doc_path.suffix.lower():
         case ".docx":
@@ -100,29 +269,12 @@ def validate_document(doc_path):
 
     with tempfile.TemporaryDirectory() as temp_dir:
         try:
-            result = subprocess.run(
-                [
-                    "soffice",
-                    "--headless",
-                    "--convert-to",
-                    filter_name,
-                    "--outdir",
-                    temp_dir,
-                    str(doc_path),
-                ],
-                capture_output=True,
-                timeout=10,
-                text=True,
-            )
-            if not (Path(temp_dir) / f"{doc_path.stem}.html").exists():
-                error_msg = result.stderr.strip() or "Document validation failed"
-                print(f"Validation error: {error_msg}", file=sys.stderr)
-                return False
+            convert_document(doc_path, temp_dir, filter_name, timeout=10)
             return True
         except FileNotFoundError:
             print("Warning: soffice not found. Skipping validation.", file=sys.stderr)
             return True
-        except subprocess.TimeoutExpired:
+        except TimeoutError:
             print("Validation error: Timeout during conversion", file=sys.stderr)
             return False
         except Exception as e:
@@ -131,9 +283,21 @@ def validate_document(doc_path):
 
 
 def condense_xml(xml_file):
-    """Strip unnecessary whitespace and remove comments."""
-    with open(xml_file, "r", encoding="utf-8") as f:
-        dom = defusedxml.minidom.parse(f)
+    """Strip unnecessary whitespace and remove comments, rewriting the file."""
+    xml_file = Path(xml_file)
+    xml_file.write_bytes(condense_xml_bytes(xml_file.read_bytes()))
+
+
+def condense_xml_bytes(content):
+    """Strip unnecessary whitespace and remove comments from XML content.
+
+    Args:
+        content: XML document as bytes
+
+    Returns:
+        bytes: Condensed UTF-8 encoded XML document
+    """
+    dom = defusedxml.minidom.parseString(content)
 
     # Process each element to remove whitespace and comments
     for element in dom.getElementsByTagName("*"):
@@ -150,9 +314,7 @@ def condense_xml(xml_file):
             ) or child.nodeType == child.COMMENT_NODE:
                 element.removeChild(child)
 
-    # Write back the condensed XML
-    with open(xml_file, "wb") as f:
-        f.write(dom.toxml(encoding="UTF-8"))
+    return dom.toxml(encoding="UTF-8")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+import pack
+from pack import pack_document
+
+CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+  <Default Extension="xml" ContentType="application/xml"/>
+  <Default Extension="png" ContentType="image/png"/>
+  <Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>
+"""
+
+ROOT_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>
+"""
+
+DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:body>
+    <w:p><w:r><w:t>{text}</w:t></w:r></w:p>
+  </w:body>
+</w:document>
+"""
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestIncrementalRepack(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+
+        self.unpacked_dir = self.temp_path / "unpacked"
+        parts = {
+            "[Content_Types].xml": CONTENT_TYPES_XML.encode(),
+            "_rels/.rels": ROOT_RELS_XML.encode(),
+            "word/document.xml": DOCUMENT_XML.format(text="Original").encode(),
+            "word/media/image1.png": os.urandom(4096),
+            "word/styles.xml": ("<styles>" + "<style/>" * 500 + "</styles>").encode(),
+        }
+        for name, content in parts.items():
+            part_path = self.unpacked_dir / name
+            part_path.parent.mkdir(parents=True, exist_ok=True)
+            part_path.write_bytes(content)
+
+        self.original_file = self.temp_path / "original.docx"
+        pack_document(self.unpacked_dir, self.original_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def repack(self):
+        (self.unpacked_dir / "word/document.xml").write_text(
+            DOCUMENT_XML.format(text="Edited"), encoding="utf-8"
+        )
+        output_file = self.temp_path / "repacked.docx"
+        pack_document(
+            self.unpacked_dir,
+            output_file,
+            original_file=self.original_file,
+            dirty_parts=["word/document.xml"],
+        )
+        return output_file
+
+    def assert_repacked(self, output_file):
+        with zipfile.ZipFile(output_file) as repacked, zipfile.ZipFile(
+            self.original_file
+        ) as original:
+            self.assertIsNone(repacked.testzip())
+            self.assertEqual(repacked.namelist(), original.namelist())
+            self.assertIn(b"Edited", repacked.read("word/document.xml"))
+            for name in original.namelist():
+                if name != "word/document.xml":
+                    self.assertEqual(repacked.read(name), original.read(name), name)
+                    self.assertEqual(
+                        repacked.getinfo(name).compress_type,
+                        original.getinfo(name).compress_type,
+                        name,
+                    )
+
+    def test_unchanged_parts_are_copied_compressed(self):
+        output_file = self.repack()
+        self.assert_repacked(output_file)
+        with zipfile.ZipFile(output_file) as repacked, zipfile.ZipFile(
+            self.original_file
+        ) as original:
+            info = repacked.getinfo("word/styles.xml")
+            self.assertEqual(info.compress_size, original.getinfo("word/styles.xml").compress_size)
+            self.assertLess(info.compress_size, info.file_size)
+
+    def test_falls_back_without_zipfile_internals(self):
+        writestr = zipfile.ZipFile.writestr
+        with mock.patch.object(pack, "ZIPFILE_WRITER_INTERNALS", ("no_such_attribute",)):
+            with mock.patch.object(
+                zipfile.ZipFile, "writestr", autospec=True, side_effect=writestr
+            ) as spy:
+                output_file = self.repack()
+        # Every part was recompressed through the public API
+        written = {getattr(call.args[1], "filename", call.args[1]) for call in spy.call_args_list}
+        with zipfile.ZipFile(self.original_file) as original:
+            self.assertEqual(written, set(original.namelist()))
+        self.assert_repacked(output_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,14 +3,19 @@
 Command line tool to validate Office document XML files against XSD schemas and tracked changes.
 
 Usage:
-    python validate.py <dir> --original <original_file>
+    python validate.py <dir> --original <original_file> [--baseline-cache <cache_dir>] [--jobs N]
 """
 
 import argparse
 import sys
 from pathlib import Path
 
-from validation import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
+from validation import (
+    BaseSchemaValidator,
+    DOCXSchemaValidator,
+    PPTXSchemaValidator,
+    RedliningValidator,
+)
 
 
 def main():
@@ -24,6 +29,18 @@ def main():
         required=True,
         help="Path to original file (.docx/.pptx/.xlsx)",
     )
+    parser.add_argument(
+        "--baseline-cache",
+        metavar="DIR",
+        help="Directory to persist XSD errors of the original file across runs",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for per-part checks (default: 1)",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -55,7 +72,11 @@ def main():
     # Run validators
     success = True
     for V in validators:
-        validator = V(unpacked_dir, original_file, verbose=args.verbose)
+        kwargs = {"verbose": args.verbose}
+        if issubclass(V, BaseSchemaValidator):
+            kwargs["baseline_cache_dir"] = args.baseline_cache
+            kwargs["jobs"] = args.jobs
+        validator = V(unpacked_dir, original_file, **kwargs)
         if not validator.validate():
             success = False
 
@@ -0,0 +1,103 @@
+import contextlib
+import io
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from validation import DOCXSchemaValidator
+
+
+CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+  <Default Extension="xml" ContentType="application/xml"/>
+  <Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>
+"""
+
+ROOT_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>
+"""
+
+DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:body>
+    <w:p><w:r><w:t>First paragraph</w:t></w:r></w:p>
+    <w:p><w:r><w:t>Second paragraph</w:t></w:r></w:p>
+  </w:body>
+</w:document>
+"""
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestParseOnceValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        temp_path = Path(self.temp_dir.name)
+
+        parts = {
+            "[Content_Types].xml": CONTENT_TYPES_XML,
+            "_rels/.rels": ROOT_RELS_XML,
+            "word/document.xml": DOCUMENT_XML,
+        }
+
+        self.original_file = temp_path / "original.docx"
+        with zipfile.ZipFile(self.original_file, "w") as zf:
+            for name, content in parts.items():
+                zf.writestr(name, content)
+
+        self.unpacked_dir = temp_path / "unpacked"
+        for name, content in parts.items():
+            part_path = self.unpacked_dir / name
+            part_path.parent.mkdir(parents=True, exist_ok=True)
+            part_path.write_text(content, encoding="utf-8")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_validator(self):
+        validator = DOCXSchemaValidator(self.unpacked_dir, self.original_file)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = validator.validate()
+        return validator, result
+
+    def test_validation_passes(self):
+        """Test that an unmodified document validates cleanly"""
+        _, result = self.run_validator()
+        self.assertTrue(result)
+
+    def test_each_part_parsed_once(self):
+        """Test that every check shares a single parse of each part"""
+        validator, _ = self.run_validator()
+        parse_counts = validator.package.parse_counts
+        self.assertEqual(len(parse_counts), len(validator.xml_files))
+        self.assertTrue(all(count == 1 for count in parse_counts.values()))
+        self.assertEqual(validator.package.parse_count, len(validator.xml_files))
+
+    def test_unique_id_check_does_not_modify_tree(self):
+        """Test that skipping mc:AlternateContent leaves the shared tree intact"""
+        document_xml = self.unpacked_dir / "word" / "document.xml"
+        document_xml.write_text(
+            DOCUMENT_XML.replace(
+                "<w:body>",
+                '<w:body><mc:AlternateContent xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006">'
+                '<mc:Choice Requires="w14"><w:bookmarkStart w:id="1" w:name="a"/></mc:Choice>'
+                '</mc:AlternateContent><w:bookmarkStart w:id="1" w:name="b"/>',
+            ),
+            encoding="utf-8",
+        )
+        validator = DOCXSchemaValidator(self.unpacked_dir, self.original_file)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(validator.validate_unique_ids())
+        root = validator.package.get_root(document_xml)
+        self.assertEqual(
+            len(root.findall(f".//{{{validator.MC_NAMESPACE}}}AlternateContent")), 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
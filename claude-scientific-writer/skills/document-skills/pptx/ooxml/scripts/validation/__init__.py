@@ -4,12 +4,14 @@ Validation modules for Word document processing.
 
 from .base import BaseSchemaValidator
 from .docx import DOCXSchemaValidator
+from .package import OOXMLPackage
 from .pptx import PPTXSchemaValidator
 from .redlining import RedliningValidator
 
 __all__ = [
     "BaseSchemaValidator",
     "DOCXSchemaValidator",
+    "OOXMLPackage",
     "PPTXSchemaValidator",
     "RedliningValidator",
 ]
@@ -2,11 +2,56 @@
 Base validator with common validation logic for document files.
 """
 
+import hashlib
+import io
+import json
 import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import lxml.etree
 
+from .package import OOXMLPackage
+
+# Directory containing the bundled XSD schemas
+SCHEMAS_DIR = Path(__file__).parent.parent.parent / "schemas"
+
+# Process-wide cache of compiled XSD schemas, shared by all validator instances.
+# Maps resolved schema path -> (mtime_ns, lxml.etree.XMLSchema)
+_SCHEMA_CACHE = {}
+
+# Validator instance owned by each process pool worker (see run_part_checks)
+_worker_validator = None
+
+
+def _schema_fingerprint(schemas_dir):
+    """Return a digest of every schema file's path, size and mtime_ns.
+
+    Editing, adding or removing any schema changes the fingerprint, the same
+    staleness signal _SCHEMA_CACHE uses for compiled schemas.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(Path(schemas_dir).rglob("*")):
+        if path.is_file():
+            stat = path.stat()
+            relative = path.relative_to(schemas_dir).as_posix()
+            entry = f"{relative}\0{stat.st_size}\0{stat.st_mtime_ns}\n"
+            digest.update(entry.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _init_part_worker(validator_class, unpacked_dir, original_file, baseline_errors):
+    """Process pool initializer: build the worker's own validator."""
+    global _worker_validator
+    _worker_validator = validator_class(unpacked_dir, original_file)
+    _worker_validator._baseline_errors = baseline_errors
+
+
+def _run_part_checks_in_worker(xml_file):
+    """Process pool task: run the per-part checks for a single part."""
+    return _worker_validator._run_part_checks(Path(xml_file))
+
 
 class BaseSchemaValidator:
     """Base validator with common validation logic for document files."""
@@ -103,13 +148,40 @@ class BaseSchemaValidator:
         "http://www.w3.org/XML/1998/namespace",
     }
 
-    def __init__(self, unpacked_dir, original_file, verbose=False):
+    # Checks that only look at a single part, run as the map step of a parallel
+    # validation. Each name refers to a _check_<name>(xml_file) method.
+    # Checks that need more than one part (global IDs, relationships, content
+    # types) always run in the main process.
+    PART_CHECKS = ("namespaces", "xsd")
+
+    def __init__(
+        self,
+        unpacked_dir,
+        original_file,
+        verbose=False,
+        baseline_cache_dir=None,
+        jobs=1,
+    ):
         self.unpacked_dir = Path(unpacked_dir).resolve()
         self.original_file = Path(original_file)
         self.verbose = verbose
+        self.jobs = max(1, jobs or 1)
+
+        # Optional directory where baseline XSD errors of the original file are
+        # persisted, keyed by the original file's SHA-256 together with the
+        # validator class, its PART_CHECKS and a fingerprint of the schemas
+        self.baseline_cache_dir = (
+            Path(baseline_cache_dir) if baseline_cache_dir else None
+        )
+
+        # Lazily populated from the original file (see _get_original_file_errors)
+        self._original_parts = None
+        self._original_digest = None
+        self._baseline_errors = None
+        self._baseline_dirty = False
 
         # Set schemas directory
-        self.schemas_dir = Path(__file__).parent.parent.parent / "schemas"
+        self.schemas_dir = SCHEMAS_DIR
 
         # Get all XML and .rels files
         patterns = ["*.xml", "*.rels"]
@@ -120,10 +192,75 @@ class BaseSchemaValidator:
         if not self.xml_files:
             print(f"Warning: No XML files found in {self.unpacked_dir}")
 
+        # Parsed parts shared by every check, so each part is parsed once per run
+        self.package = OOXMLPackage(self.unpacked_dir)
+
+        # Per-part check results computed ahead of time by run_part_checks
+        self._part_results = {}
+
     def validate(self):
         """Run all validation checks and return True if all pass."""
         raise NotImplementedError("Subclasses must implement the validate method")
 
+    def run_part_checks(self):
+        """Run all PART_CHECKS for every part across a process pool.
+
+        Does nothing unless the validator was created with jobs > 1. Results
+        are stored in input order and picked up by the validate_* methods, so
+        the reported errors are identical to a serial run.
+        """
+        if self.jobs <= 1 or len(self.xml_files) < 2:
+            return
+
+        baseline_errors = self._load_baseline_errors()
+        chunksize = max(1, len(self.xml_files) // (self.jobs * 4))
+
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_part_worker,
+            initargs=(
+                type(self),
+                self.unpacked_dir,
+                self.original_file,
+                baseline_errors,
+            ),
+        ) as executor:
+            outputs = executor.map(
+                _run_part_checks_in_worker,
+                [str(xml_file) for xml_file in self.xml_files],
+                chunksize=chunksize,
+            )
+            for xml_file, (results, baseline) in zip(self.xml_files, outputs):
+                self._part_results[xml_file] = results
+
+                # Merge baseline errors computed by workers back into the index
+                part_name = xml_file.relative_to(self.unpacked_dir).as_posix()
+                if baseline is not None and part_name not in baseline_errors:
+                    baseline_errors[part_name] = baseline
+                    self._baseline_dirty = True
+
+    def _run_part_checks(self, xml_file):
+        """Run all PART_CHECKS for a single part.
+
+        Returns:
+            tuple: (results, baseline) where results maps check name to its
+            result and baseline is the part's original XSD error list, if known
+        """
+        results = {
+            name: getattr(self, f"_check_{name}")(xml_file)
+            for name in self.PART_CHECKS
+        }
+        part_name = xml_file.resolve().relative_to(self.unpacked_dir).as_posix()
+        baseline = (self._baseline_errors or {}).get(part_name)
+        return results, baseline
+
+    def _part_result(self, name, xml_file):
+        """Return the result of a per-part check, computing it if not precomputed."""
+        results = self._part_results.get(xml_file)
+        if results is not None and name in results:
+            return results[name]
+        return getattr(self, f"_check_{name}")(xml_file)
+
     def validate_xml(self):
         """Validate that all XML files are well-formed."""
         errors = []
@@ -131,7 +268,7 @@ class BaseSchemaValidator:
         for xml_file in self.xml_files:
             try:
                 # Try to parse the XML file
-                lxml.etree.parse(str(xml_file))
+                self.package.get_tree(xml_file)
             except lxml.etree.XMLSyntaxError as e:
                 errors.append(
                     f"  {xml_file.relative_to(self.unpacked_dir)}: "
@@ -158,21 +295,7 @@ class BaseSchemaValidator:
         errors = []
 
         for xml_file in self.xml_files:
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-                declared = set(root.nsmap.keys()) - {None}  # Exclude default namespace
-
-                for attr_val in [
-                    v for k, v in root.attrib.items() if k.endswith("Ignorable")
-                ]:
-                    undeclared = set(attr_val.split()) - declared
-                    errors.extend(
-                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                        f"Namespace '{ns}' in Ignorable but not declared"
-                        for ns in undeclared
-                    )
-            except lxml.etree.XMLSyntaxError:
-                continue
+            errors.extend(self._part_result("namespaces", xml_file))
 
         if errors:
             print(f"FAILED - {len(errors)} namespace issues:")
@@ -183,6 +306,26 @@ class BaseSchemaValidator:
             print("PASSED - All namespace prefixes properly declared")
         return True
 
+    def _check_namespaces(self, xml_file):
+        """Return Ignorable namespace errors for a single part."""
+        errors = []
+
+        try:
+            root = self.package.get_root(xml_file)
+        except lxml.etree.XMLSyntaxError:
+            return errors
+
+        declared = set(root.nsmap.keys()) - {None}  # Exclude default namespace
+
+        for attr_val in [v for k, v in root.attrib.items() if k.endswith("Ignorable")]:
+            undeclared = set(attr_val.split()) - declared
+            errors.extend(
+                f"  {xml_file.relative_to(self.unpacked_dir)}: "
+                f"Namespace '{ns}' in Ignorable but not declared"
+                for ns in sorted(undeclared)
+            )
+        return errors
+
     def validate_unique_ids(self):
         """Validate that specific IDs are unique according to OOXML requirements."""
         errors = []
@@ -190,18 +333,11 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.package.get_root(xml_file)
                 file_ids = {}  # Track IDs that must be unique within this file
 
-                # Remove all mc:AlternateContent elements from the tree
-                mc_elements = root.xpath(
-                    ".//mc:AlternateContent", namespaces={"mc": self.MC_NAMESPACE}
-                )
-                for elem in mc_elements:
-                    elem.getparent().remove(elem)
-
-                # Now check IDs in the cleaned tree
-                for elem in root.iter():
+                # Check IDs, ignoring everything inside mc:AlternateContent elements
+                for elem in self._iter_without_alternate_content(root):
                     # Get the element name without namespace
                     tag = (
                         elem.tag.split("}")[-1].lower()
@@ -274,6 +410,21 @@ class BaseSchemaValidator:
                 print("PASSED - All required IDs are unique")
             return True
 
+    def _iter_without_alternate_content(self, root):
+        """Iterate over root in document order, skipping mc:AlternateContent subtrees.
+
+        Equivalent to removing all mc:AlternateContent elements before calling
+        root.iter(), without modifying the shared parsed tree.
+        """
+        alternate_content_tag = f"{{{self.MC_NAMESPACE}}}AlternateContent"
+        stack = [root]
+        while stack:
+            elem = stack.pop()
+            if elem.tag == alternate_content_tag:
+                continue
+            yield elem
+            stack.extend(reversed(elem))
+
     def validate_file_references(self):
         """
         Validate that all .rels files properly reference files and that all files are referenced.
@@ -310,7 +461,7 @@ class BaseSchemaValidator:
         for rels_file in rels_files:
             try:
                 # Parse relationships file
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self.package.get_root(rels_file)
 
                 # Get the directory where this .rels file is located
                 rels_dir = rels_file.parent
@@ -390,8 +541,6 @@ class BaseSchemaValidator:
         Validate that all r:id attributes in XML files reference existing IDs
         in their corresponding .rels files, and optionally validate relationship types.
         """
-        import lxml.etree
-
         errors = []
 
         # Process each XML file that might contain r:id references
@@ -411,7 +560,7 @@ class BaseSchemaValidator:
 
             try:
                 # Parse the .rels file to get valid relationship IDs and their types
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self.package.get_root(rels_file)
                 rid_to_type = {}
 
                 for rel in rels_root.findall(
@@ -434,7 +583,7 @@ class BaseSchemaValidator:
                         rid_to_type[rid] = type_name
 
                 # Parse the XML file to find all r:id references
-                xml_root = lxml.etree.parse(str(xml_file)).getroot()
+                xml_root = self.package.get_root(xml_file)
 
                 # Find all elements with r:id attributes
                 for elem in xml_root.iter():
@@ -531,7 +680,7 @@ class BaseSchemaValidator:
 
         try:
             # Parse and get all declared parts and extensions
-            root = lxml.etree.parse(str(content_types_file)).getroot()
+            root = self.package.get_root(content_types_file)
             declared_parts = set()
             declared_extensions = set()
 
@@ -593,7 +742,7 @@ class BaseSchemaValidator:
                     continue
 
                 try:
-                    root_tag = lxml.etree.parse(str(xml_file)).getroot().tag
+                    root_tag = self.package.get_root(xml_file).tag
                     root_name = root_tag.split("}")[-1] if "}" in root_tag else root_tag
 
                     if root_name in declarable_roots and path_str not in declared_parts:
@@ -673,7 +822,7 @@ class BaseSchemaValidator:
             if verbose:
                 relative_path = xml_file.relative_to(unpacked_dir)
                 print(f"FAILED - {relative_path}: {len(new_errors)} new error(s)")
-                for error in list(new_errors)[:3]:
+                for error in sorted(new_errors)[:3]:
                     truncated = error[:250] + "..." if len(error) > 250 else error
                     print(f"  - {truncated}")
             return False, new_errors
@@ -694,9 +843,7 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             relative_path = str(xml_file.relative_to(self.unpacked_dir))
-            is_valid, new_file_errors = self.validate_file_against_xsd(
-                xml_file, verbose=False
-            )
+            is_valid, new_file_errors = self._part_result("xsd", xml_file)
 
             if is_valid is None:
                 skipped_count += 1
@@ -712,7 +859,7 @@ class BaseSchemaValidator:
 
             # Has new errors
             new_errors.append(f"  {relative_path}: {len(new_file_errors)} new error(s)")
-            for error in list(new_file_errors)[:3]:  # Show first 3 errors
+            for error in sorted(new_file_errors)[:3]:  # Show first 3 errors
                 new_errors.append(
                     f"    - {error[:250]}..." if len(error) > 250 else f"    - {error}"
                 )
@@ -728,6 +875,9 @@ class BaseSchemaValidator:
                 f"  - With NEW errors: {len(new_errors) > 0 and len([e for e in new_errors if not e.startswith('    ')]) or 0}"
             )
 
+        # Persist any baseline errors computed during this run
+        self._save_baseline_errors()
+
         if new_errors:
             print("\nFAILED - Found NEW validation errors:")
             for error in new_errors:
@@ -738,6 +888,10 @@ class BaseSchemaValidator:
                 print("\nPASSED - No new XSD validation errors introduced")
             return True
 
+    def _check_xsd(self, xml_file):
+        """Return (is_valid, new_errors_set) of XSD validation for a single part."""
+        return self.validate_file_against_xsd(xml_file, verbose=False)
+
     def _get_schema_path(self, xml_file):
         """Determine the appropriate schema path for an XML file."""
         # Check exact filename match
@@ -823,6 +977,52 @@ class BaseSchemaValidator:
 
         return xml_doc
 
+    @staticmethod
+    def _load_schema(schema_path):
+        """Return the compiled XSD schema at schema_path.
+
+        Compiled schemas are cached for the lifetime of the process, keyed by
+        path and modification time, so each schema is compiled at most once
+        no matter how many parts or validator instances use it.
+        """
+        schema_path = Path(schema_path).resolve()
+        mtime_ns = schema_path.stat().st_mtime_ns
+
+        cached = _SCHEMA_CACHE.get(schema_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        with open(schema_path, "rb") as xsd_file:
+            parser = lxml.etree.XMLParser()
+            xsd_doc = lxml.etree.parse(
+                xsd_file, parser=parser, base_url=str(schema_path)
+            )
+            schema = lxml.etree.XMLSchema(xsd_doc)
+
+        _SCHEMA_CACHE[schema_path] = (mtime_ns, schema)
+        return schema
+
+    @classmethod
+    def warm_schema_cache(cls):
+        """Compile every schema in SCHEMA_MAPPINGS up front.
+
+        Opt-in for long-lived workers that validate many documents, so that no
+        individual validation pays the schema compilation cost.
+
+        Returns:
+            int: Number of distinct schemas now cached
+        """
+        schema_paths = {SCHEMAS_DIR / path for path in cls.SCHEMA_MAPPINGS.values()}
+        cached_count = 0
+        for schema_path in sorted(schema_paths):
+            try:
+                cls._load_schema(schema_path)
+                cached_count += 1
+            except (OSError, lxml.etree.LxmlError):
+                # Reported per file when the schema is actually used
+                continue
+        return cached_count
+
     def _validate_single_file_xsd(self, xml_file, base_path):
         """Validate a single XML file against XSD schema. Returns (is_valid, errors_set)."""
         schema_path = self._get_schema_path(xml_file)
@@ -830,78 +1030,175 @@ class BaseSchemaValidator:
             return None, None  # Skip file
 
         try:
-            # Load schema
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
+            # Load XML
+            xml_doc = self.package.get_tree(xml_file)
+
+            return self._validate_xml_doc_xsd(
+                xml_doc, schema_path, xml_file.relative_to(base_path)
+            )
+
+        except Exception as e:
+            return False, {str(e)}
 
-            # Load and preprocess XML
-            with open(xml_file, "r") as f:
-                xml_doc = lxml.etree.parse(f)
+    def _validate_xml_doc_xsd(self, xml_doc, schema_path, relative_path):
+        """Validate a parsed XML document against the XSD schema at schema_path.
 
-            xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
-            xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
+        Args:
+            xml_doc: Parsed lxml ElementTree (left unmodified)
+            schema_path: Path to the XSD schema to validate against
+            relative_path: Path of the part relative to the package root
 
-            # Clean ignorable namespaces if needed
-            relative_path = xml_file.relative_to(base_path)
-            if (
-                relative_path.parts
-                and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
-            ):
-                xml_doc = self._clean_ignorable_namespaces(xml_doc)
+        Returns:
+            tuple: (is_valid, errors_set)
+        """
+        schema = self._load_schema(schema_path)
 
-            # Validate
-            if schema.validate(xml_doc):
-                return True, set()
-            else:
-                errors = set()
-                for error in schema.error_log:
-                    # Store normalized error message (without line numbers for comparison)
-                    errors.add(error.message)
-                return False, errors
+        # Preprocess XML
+        xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
+        xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
 
-        except Exception as e:
-            return False, {str(e)}
+        # Clean ignorable namespaces if needed
+        if relative_path.parts and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS:
+            xml_doc = self._clean_ignorable_namespaces(xml_doc)
+
+        # Validate
+        if schema.validate(xml_doc):
+            return True, set()
+        else:
+            errors = set()
+            for error in schema.error_log:
+                # Store normalized error message (without line numbers for comparison)
+                errors.add(error.message)
+            return False, errors
 
     def _get_original_file_errors(self, xml_file):
         """Get XSD validation errors from a single file in the original document.
 
+        Errors are computed at most once per part and cached in the baseline
+        error index, so the original file is only opened once per validator.
+
         Args:
             xml_file: Path to the XML file in unpacked_dir to check
 
         Returns:
             set: Set of error messages from the original file
         """
-        import tempfile
-        import zipfile
-
         # Resolve both paths to handle symlinks (e.g., /var vs /private/var on macOS)
         xml_file = Path(xml_file).resolve()
         unpacked_dir = self.unpacked_dir.resolve()
-        relative_path = xml_file.relative_to(unpacked_dir)
+        part_name = xml_file.relative_to(unpacked_dir).as_posix()
+
+        baseline_errors = self._load_baseline_errors()
+        if part_name not in baseline_errors:
+            baseline_errors[part_name] = sorted(
+                self._validate_original_part(part_name)
+            )
+            self._baseline_dirty = True
+
+        return set(baseline_errors[part_name])
+
+    def _validate_original_part(self, part_name):
+        """Validate a single part of the original document in memory.
+
+        Returns:
+            set: Set of error messages from the original part
+        """
+        data = self._read_original_parts().get(part_name)
+        if data is None:
+            # File didn't exist in original, so no original errors
+            return set()
+
+        part_path = Path(part_name)
+        schema_path = self._get_schema_path(part_path)
+        if not schema_path:
+            return set()
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
+        try:
+            xml_doc = lxml.etree.parse(io.BytesIO(data))
+            _, errors = self._validate_xml_doc_xsd(xml_doc, schema_path, part_path)
+        except Exception as e:
+            errors = {str(e)}
+        return errors if errors else set()
+
+    def _read_original_parts(self):
+        """Read all XML and .rels parts of the original file into memory once.
 
-            # Extract original file
+        Returns:
+            dict: Mapping of part name (e.g. 'word/document.xml') to raw bytes
+        """
+        if self._original_parts is None:
             with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                zip_ref.extractall(temp_path)
+                self._original_parts = {
+                    info.filename: zip_ref.read(info)
+                    for info in zip_ref.infolist()
+                    if info.filename.endswith((".xml", ".rels"))
+                }
+        return self._original_parts
+
+    def _baseline_cache_file(self):
+        """Return the persisted baseline error index path, or None if disabled."""
+        if self.baseline_cache_dir is None:
+            return None
+
+        if self._original_digest is None:
+            digest = hashlib.sha256()
+            with open(self.original_file, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            self._original_digest = digest.hexdigest()
+
+        # Errors depend on which validator produced them and against which
+        # schemas, not only on the original file's bytes
+        validator_class = type(self)
+        key = json.dumps(
+            [
+                f"{validator_class.__module__}.{validator_class.__qualname__}",
+                list(self.PART_CHECKS),
+                _schema_fingerprint(self.schemas_dir),
+            ]
+        )
+        key_digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        cache_name = f"{self._original_digest}-{key_digest}.json"
+        return self.baseline_cache_dir / cache_name
 
-            # Find corresponding file in original
-            original_xml_file = temp_path / relative_path
+    def _load_baseline_errors(self):
+        """Load the baseline error index, from the persistent cache if available.
 
-            if not original_xml_file.exists():
-                # File didn't exist in original, so no original errors
-                return set()
+        Returns:
+            dict: Mapping of part name to sorted list of original error messages
+        """
+        if self._baseline_errors is None:
+            self._baseline_errors = {}
+            cache_file = self._baseline_cache_file()
+            if cache_file is not None and cache_file.exists():
+                try:
+                    self._baseline_errors = json.loads(
+                        cache_file.read_text(encoding="utf-8")
+                    )
+                except (OSError, ValueError):
+                    # Corrupt or unreadable cache, rebuild it
+                    self._baseline_errors = {}
+        return self._baseline_errors
+
+    def _save_baseline_errors(self):
+        """Persist the baseline error index if caching is enabled and it changed."""
+        if not self._baseline_dirty:
+            return
+        cache_file = self._baseline_cache_file()
+        if cache_file is None:
+            return
 
-            # Validate the specific file in original
-            is_valid, errors = self._validate_single_file_xsd(
-                original_xml_file, temp_path
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = cache_file.with_suffix(".tmp")
+            temp_file.write_text(
+                json.dumps(self._baseline_errors, sort_keys=True), encoding="utf-8"
             )
-            return errors if errors else set()
+            temp_file.replace(cache_file)
+            self._baseline_dirty = False
+        except OSError as e:
+            if self.verbose:
+                print(f"Warning: Could not write baseline cache {cache_file}: {e}")
 
     def _remove_template_tags_from_text_nodes(self, xml_doc):
         """Remove template tags from XML text nodes and collect warnings.
@@ -23,6 +23,7 @@ Usage:
 """
 
 import argparse
+import functools
 import json
 import platform
 import sys
@@ -30,10 +31,15 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageFont
 from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.dml import MSO_THEME_COLOR
 from pptx.enum.text import PP_ALIGN
 from pptx.shapes.base import BaseShape
+from pptx.text.text import Font
+from rect_overlap import candidate_pairs
+from text_wrap import wrap_text_line
 
 # Type aliases for cleaner signatures
 JsonValue = Union[str, int, float, bool, None]
@@ -46,6 +52,8 @@ InventoryData = Dict[
 ]  # Dict of slide_id -> {shape_id -> ShapeData}
 InventoryDict = Dict[str, Dict[str, ShapeDict]]  # JSON-serializable inventory
 
+DRAWINGML_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
 
 def main():
     """Main entry point for command-line usage."""
@@ -158,31 +166,30 @@ class ParagraphData:
         self.theme_color: Optional[str] = None
         self.line_spacing: Optional[float] = None
 
+        # Paragraph properties are read from <a:pPr> directly, since accessors such
+        # as paragraph.alignment add an empty <a:pPr> when there is none
+        pPr = paragraph._p.pPr if getattr(paragraph, "_p", None) is not None else None
+
         # Check for bullet formatting
-        if (
-            hasattr(paragraph, "_p")
-            and paragraph._p is not None
-            and paragraph._p.pPr is not None
-        ):
-            pPr = paragraph._p.pPr
-            ns = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+        if pPr is not None:
             if (
-                pPr.find(f"{ns}buChar") is not None
-                or pPr.find(f"{ns}buAutoNum") is not None
+                pPr.find(f"{DRAWINGML_NS}buChar") is not None
+                or pPr.find(f"{DRAWINGML_NS}buAutoNum") is not None
             ):
                 self.bullet = True
                 if hasattr(paragraph, "level"):
                     self.level = paragraph.level
 
         # Add alignment if not LEFT (default)
-        if hasattr(paragraph, "alignment") and paragraph.alignment is not None:
+        alignment = pPr.algn if pPr is not None else None
+        if alignment is not None:
             alignment_map = {
                 PP_ALIGN.CENTER: "CENTER",
                 PP_ALIGN.RIGHT: "RIGHT",
                 PP_ALIGN.JUSTIFY: "JUSTIFY",
             }
-            if paragraph.alignment in alignment_map:
-                self.alignment = alignment_map[paragraph.alignment]
+            if alignment in alignment_map:
+                self.alignment = alignment_map[alignment]
 
         # Add spacing properties if set
         if hasattr(paragraph, "space_before") and paragraph.space_before:
@@ -190,11 +197,13 @@ class ParagraphData:
         if hasattr(paragraph, "space_after") and paragraph.space_after:
             self.space_after = paragraph.space_after.pt
 
-        # Extract font properties from first run
+        # Extract font properties from first run. Its <a:rPr> is read directly:
+        # run.font and font.color would add <a:rPr> and <a:solidFill> elements,
+        # changing the presentation being inspected.
         if paragraph.runs:
-            first_run = paragraph.runs[0]
-            if hasattr(first_run, "font"):
-                font = first_run.font
+            rPr = paragraph.runs[0]._r.rPr
+            if rPr is not None:
+                font = Font(rPr)
                 if font.name:
                     self.font_name = font.name
                 if font.size:
@@ -207,17 +216,7 @@ class ParagraphData:
                     self.underline = font.underline
 
                 # Handle color - both RGB and theme colors
-                try:
-                    # Try RGB color first
-                    if font.color.rgb:
-                        self.color = str(font.color.rgb)
-                except (AttributeError, TypeError):
-                    # Fall back to theme color
-                    try:
-                        if font.color.theme_color:
-                            self.theme_color = font.color.theme_color.name
-                    except (AttributeError, TypeError):
-                        pass
+                self.color, self.theme_color = self._solid_fill_color(rPr)
 
         # Add line spacing if set
         if hasattr(paragraph, "line_spacing") and paragraph.line_spacing is not None:
@@ -228,6 +227,28 @@ class ParagraphData:
                 font_size = self.font_size if self.font_size else 12.0
                 self.line_spacing = round(paragraph.line_spacing * font_size, 2)
 
+    @staticmethod
+    def _solid_fill_color(rPr: Any) -> Tuple[Optional[str], Optional[str]]:
+        """Return (rgb, theme color name) of a run's solid fill, without modifying it.
+
+        Only <a:srgbClr> and <a:schemeClr> inside <a:solidFill> are reported;
+        other fills and color types give (None, None).
+        """
+        solid_fill = rPr.find(f"{DRAWINGML_NS}solidFill")
+        if solid_fill is None or len(solid_fill) == 0:
+            return None, None
+
+        color = solid_fill[0]
+        value = color.get("val")
+        try:
+            if color.tag == f"{DRAWINGML_NS}srgbClr":
+                return str(RGBColor.from_string(value)), None
+            if color.tag == f"{DRAWINGML_NS}schemeClr":
+                return None, MSO_THEME_COLOR.from_xml(value).name
+        except (TypeError, ValueError):
+            pass
+        return None, None
+
     def to_dict(self) -> ParagraphDict:
         """Convert to dictionary for JSON serialization, excluding None values."""
         result: ParagraphDict = {"text": self.text}
@@ -263,6 +284,130 @@ class ParagraphData:
         return result
 
 
+# Style words that font file names append to the family name
+# (e.g. DejaVuSans-BoldOblique.ttf, Lato-Regular.ttf)
+FONT_STYLE_WORDS = (
+    "regular", "book", "normal", "bold", "italic", "oblique", "light",
+    "thin", "medium", "semibold", "demibold", "extrabold", "ultrabold", "black",
+    "heavy", "condensed", "extralight", "ultralight",
+)
+_UNSTYLED_WORDS = ("regular", "book", "normal")
+
+
+def _font_name_key(name: str) -> str:
+    """Normalize a font or font file name: casefolded, without spaces, hyphens and underscores."""
+    key = name.casefold()
+    for separator in (" ", "-", "_"):
+        key = key.replace(separator, "")
+    return key
+
+
+def _font_family_key(name: str) -> Tuple[str, int]:
+    """Normalize a font or font file name to a family key.
+
+    Like _font_name_key, with trailing style words removed, so "DejaVu Sans",
+    "dejavusans.ttf" and "DejaVuSans-Bold.ttf" share the key "dejavusans".
+
+    Returns:
+        (family key, style rank): 0 if the name had no style words, 1 if only
+        "Regular" or similar, 2 for any other style
+    """
+    key = _font_name_key(name)
+    rank = 0
+    stripped = True
+    while stripped:
+        stripped = False
+        for word in FONT_STYLE_WORDS:
+            if key.endswith(word) and len(key) > len(word):
+                key = key[: -len(word)]
+                rank = max(rank, 1 if word in _UNSTYLED_WORDS else 2)
+                stripped = True
+                break
+    return key, rank
+
+
+@functools.lru_cache(maxsize=None)
+def _font_index() -> List[Tuple[Dict[str, str], Dict[str, str], List[Tuple[str, str]]]]:
+    """Scan the platform font directories once per process.
+
+    Returns:
+        One (path by name key, path by family key, [(lowercase file name,
+        path)] in listing order) entry per existing font directory, in search
+        order. For each family the unstyled file is preferred over Regular
+        and other styles.
+    """
+    if platform.system() == "Darwin":  # macOS
+        font_dirs = [
+            "/System/Library/Fonts/",
+            "/Library/Fonts/",
+            "~/Library/Fonts/",
+        ]
+        extensions = (".ttf", ".otf", ".ttc", ".dfont")
+    else:  # Linux
+        font_dirs = [
+            "/usr/share/fonts/truetype/",
+            "/usr/local/share/fonts/",
+            "~/.fonts/",
+        ]
+        extensions = (".ttf", ".otf")
+
+    index = []
+    for font_dir in font_dirs:
+        font_dir_path = Path(font_dir).expanduser()
+        if not font_dir_path.exists():
+            continue
+        names = {}
+        families = {}
+        ranks = {}
+        files = []
+        try:
+            for file_path in font_dir_path.iterdir():
+                if not (file_path.is_file() and file_path.name.lower().endswith(extensions)):
+                    continue
+                files.append((file_path.name.lower(), str(file_path)))
+                names.setdefault(_font_name_key(file_path.stem), str(file_path))
+                family, rank = _font_family_key(file_path.stem)
+                if rank < ranks.get(family, 3):
+                    families[family] = str(file_path)
+                    ranks[family] = rank
+        except (OSError, PermissionError):
+            pass
+        index.append((names, families, files))
+    return index
+
+
+@functools.lru_cache(maxsize=None)
+def _find_font_path(font_name: str) -> Optional[str]:
+    """Resolve a font name against the font index (see ShapeData.get_font_path)."""
+    name = _font_name_key(font_name)
+    family, _ = _font_family_key(font_name)
+    font_name_lower = font_name.lower().replace(" ", "")
+
+    for names, families, files in _font_index():
+        # First try the full name ("Calibri Light"), then the family name
+        font_path = names.get(name) or families.get(family)
+        if font_path:
+            return font_path
+
+        # Then try fuzzy matching - find files containing the font name
+        for file_name_lower, font_path in files:
+            if font_name_lower in file_name_lower:
+                return font_path
+
+    return None
+
+
+@functools.lru_cache(maxsize=64)
+def _load_font(font_path: Optional[str], font_size: int) -> Any:
+    """Load a font for text measurement, falling back to PIL's default font."""
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, size=font_size)
+        except Exception:
+            pass
+    return ImageFont.load_default()
+
+
 class ShapeData:
     """Data structure for shape properties extracted from a PowerPoint shape."""
 
@@ -280,67 +425,16 @@ class ShapeData:
     def get_font_path(font_name: str) -> Optional[str]:
         """Get the font file path for a given font name.
 
+        Font directories are scanned once per process (see _font_index) and
+        results are cached per font name.
+
         Args:
             font_name: Name of the font (e.g., 'Arial', 'Calibri')
 
         Returns:
             Path to the font file, or None if not found
         """
-        system = platform.system()
-
-        # Common font file variations to try
-        font_variations = [
-            font_name,
-            font_name.lower(),
-            font_name.replace(" ", ""),
-            font_name.replace(" ", "-"),
-        ]
-
-        # Define font directories and extensions by platform
-        if system == "Darwin":  # macOS
-            font_dirs = [
-                "/System/Library/Fonts/",
-                "/Library/Fonts/",
-                "~/Library/Fonts/",
-            ]
-            extensions = [".ttf", ".otf", ".ttc", ".dfont"]
-        else:  # Linux
-            font_dirs = [
-                "/usr/share/fonts/truetype/",
-                "/usr/local/share/fonts/",
-                "~/.fonts/",
-            ]
-            extensions = [".ttf", ".otf"]
-
-        # Try to find the font file
-        from pathlib import Path
-
-        for font_dir in font_dirs:
-            font_dir_path = Path(font_dir).expanduser()
-            if not font_dir_path.exists():
-                continue
-
-            # First try exact matches
-            for variant in font_variations:
-                for ext in extensions:
-                    font_path = font_dir_path / f"{variant}{ext}"
-                    if font_path.exists():
-                        return str(font_path)
-
-            # Then try fuzzy matching - find files containing the font name
-            try:
-                for file_path in font_dir_path.iterdir():
-                    if file_path.is_file():
-                        file_name_lower = file_path.name.lower()
-                        font_name_lower = font_name.lower().replace(" ", "")
-                        if font_name_lower in file_name_lower and any(
-                            file_name_lower.endswith(ext) for ext in extensions
-                        ):
-                            return str(file_path)
-            except (OSError, PermissionError):
-                continue
-
-        return None
+        return _find_font_path(font_name)
 
     @staticmethod
     def get_slide_dimensions(slide: Any) -> tuple[Optional[int], Optional[int]]:
@@ -531,33 +625,9 @@ class ShapeData:
             self.inches_to_pixels(usable_height),
         )
 
-    def _wrap_text_line(self, line: str, max_width_px: int, draw, font) -> List[str]:
+    def _wrap_text_line(self, line: str, max_width_px: int, font) -> List[str]:
         """Wrap a single line of text to fit within max_width_px."""
-        if not line:
-            return [""]
-
-        # Use textlength for efficient width calculation
-        if draw.textlength(line, font=font) <= max_width_px:
-            return [line]
-
-        # Need to wrap - split into words
-        wrapped = []
-        words = line.split(" ")
-        current_line = ""
-
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if draw.textlength(test_line, font=font) <= max_width_px:
-                current_line = test_line
-            else:
-                if current_line:
-                    wrapped.append(current_line)
-                current_line = word
-
-        if current_line:
-            wrapped.append(current_line)
-
-        return wrapped
+        return wrap_text_line(line, max_width_px, font)
 
     def _estimate_frame_overflow(self) -> None:
         """Estimate if text overflows the shape bounds using PIL text measurement."""
@@ -573,10 +643,6 @@ class ShapeData:
         if usable_width_px <= 0 or usable_height_px <= 0:
             return
 
-        # Set up PIL for text measurement
-        dummy_img = Image.new("RGB", (1, 1))
-        draw = ImageDraw.Draw(dummy_img)
-
         # Get default font size from placeholder or use conservative estimate
         default_font_size = self._get_default_font_size()
 
@@ -593,20 +659,12 @@ class ShapeData:
             font_name = para_data.font_name or "Arial"
             font_size = int(para_data.font_size or default_font_size)
 
-            font = None
-            font_path = self.get_font_path(font_name)
-            if font_path:
-                try:
-                    font = ImageFont.truetype(font_path, size=font_size)
-                except Exception:
-                    font = ImageFont.load_default()
-            else:
-                font = ImageFont.load_default()
+            font = _load_font(self.get_font_path(font_name), font_size)
 
             # Wrap all lines in this paragraph
             all_wrapped_lines = []
             for line in paragraph.text.split("\n"):
-                wrapped = self._wrap_text_line(line, usable_width_px, draw, font)
+                wrapped = self._wrap_text_line(line, usable_width_px, font)
                 all_wrapped_lines.extend(wrapped)
 
             if all_wrapped_lines:
@@ -741,8 +799,9 @@ class ShapeData:
 
 def is_valid_shape(shape: BaseShape) -> bool:
     """Check if a shape contains meaningful text content."""
-    # Must have a text frame with content
-    if not hasattr(shape, "text_frame") or not shape.text_frame:  # type: ignore
+    # Must have a text frame with content. Check for <p:txBody> first, since
+    # shape.text_frame adds an empty one to shapes that have none.
+    if not shape.has_text_frame or shape.element.txBody is None:  # type: ignore
         return False
 
     text = shape.text_frame.text.strip()  # type: ignore
@@ -888,27 +947,28 @@ def detect_overlaps(shapes: List[ShapeData]) -> None:
     Args:
         shapes: List of ShapeData objects with shape_id attributes set
     """
-    n = len(shapes)
-
-    # Compare each pair of shapes
-    for i in range(n):
-        for j in range(i + 1, n):
-            shape1 = shapes[i]
-            shape2 = shapes[j]
-
-            # Ensure shape IDs are set
-            assert shape1.shape_id, f"Shape at index {i} has no shape_id"
-            assert shape2.shape_id, f"Shape at index {j} has no shape_id"
-
-            rect1 = (shape1.left, shape1.top, shape1.width, shape1.height)
-            rect2 = (shape2.left, shape2.top, shape2.width, shape2.height)
-
-            overlaps, overlap_area = calculate_overlap(rect1, rect2)
-
-            if overlaps:
-                # Add shape IDs with overlap area in square inches
-                shape1.overlapping_shapes[shape2.shape_id] = overlap_area
-                shape2.overlapping_shapes[shape1.shape_id] = overlap_area
+    # Ensure shape IDs are set
+    for i, shape in enumerate(shapes):
+        assert shape.shape_id, f"Shape at index {i} has no shape_id"
+
+    # Only compare shapes whose extents meet, in the same order as all pairs
+    boxes = [
+        (shape.left, shape.top, shape.left + shape.width, shape.top + shape.height)
+        for shape in shapes
+    ]
+    for i, j in sorted(candidate_pairs(boxes)):
+        shape1 = shapes[i]
+        shape2 = shapes[j]
+
+        rect1 = (shape1.left, shape1.top, shape1.width, shape1.height)
+        rect2 = (shape2.left, shape2.top, shape2.width, shape2.height)
+
+        overlaps, overlap_area = calculate_overlap(rect1, rect2)
+
+        if overlaps:
+            # Add shape IDs with overlap area in square inches
+            shape1.overlapping_shapes[shape2.shape_id] = overlap_area
+            shape2.overlapping_shapes[shape1.shape_id] = overlap_area
 
 
 def extract_text_inventory(
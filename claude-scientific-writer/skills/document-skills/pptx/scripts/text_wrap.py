@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Greedy word wrapping with cached glyph measurements.
+
+Used by inventory.py to estimate text frame overflow. Line breaks are the same
+as when every growing candidate line is measured with ImageDraw.textlength, but
+each word is measured only once per font. A full line is measured only when the
+summed word widths are too close to the limit to decide.
+
+Usage:
+    from text_wrap import wrap_text_line
+
+    lines = wrap_text_line("Some long paragraph text", 300, font)
+"""
+
+import functools
+from itertools import accumulate
+from typing import Any, List
+
+from PIL import Image, ImageDraw
+
+# Summed word widths ignore kerning next to the spaces between words. They are
+# trusted only when they are further from the limit than this, in ems per
+# kerning boundary.
+KERNING_TOLERANCE_EM = 0.1
+
+# All measurements go through one scratch image
+_DRAW = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+
+@functools.lru_cache(maxsize=65536)
+def _token_width(font: Any, token: str) -> float:
+    """Width of a single token, measured once per (font, token)."""
+    return _DRAW.textlength(token, font=font)
+
+
+def wrap_text_line(line: str, max_width_px: int, font: Any) -> List[str]:
+    """Wrap a single line of text to fit within max_width_px.
+
+    Words are split on single spaces and placed greedily. A word that is wider
+    than the frame still gets a line of its own. Empty words (from runs of
+    spaces) at the start of a line are dropped.
+
+    Args:
+        line: Text without line breaks
+        max_width_px: Available width in pixels
+        font: PIL font used for measuring
+
+    Returns:
+        List of wrapped lines
+    """
+    if not line:
+        return [""]
+
+    words = line.split(" ")
+    space_width = _token_width(font, " ")
+    tolerance = KERNING_TOLERANCE_EM * getattr(font, "size", 10)
+
+    # prefix[j] - prefix[i] - space_width is the summed width of words[i:j]
+    # joined by single spaces
+    prefix = [
+        0.0,
+        *accumulate(_token_width(font, word) + space_width for word in words),
+    ]
+
+    # Whole line fits; only measure it exactly when the estimate is borderline
+    estimate = prefix[-1] - space_width
+    error = 2 * tolerance * (len(words) - 1)
+    if estimate <= max_width_px - error:
+        return [line]
+    if estimate <= max_width_px + error:
+        if _DRAW.textlength(line, font=font) <= max_width_px:
+            return [line]
+
+    wrapped = []
+    start = 0
+    while True:
+        while start < len(words) and not words[start]:
+            start += 1
+        if start == len(words):
+            return wrapped
+
+        end = start + 1
+        while end < len(words):
+            estimate = prefix[end + 1] - prefix[start] - space_width
+            # Every word added puts two more kerning boundaries on the line
+            error = 2 * tolerance * (end - start)
+            if estimate <= max_width_px - error:
+                end += 1
+            elif estimate > max_width_px + error:
+                break
+            elif (
+                _DRAW.textlength(" ".join(words[start : end + 1]), font=font)
+                <= max_width_px
+            ):
+                end += 1
+            else:
+                break
+
+        wrapped.append(" ".join(words[start:end]))
+        start = end
@@ -0,0 +1,89 @@
+import random
+import unittest
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+from text_wrap import wrap_text_line
+
+
+def reference_wrap(line, max_width_px, draw, font):
+    """Original wrapping: measure every growing candidate line in full."""
+    if not line:
+        return [""]
+
+    if draw.textlength(line, font=font) <= max_width_px:
+        return [line]
+
+    wrapped = []
+    words = line.split(" ")
+    current_line = ""
+
+    for word in words:
+        test_line = current_line + (" " if current_line else "") + word
+        if draw.textlength(test_line, font=font) <= max_width_px:
+            current_line = test_line
+        else:
+            if current_line:
+                wrapped.append(current_line)
+            current_line = word
+
+    if current_line:
+        wrapped.append(current_line)
+
+    return wrapped
+
+
+def load_corpus_fonts():
+    """Fonts to run the corpus with: any installed TrueType fonts plus PIL's default."""
+    fonts = [ImageFont.load_default()]
+    font_files = sorted(Path("/usr/share/fonts").rglob("*.ttf"))[:2]
+    for font_file in font_files:
+        for size in (9, 18, 40):
+            fonts.append(ImageFont.truetype(str(font_file), size=size))
+    return fonts
+
+
+def build_corpus(seed=1234, count=120):
+    """Deterministic lines covering kerning pairs, long words and runs of spaces."""
+    rng = random.Random(seed)
+    vocabulary = (
+        "To AV Ty We Yo a an the of gene expression analysis p<0.05 "
+        "interdisciplinary Results: (n=24) AWAY LTA VA, To. Yes, "
+        "café naïve — – “quoted” 10,000 μm supercalifragilisticexpialidocious"
+    ).split()
+    corpus = ["", " ", "single", "  leading and trailing  ", "a  b   c    d"]
+    for _ in range(count):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 40))]
+        separators = [rng.choice([" ", " ", " ", "  "]) for _ in words]
+        corpus.append("".join(w + s for w, s in zip(words, separators)).rstrip(" "))
+    return corpus
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestWrapTextLine(unittest.TestCase):
+
+    def setUp(self):
+        self.draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        self.fonts = load_corpus_fonts()
+        self.corpus = build_corpus()
+
+    def test_matches_reference_on_corpus(self):
+        """Test that line breaks match the original implementation exactly"""
+        for font in self.fonts:
+            for max_width_px in (20, 150, 500):
+                for line in self.corpus:
+                    with self.subTest(font=font, width=max_width_px, line=line):
+                        self.assertEqual(
+                            wrap_text_line(line, max_width_px, font),
+                            reference_wrap(line, max_width_px, self.draw, font),
+                        )
+
+    def test_word_wider_than_frame_keeps_own_line(self):
+        """Test that an over-wide word is placed alone rather than split"""
+        font = self.fonts[0]
+        lines = wrap_text_line("a supercalifragilisticexpialidocious b", 30, font)
+        self.assertEqual(lines, ["a", "supercalifragilisticexpialidocious", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,8 +18,20 @@ Grid limits by column count:
 - 5 cols: max 30 slides per grid (5×6) [default]
 - 6 cols: max 42 slides per grid (6×7)
 
+Rendered slides are cached by a hash of each slide and the parts it depends on
+(layout, master, theme, media), so after editing one slide only that slide is
+re-rendered. The cache lives in ~/.cache/pptx-thumbnails by default.
+
+Slides are converted on a persistent headless soffice, so repeated runs don't
+pay LibreOffice's startup time: the shared soffice pool if one is running,
+otherwise a single worker kept in the cache directory, which the first run
+starts and later runs reuse. Stop it with
+`soffice_pool.py stop --state-dir <cache dir>/soffice-pool`.
+Without the Python UNO bindings, or with --no-cache, each run starts soffice once.
+
 Usage:
     python thumbnail.py input.pptx [output_prefix] [--cols N] [--outline-placeholders]
+                        [--cache-dir DIR | --no-cache]
 
 Examples:
     python thumbnail.py presentation.pptx
@@ -41,6 +53,9 @@ Examples:
 """
 
 import argparse
+import hashlib
+import os
+import shutil
 import subprocess
 import sys
 import tempfile
@@ -49,6 +64,17 @@ from pathlib import Path
 from inventory import extract_text_inventory
 from PIL import Image, ImageDraw, ImageFont
 from pptx import Presentation
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+# soffice_pool.py is shared by the docx, pptx and xlsx skills
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from soffice_pool import (
+    ConversionError,
+    PoolUnavailable,
+    SofficePool,
+    convert_document,
+)
 
 # Constants
 THUMBNAIL_WIDTH = 300  # Fixed thumbnail width in pixels
@@ -57,6 +83,24 @@ MAX_COLS = 6  # Maximum number of columns
 DEFAULT_COLS = 5  # Default number of columns
 JPEG_QUALITY = 95  # JPEG compression quality
 
+# Render cache
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / (
+    "pptx-thumbnails"
+)
+CACHE_MAX_IMAGES = 2000  # Least recently used images beyond this are removed
+
+# Relationships that don't affect how a slide renders. Following slide links
+# would pull every other slide into each slide's cache key.
+UNRENDERED_RELTYPES = {RT.NOTES_SLIDE, RT.SLIDE}
+
+# A master refers to every layout based on it, but a slide only renders with
+# its own layout
+UNRENDERED_MASTER_RELTYPES = {RT.SLIDE_LAYOUT}
+
+# Parts presentation.xml refers to that every slide renders with (besides
+# presentation.xml itself, which holds the slide size and defaultTextStyle)
+PRESENTATION_RENDERED_RELTYPES = {RT.THEME, RT.TABLE_STYLES}
+
 # Grid layout constants
 GRID_PADDING = 20  # Padding between thumbnails
 BORDER_WIDTH = 2  # Border width around thumbnails
@@ -86,6 +130,17 @@ def main():
         action="store_true",
         help="Outline text placeholders with a colored border",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=CACHE_DIR,
+        help=f"Directory for cached slide renders (default: {CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Render every slide without reading or writing the cache",
+    )
 
     args = parser.parse_args()
 
@@ -105,21 +160,29 @@ def main():
 
     print(f"Processing: {args.input}")
 
+    cache_dir = None if args.no_cache else args.cache_dir
+
     try:
         with tempfile.TemporaryDirectory() as temp_dir:
+            # Load once; the presentation is only read, apart from temporarily
+            # hiding cached slides while rendering
+            prs = Presentation(str(input_path))
+
             # Get placeholder regions if outlining is enabled
             placeholder_regions = None
             slide_dimensions = None
             if args.outline_placeholders:
                 print("Extracting placeholder regions...")
                 placeholder_regions, slide_dimensions = get_placeholder_regions(
-                    input_path
+                    input_path, prs
                 )
                 if placeholder_regions:
                     print(f"Found placeholders on {len(placeholder_regions)} slides")
 
             # Convert slides to images
-            slide_images = convert_to_images(input_path, Path(temp_dir), CONVERSION_DPI)
+            slide_images = convert_to_images(
+                input_path, Path(temp_dir), CONVERSION_DPI, prs, cache_dir
+            )
             if not slide_images:
                 print("Error: No slides found")
                 sys.exit(1)
@@ -156,15 +219,17 @@ def create_hidden_slide_placeholder(size):
     return img
 
 
-def get_placeholder_regions(pptx_path):
+def get_placeholder_regions(pptx_path, prs=None):
     """Extract ALL text regions from the presentation.
 
     Returns a tuple of (placeholder_regions, slide_dimensions).
     text_regions is a dict mapping slide indices to lists of text regions.
     Each region is a dict with 'left', 'top', 'width', 'height' in inches.
     slide_dimensions is a tuple of (width_inches, height_inches).
+    If prs is not provided, the presentation is loaded from pptx_path.
     """
-    prs = Presentation(str(pptx_path))
+    if prs is None:
+        prs = Presentation(str(pptx_path))
     inventory = extract_text_inventory(pptx_path, prs)
     placeholder_regions = {}
 
@@ -194,67 +259,76 @@ def get_placeholder_regions(pptx_path):
     return placeholder_regions, (slide_width_inches, slide_height_inches)
 
 
-def convert_to_images(pptx_path, temp_dir, dpi):
-    """Convert PowerPoint to images via PDF, handling hidden slides."""
+def convert_to_images(pptx_path, temp_dir, dpi, prs=None, cache_dir=None):
+    """Convert PowerPoint to images via PDF, handling hidden slides.
+
+    With a cache_dir, slides whose cache key has been rendered before are
+    taken from the cache and only the remaining slides are converted.
+    """
     # Detect hidden slides
     print("Analyzing presentation...")
-    prs = Presentation(str(pptx_path))
-    total_slides = len(prs.slides)
+    if prs is None:
+        prs = Presentation(str(pptx_path))
+    slides = list(prs.slides)
+    total_slides = len(slides)
 
     # Find hidden slides (1-based indexing for display)
     hidden_slides = {
-        idx + 1
-        for idx, slide in enumerate(prs.slides)
-        if slide.element.get("show") == "0"
+        idx + 1 for idx, slide in enumerate(slides) if slide.element.get("show") == "0"
     }
 
     print(f"Total slides: {total_slides}")
     if hidden_slides:
         print(f"Hidden slides: {sorted(hidden_slides)}")
 
-    pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
-
-    # Convert to PDF
-    print("Converting to PDF...")
-    result = subprocess.run(
-        [
-            "soffice",
-            "--headless",
-            "--convert-to",
-            "pdf",
-            "--outdir",
-            str(temp_dir),
-            str(pptx_path),
-        ],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0 or not pdf_path.exists():
-        raise RuntimeError("PDF conversion failed")
-
-    # Convert PDF to images
-    print(f"Converting to images at {dpi} DPI...")
-    result = subprocess.run(
-        ["pdftoppm", "-jpeg", "-r", str(dpi), str(pdf_path), str(temp_dir / "slide")],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
-        raise RuntimeError("Image conversion failed")
-
-    visible_images = sorted(temp_dir.glob("slide-*.jpg"))
-
-    # Create full list with placeholders for hidden slides
-    all_images = []
-    visible_idx = 0
+    # Look up visible slides in the render cache
+    visible_images = {}
+    cache_keys = {}
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_keys = slide_cache_keys(prs, dpi)
+        for slide_num, key in cache_keys.items():
+            cached = cache_dir / f"{key}.jpg"
+            if slide_num not in hidden_slides and cached.exists():
+                os.utime(cached)  # Mark as recently used
+                visible_images[slide_num] = cached
+
+    to_render = [
+        slide_num
+        for slide_num in range(1, total_slides + 1)
+        if slide_num not in hidden_slides and slide_num not in visible_images
+    ]
+    if cache_dir is not None:
+        print(f"Cached slides: {len(visible_images)}, to render: {len(to_render)}")
+
+    if to_render:
+        rendered = render_slides(
+            pptx_path,
+            prs,
+            to_render,
+            temp_dir,
+            dpi,
+            cache_dir=cache_dir,
+        )
+        for slide_num, image_path in rendered.items():
+            if cache_dir is not None:
+                cached = cache_dir / f"{cache_keys[slide_num]}.jpg"
+                partial = cached.with_suffix(f".{os.getpid()}.tmp")
+                shutil.copyfile(image_path, partial)
+                os.replace(partial, cached)
+            visible_images[slide_num] = image_path
+        if cache_dir is not None:
+            prune_cache(cache_dir)
 
     # Get placeholder dimensions from first visible slide
     if visible_images:
-        with Image.open(visible_images[0]) as img:
+        with Image.open(visible_images[min(visible_images)]) as img:
             placeholder_size = img.size
     else:
         placeholder_size = (1920, 1080)
 
+    # Create full list with placeholders for hidden slides
+    all_images = []
     for slide_num in range(1, total_slides + 1):
         if slide_num in hidden_slides:
             # Create placeholder image for hidden slide
@@ -262,15 +336,154 @@ def convert_to_images(pptx_path, temp_dir, dpi):
             placeholder_img = create_hidden_slide_placeholder(placeholder_size)
             placeholder_img.save(placeholder_path, "JPEG")
             all_images.append(placeholder_path)
-        else:
+        elif slide_num in visible_images:
             # Use the actual visible slide image
-            if visible_idx < len(visible_images):
-                all_images.append(visible_images[visible_idx])
-                visible_idx += 1
+            all_images.append(visible_images[slide_num])
 
     return all_images
 
 
+def render_slides(pptx_path, prs, slide_numbers, temp_dir, dpi, cache_dir=None):
+    """Render the given visible slides (1-based) to JPEGs with soffice and pdftoppm.
+
+    soffice leaves hidden slides out of the PDF, so every other slide is
+    hidden in a temporary copy of the deck. Slides keep their positions, which
+    keeps slide number fields correct.
+
+    Conversions run on a persistent soffice worker; see convert_to_pdf.
+
+    Returns a dict mapping slide numbers to image paths.
+    """
+    slides = list(prs.slides)
+    render_set = set(slide_numbers)
+    source_path = pptx_path
+
+    if len(render_set) < sum(1 for s in slides if s.element.get("show") != "0"):
+        original_show = [slide.element.get("show") for slide in slides]
+        try:
+            for slide_num, slide in enumerate(slides, 1):
+                if slide_num not in render_set:
+                    slide.element.set("show", "0")
+            source_path = temp_dir / f"{pptx_path.stem}.pptx"
+            prs.save(str(source_path))
+        finally:
+            for slide, show in zip(slides, original_show):
+                if show is None:
+                    slide.element.attrib.pop("show", None)
+                else:
+                    slide.element.set("show", show)
+
+    print(f"Converting {len(render_set)} slide(s) to PDF...")
+    try:
+        pdf_path = convert_to_pdf(source_path, temp_dir, cache_dir)
+    except ConversionError as e:
+        raise RuntimeError(f"PDF conversion failed: {e}") from e
+
+    # Convert PDF to images
+    print(f"Converting to images at {dpi} DPI...")
+    result = subprocess.run(
+        ["pdftoppm", "-jpeg", "-r", str(dpi), str(pdf_path), str(temp_dir / "slide")],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError("Image conversion failed")
+
+    images = sorted(temp_dir.glob("slide-*.jpg"))
+    return dict(zip(sorted(render_set), images))
+
+
+def convert_to_pdf(source_path, output_dir, cache_dir=None):
+    """Convert a deck to PDF, reusing a headless soffice across runs.
+
+    The shared soffice pool is used if one is running. Otherwise, with a
+    cache_dir, the single worker of a pool under cache_dir/soffice-pool is
+    started, or reused if an earlier run started it, and left running for the
+    next run. Without the UNO bindings, soffice runs once with a persistent
+    profile under cache_dir, which at least spares it setting one up.
+    """
+    pool = SofficePool.running()
+    if pool is None and cache_dir is not None:
+        pool = SofficePool(1, cache_dir / "soffice-pool")
+    if pool is not None:
+        try:
+            return pool.convert(source_path, output_dir, "pdf")
+        except PoolUnavailable:
+            pass  # Fall back to a one-shot soffice
+
+    profile_dir = cache_dir / "soffice-profile" if cache_dir else None
+    return convert_document(source_path, output_dir, "pdf", profile_dir=profile_dir)
+
+
+def slide_cache_keys(prs, dpi):
+    """Return a dict mapping slide numbers (1-based) to render cache keys.
+
+    A key covers the slide's XML, everything it depends on through its
+    relationships (layout, master, theme, images, charts), presentation.xml
+    with its theme and table styles, its position (for slide number fields)
+    and the DPI. Editing one slide therefore only changes that slide's key,
+    while editing a layout or master changes the keys of every slide using it
+    and editing presentation.xml changes every key.
+    """
+    digests = {}
+    presentation = [
+        (str(prs.part.partname), hashlib.sha256(prs.part.blob).hexdigest())
+    ]
+    for rel in prs.part.rels.values():
+        if rel.reltype in PRESENTATION_RENDERED_RELTYPES and not rel.is_external:
+            presentation.extend(_dependency_digests(rel.target_part, digests))
+
+    keys = {}
+    for slide_num, slide in enumerate(prs.slides, 1):
+        key = hashlib.sha256(
+            f"{slide_num}:{prs.slide_width}x{prs.slide_height}:{dpi}".encode()
+        )
+        dependencies = set(_dependency_digests(slide.part, digests))
+        for partname, digest in sorted(dependencies.union(presentation)):
+            key.update(f"\n{partname}:{digest}".encode())
+        keys[slide_num] = key.hexdigest()
+    return keys
+
+
+def _dependency_digests(slide_part, digests):
+    """Yield (partname, digest) for a slide part and every part it renders with.
+
+    digests memoizes part digests across slides, since slides share layouts,
+    masters and themes.
+    """
+    seen = set()
+    stack = [slide_part]
+    while stack:
+        part = stack.pop()
+        if part.partname in seen:
+            continue
+        seen.add(part.partname)
+
+        if part.partname not in digests:
+            digests[part.partname] = hashlib.sha256(part.blob).hexdigest()
+        yield str(part.partname), digests[part.partname]
+
+        skipped = UNRENDERED_RELTYPES
+        if part.content_type == CT.PML_SLIDE_MASTER:
+            skipped = UNRENDERED_RELTYPES | UNRENDERED_MASTER_RELTYPES
+        for rel in part.rels.values():
+            if rel.reltype in skipped:
+                continue
+            if rel.is_external:
+                yield f"{part.partname}->{rel.target_ref}", ""
+            else:
+                stack.append(rel.target_part)
+
+
+def prune_cache(cache_dir, max_images=CACHE_MAX_IMAGES):
+    """Remove the least recently used cached renders beyond max_images."""
+    images = sorted(
+        cache_dir.glob("*.jpg"), key=lambda path: path.stat().st_mtime, reverse=True
+    )
+    for stale in images[max_images:]:
+        stale.unlink(missing_ok=True)
+
+
 def create_grids(
     image_paths,
     cols,
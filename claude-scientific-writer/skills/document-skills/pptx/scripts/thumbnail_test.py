@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from pptx import Presentation
+from pptx.util import Inches
+from thumbnail import slide_cache_keys
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestSlideCacheKeys(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = Path(self.temp_dir.name) / "deck.pptx"
+
+        # Slides 1 and 2 share the title layout, slide 3 uses a blank one
+        prs = Presentation()
+        for layout_index, title in [(0, "First"), (0, "Second"), (6, None)]:
+            slide = prs.slides.add_slide(prs.slide_layouts[layout_index])
+            if title:
+                slide.shapes.title.text = title
+        prs.save(str(self.path))
+        self.keys = self.cache_keys()
+
+    def cache_keys(self):
+        return slide_cache_keys(Presentation(str(self.path)), 100)
+
+    def edit(self, change):
+        """Apply change(prs) to the saved deck and return the new cache keys."""
+        prs = Presentation(str(self.path))
+        change(prs)
+        prs.save(str(self.path))
+        return self.cache_keys()
+
+    def rewrite_part(self, partname, change):
+        """Replace a part's bytes with change(bytes) and return the new cache keys."""
+        rewritten = self.path.with_suffix(".tmp")
+        with zipfile.ZipFile(self.path) as source, zipfile.ZipFile(
+            rewritten, "w", zipfile.ZIP_DEFLATED
+        ) as target:
+            for info in source.infolist():
+                data = source.read(info.filename)
+                if info.filename == partname:
+                    data = change(data)
+                target.writestr(info, data)
+        rewritten.replace(self.path)
+        return self.cache_keys()
+
+    def changed_slides(self, keys):
+        return [number for number in keys if keys[number] != self.keys[number]]
+
+    def test_keys_are_stable(self):
+        self.assertEqual(len(set(self.keys.values())), 3)
+        self.assertEqual(self.cache_keys(), self.keys)
+        self.assertEqual(self.edit(lambda prs: None), self.keys)
+        prs = Presentation(str(self.path))
+        self.assertNotEqual(slide_cache_keys(prs, 200), self.keys)
+
+    def test_editing_a_slide_changes_only_its_key(self):
+        def retitle(prs):
+            prs.slides[1].shapes.title.text = "Second, edited"
+
+        self.assertEqual(self.changed_slides(self.edit(retitle)), [2])
+
+        def add_box(prs):
+            prs.slides[2].shapes.add_textbox(Inches(1), Inches(1), Inches(2), Inches(1))
+
+        self.keys = self.cache_keys()
+        self.assertEqual(self.changed_slides(self.edit(add_box)), [3])
+
+    def test_editing_a_layout_changes_the_keys_of_slides_using_it(self):
+        def rename_layout(prs):
+            prs.slide_layouts[0].name = "Renamed title layout"
+
+        self.assertEqual(self.changed_slides(self.edit(rename_layout)), [1, 2])
+
+    def test_editing_master_theme_or_presentation_changes_every_key(self):
+        def rename_master(prs):
+            prs.slide_master.element.cSld.set("name", "Renamed master")
+
+        self.assertEqual(self.changed_slides(self.edit(rename_master)), [1, 2, 3])
+
+        self.keys = self.cache_keys()
+        keys = self.rewrite_part(
+            "ppt/theme/theme1.xml", lambda data: data.replace(b"Calibri", b"Arial", 1)
+        )
+        self.assertEqual(self.changed_slides(keys), [1, 2, 3])
+
+        self.keys = self.cache_keys()
+
+        def resize(prs):
+            prs.slide_width = Inches(13.333)
+
+        self.assertEqual(self.changed_slides(self.edit(resize)), [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
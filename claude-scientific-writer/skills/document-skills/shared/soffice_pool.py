@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+Pool of persistent headless LibreOffice processes for conversions and recalculation.
+
+Starting soffice takes several seconds, and each script used to pay that for
+every file. The pool keeps a few soffice processes running in the background,
+each listening on its own named pipe with its own profile, and sends jobs to
+them over UNO. Any process can use a running pool; a lock file per worker
+queues jobs between processes, and a job that exceeds its timeout has its
+worker killed and restarted.
+
+When no pool is running, or the Python UNO bindings (python3-uno) are not
+available, convert_document() falls back to a one-shot `soffice --convert-to`.
+
+Used by the docx and pptx ooxml/scripts/pack.py, pptx/scripts/thumbnail.py
+and xlsx/recalc.py, which add this directory (document-skills/shared) to
+sys.path.
+
+Usage:
+    python shared/soffice_pool.py start [--size N]
+    python shared/soffice_pool.py status
+    python shared/soffice_pool.py stop [--state-dir DIR]
+
+    sys.path.append(str(Path(__file__).resolve().parents[N] / "shared"))
+    from soffice_pool import convert_document
+
+    pdf_path = convert_document("deck.pptx", "out/", "pdf")
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:
+    uno = None
+
+STATE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / (
+    "soffice-pool"
+)
+DEFAULT_SIZE = 2  # Worker processes started by `start`
+STARTUP_TIMEOUT = 60  # Seconds to wait for a worker to accept connections
+QUEUE_POLL_INTERVAL = 0.05  # Seconds between checks for a free worker
+KILL_TIMEOUT = 5  # Seconds to wait for a killed worker to exit
+
+# Export filters for --convert-to targets given without one, by document type
+DEFAULT_FILTERS = {
+    "pdf": {
+        "com.sun.star.presentation.PresentationDocument": "impress_pdf_Export",
+        "com.sun.star.sheet.SpreadsheetDocument": "calc_pdf_Export",
+        "com.sun.star.drawing.DrawingDocument": "draw_pdf_Export",
+        "com.sun.star.text.TextDocument": "writer_pdf_Export",
+    },
+}
+
+
+class PoolUnavailable(RuntimeError):
+    """No pool is running, or its workers cannot be reached."""
+
+
+class ConversionError(RuntimeError):
+    """LibreOffice could not load, convert or save a document."""
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Manage a pool of persistent headless LibreOffice processes"
+    )
+    parser.add_argument("command", choices=["start", "stop", "status"])
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=DEFAULT_SIZE,
+        help=f"Number of soffice processes (default: {DEFAULT_SIZE})",
+    )
+    parser.add_argument(
+        "--state-dir",
+        type=Path,
+        default=STATE_DIR,
+        help=f"Directory with the pool's pid files and profiles (default: {STATE_DIR})",
+    )
+    args = parser.parse_args()
+
+    pool = SofficePool.running(args.state_dir) or SofficePool(
+        args.size, args.state_dir
+    )
+    if args.command == "start":
+        try:
+            pool.start()
+        except PoolUnavailable as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Started {pool.size} soffice worker(s) in {pool.state_dir}")
+    elif args.command == "stop":
+        pool.stop()
+        print("Stopped soffice pool")
+    else:
+        if not pool.is_running():
+            print("soffice pool is not running")
+        for worker in pool.status():
+            state = "running" if worker["alive"] else "stopped"
+            print(f"  worker {worker['index']}: {state} (pid {worker['pid']})")
+
+
+def convert_document(
+    input_path, output_dir, convert_to, timeout=None, profile_dir=None
+):
+    """Convert a document like `soffice --headless --convert-to`.
+
+    Uses the running pool when there is one, otherwise spawns soffice once.
+
+    Args:
+        input_path: Document to convert
+        output_dir: Directory for the output, named <input stem>.<extension>
+        convert_to: Target as given to --convert-to, e.g. "pdf" or "html:HTML"
+        timeout: Seconds the conversion may take (default: no limit)
+        profile_dir: Profile directory for a one-shot soffice (default: the
+            user's profile); unused when the pool handles the job
+
+    Returns:
+        Path of the converted file
+
+    Raises:
+        ConversionError: If no output was produced
+        TimeoutError: If the conversion took longer than timeout
+        FileNotFoundError: If soffice is not installed
+    """
+    pool = SofficePool.running()
+    if pool is not None:
+        try:
+            return pool.convert(input_path, output_dir, convert_to, timeout=timeout)
+        except PoolUnavailable:
+            pass  # Fall back to a one-shot soffice
+
+    input_path = Path(input_path)
+    output_path = Path(output_dir) / f"{input_path.stem}.{convert_to.split(':')[0]}"
+    command = ["soffice", "--headless"]
+    if profile_dir is not None:
+        profile_uri = Path(profile_dir).absolute().as_uri()
+        command.append(f"-env:UserInstallation={profile_uri}")
+    command += ["--convert-to", convert_to, "--outdir", str(output_dir)]
+    command.append(str(input_path))
+    try:
+        result = subprocess.run(
+            command, capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        raise TimeoutError(f"Converting {input_path.name} took over {timeout}s")
+    if not output_path.exists():
+        error = result.stderr.strip() or f"Could not convert {input_path}"
+        raise ConversionError(error)
+    return output_path
+
+
+class SofficePool:
+    """Persistent headless soffice workers, shared by every process on the machine.
+
+    Worker i listens on the pipe soffice-pool-<uid>-<state_dir hash>-i and uses
+    its own profile under state_dir, so workers don't contend for a profile
+    lock and pools with different state directories don't share pipes. A pool is
+    "running" while its pool.json exists and any of its workers is alive or busy;
+    workers that have died are relaunched by the next job that picks them.
+    """
+
+    def __init__(self, size=DEFAULT_SIZE, state_dir=STATE_DIR):
+        self.size = size
+        self.state_dir = Path(state_dir)
+
+    @classmethod
+    def running(cls, state_dir=STATE_DIR):
+        """Return the running pool, or None if none has been started."""
+        try:
+            state = json.loads((Path(state_dir) / "pool.json").read_text())
+        except (OSError, ValueError):
+            return None
+        pool = cls(state["size"], state_dir)
+        return pool if pool.is_running() else None
+
+    def is_running(self):
+        """Whether the pool was started and still has a live or busy worker.
+
+        A pool.json left behind by workers that are all gone (e.g. after a
+        reboot) is removed, so scripts don't relaunch a pool nobody started.
+        """
+        pool_file = self.state_dir / "pool.json"
+        if not pool_file.exists():
+            return False
+        for index in range(self.size):
+            if self._worker_pid(index) is not None or self._worker_busy(index):
+                return True
+        pool_file.unlink(missing_ok=True)
+        return False
+
+    def start(self):
+        """Launch every worker and mark the pool as running.
+
+        Raises:
+            PoolUnavailable: If the UNO bindings or soffice are missing, or a
+                worker doesn't come up
+        """
+        _require_pool_support()
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        for index in range(self.size):
+            with self._worker_lock(index, blocking=True):
+                self._ensure_worker(index)
+        (self.state_dir / "pool.json").write_text(json.dumps({"size": self.size}))
+
+    def stop(self):
+        """Kill every worker and mark the pool as stopped."""
+        (self.state_dir / "pool.json").unlink(missing_ok=True)
+        for index in range(self.size):
+            self._kill_worker(index)
+
+    def status(self):
+        """Return a list of {"index", "pid", "alive"} dicts, one per worker."""
+        workers = []
+        for index in range(self.size):
+            pid = self._worker_pid(index)
+            workers.append({"index": index, "pid": pid, "alive": pid is not None})
+        return workers
+
+    def convert(self, input_path, output_dir, convert_to, timeout=None):
+        """Convert a document on a pool worker; see convert_document().
+
+        Raises:
+            PoolUnavailable: If no worker can be reached
+            ConversionError: If the document cannot be loaded or exported
+            TimeoutError: If the job took longer than timeout
+        """
+        input_path = Path(input_path).absolute()
+        extension, _, filter_name = convert_to.partition(":")
+        output_path = Path(output_dir).absolute() / f"{input_path.stem}.{extension}"
+
+        def job(desktop):
+            document = _load(desktop, input_path)
+            try:
+                export_filter = filter_name or _default_filter(document, extension)
+                document.storeToURL(
+                    uno.systemPathToFileUrl(str(output_path)),
+                    _properties(FilterName=export_filter, Overwrite=True),
+                )
+            finally:
+                document.close(True)
+
+        self._run(job, f"Converting {input_path.name}", timeout)
+        if not output_path.exists():
+            raise ConversionError(f"Could not convert {input_path}")
+        return output_path
+
+    def recalculate(self, path, timeout=None):
+        """Recalculate every formula in a spreadsheet and save it in place.
+
+        Raises:
+            PoolUnavailable: If no worker can be reached
+            ConversionError: If the workbook cannot be loaded or saved
+            TimeoutError: If the job took longer than timeout
+        """
+        path = Path(path).absolute()
+
+        def job(desktop):
+            document = _load(desktop, path)
+            try:
+                document.calculateAll()
+                document.store()
+            finally:
+                document.close(True)
+
+        self._run(job, f"Recalculating {path.name}", timeout)
+
+    # ===== Private: Jobs =====
+
+    def _run(self, job, description, timeout):
+        """Run job(desktop) on the first free worker, waiting for one if needed."""
+        _require_pool_support()
+        index, lock_file = self._acquire_worker()
+        try:
+            desktop = self._ensure_worker(index)
+            outcome = {}
+
+            def target():
+                try:
+                    job(desktop)
+                except Exception as e:
+                    outcome["error"] = e
+
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            thread.join(timeout)
+            if thread.is_alive():
+                # The worker is stuck on this document; the next job restarts it
+                self._kill_worker(index)
+                raise TimeoutError(f"{description} took over {timeout}s")
+            if "error" in outcome:
+                raise ConversionError(f"{description} failed: {outcome['error']}")
+        finally:
+            lock_file.close()
+
+    def _acquire_worker(self):
+        """Lock the first idle worker; return (index, open lock file)."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        while True:
+            for index in range(self.size):
+                lock_file = self._worker_lock(index, blocking=False)
+                if lock_file is not None:
+                    return index, lock_file
+            time.sleep(QUEUE_POLL_INTERVAL)
+
+    def _worker_lock(self, index, blocking):
+        """Open and lock worker index's lock file; None if busy and not blocking.
+
+        The lock is released when the returned file is closed, or when the
+        holding process exits.
+        """
+        lock_file = open(self.state_dir / f"worker-{index}.lock", "w")
+        try:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            fcntl.flock(lock_file, flags)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def _worker_busy(self, index):
+        """Whether another process holds worker index's lock, e.g. mid-restart."""
+        if fcntl is None or not (self.state_dir / f"worker-{index}.lock").exists():
+            return False
+        lock_file = self._worker_lock(index, blocking=False)
+        if lock_file is None:
+            return True
+        lock_file.close()
+        return False
+
+    # ===== Private: Workers =====
+
+    def _ensure_worker(self, index):
+        """Return worker index's Desktop, launching the worker if it isn't up.
+
+        Must be called with the worker's lock held.
+        """
+        if self._worker_pid(index) is not None:
+            desktop = self._connect(index)
+            if desktop is not None:
+                return desktop
+            self._kill_worker(index)
+
+        soffice = shutil.which("soffice")
+        if soffice is None:
+            raise PoolUnavailable("soffice not found")
+        process = subprocess.Popen(
+            [
+                soffice,
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--norestore",
+                "--nolockcheck",
+                f"-env:UserInstallation={self._profile_dir(index).as_uri()}",
+                f"{self._accept_arg(index)}urp;StarOffice.ComponentContext",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,  # Outlive the process that launched it
+        )
+        (self.state_dir / f"worker-{index}.pid").write_text(str(process.pid))
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                break
+            desktop = self._connect(index)
+            if desktop is not None:
+                return desktop
+            time.sleep(0.25)
+        self._kill_worker(index)
+        raise PoolUnavailable(f"soffice worker {index} did not start")
+
+    def _connect(self, index):
+        """Return the Desktop of worker index, or None if it isn't accepting."""
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        try:
+            context = resolver.resolve(
+                f"uno:{self._connection(index)};urp;StarOffice.ComponentContext"
+            )
+        except Exception:
+            return None
+        return context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    def _kill_worker(self, index):
+        pid = self._worker_pid(index)
+        if pid is not None:
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except OSError:
+                pass
+            deadline = time.monotonic() + KILL_TIMEOUT
+            while _pid_alive(pid) and time.monotonic() < deadline:
+                time.sleep(QUEUE_POLL_INTERVAL)
+        (self.state_dir / f"worker-{index}.pid").unlink(missing_ok=True)
+
+    def _worker_pid(self, index):
+        """Return worker index's pid if that process is alive and is our worker.
+
+        A pid file can outlive its worker, and the pid be reused by an
+        unrelated process, so the process must still be listening on this
+        worker's pipe. Stale pid files are removed.
+        """
+        pid = self._read_pid(index)
+        if pid is None:
+            return None
+        if _pid_alive(pid) and self._accept_arg(index) in _command_line(pid):
+            return pid
+        (self.state_dir / f"worker-{index}.pid").unlink(missing_ok=True)
+        return None
+
+    def _read_pid(self, index):
+        try:
+            return int((self.state_dir / f"worker-{index}.pid").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _connection(self, index):
+        state_path = str(self.state_dir.resolve()).encode("utf-8")
+        state = hashlib.sha1(state_path).hexdigest()[:12]
+        return f"pipe,name=soffice-pool-{os.getuid()}-{state}-{index}"
+
+    def _accept_arg(self, index):
+        # The trailing ";" keeps worker 1 from matching worker 10's command line
+        return f"--accept={self._connection(index)};"
+
+    def _profile_dir(self, index):
+        return (self.state_dir / f"profile-{index}").absolute()
+
+
+def _require_pool_support():
+    if uno is None:
+        raise PoolUnavailable("Python UNO bindings (python3-uno) are not installed")
+    if fcntl is None:
+        raise PoolUnavailable("soffice pool is not supported on this platform")
+
+
+def _pid_alive(pid):
+    """Whether pid is running; exited children of this process are reaped first."""
+    if pid is None:
+        return False
+    try:
+        # A worker launched by this process stays a zombie, which os.kill()
+        # still finds, until it is waited for
+        if os.waitpid(pid, os.WNOHANG)[0] == pid:
+            return False
+    except ChildProcessError:
+        pass  # Not our child; whoever launched it reaps it
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _command_line(pid):
+    """Return the command line of process pid, or "" if it cannot be read."""
+    try:
+        cmdline = Path(f"/proc/{pid}/cmdline").read_bytes()
+        return cmdline.replace(b"\0", b" ").decode("utf-8", errors="replace")
+    except OSError:
+        pass
+    try:  # No /proc, e.g. macOS
+        result = subprocess.run(
+            ["ps", "-p", str(pid), "-o", "command="], capture_output=True, text=True
+        )
+    except OSError:
+        return ""
+    return result.stdout
+
+
+def _properties(**values):
+    """Build a tuple of UNO PropertyValues from keyword arguments."""
+    properties = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        properties.append(prop)
+    return tuple(properties)
+
+
+def _load(desktop, path):
+    document = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(str(path)), "_blank", 0, _properties(Hidden=True)
+    )
+    if document is None:
+        raise ConversionError(f"Could not load {path}")
+    return document
+
+
+def _default_filter(document, extension):
+    """Pick the export filter soffice --convert-to would use for extension."""
+    for service, filter_name in DEFAULT_FILTERS.get(extension, {}).items():
+        if document.supportsService(service):
+            return filter_name
+    raise ConversionError(
+        f"No default export filter for {extension}; give one as {extension}:Filter"
+    )
+
+
+if __name__ == "__main__":
+    main()
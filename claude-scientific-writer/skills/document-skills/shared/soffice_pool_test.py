@@ -0,0 +1,189 @@
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import zipfile
+from pathlib import Path
+
+import soffice_pool
+from soffice_pool import SofficePool, convert_document
+
+CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+  <Default Extension="xml" ContentType="application/xml"/>
+  <Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>
+"""
+
+ROOT_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>
+"""
+
+DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:body><w:p><w:r><w:t>Hello from the soffice pool</w:t></w:r></w:p></w:body>
+</w:document>
+"""
+
+
+def write_docx(path):
+    with zipfile.ZipFile(path, "w") as docx:
+        docx.writestr("[Content_Types].xml", CONTENT_TYPES_XML)
+        docx.writestr("_rels/.rels", ROOT_RELS_XML)
+        docx.writestr("word/document.xml", DOCUMENT_XML)
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestSofficePool(unittest.TestCase):
+    def test_pools_with_different_state_dirs_use_different_pipes(self):
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            pipe = SofficePool(1, a)._connection(0)
+            self.assertNotEqual(pipe, SofficePool(1, b)._connection(0))
+            self.assertEqual(pipe, SofficePool(2, a)._connection(0))
+            self.assertNotEqual(pipe, SofficePool(2, a)._connection(1))
+
+    def fake_worker(self, pool, index):
+        """Start a process whose command line looks like worker index's soffice."""
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "import time; time.sleep(30)",
+                pool._accept_arg(index),
+            ],
+            start_new_session=True,
+        )
+        self.addCleanup(process.kill)
+        # The command line shows up in /proc shortly after the process starts
+        deadline = time.monotonic() + 5
+        while pool._accept_arg(index) not in soffice_pool._command_line(process.pid):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        (pool.state_dir / f"worker-{index}.pid").write_text(str(process.pid))
+        return process
+
+    def test_killed_child_is_not_alive(self):
+        # A killed child stays a zombie until it is waited for
+        with tempfile.TemporaryDirectory() as state_dir:
+            pool = SofficePool(1, state_dir)
+            process = self.fake_worker(pool, 0)
+            self.assertEqual(pool._worker_pid(0), process.pid)
+            start = time.monotonic()
+            pool._kill_worker(0)
+            self.assertLess(time.monotonic() - start, soffice_pool.KILL_TIMEOUT)
+            self.assertFalse(soffice_pool._pid_alive(process.pid))
+            self.assertEqual(pool.status(), [{"index": 0, "pid": None, "alive": False}])
+
+    def test_reused_pid_is_not_killed(self):
+        with tempfile.TemporaryDirectory() as state_dir:
+            pool = SofficePool(11, state_dir)
+            # Worker 0's pid now belongs to an unrelated process, and worker 1's
+            # to worker 10, whose pipe name starts with worker 1's
+            unrelated = subprocess.Popen(["sleep", "30"], start_new_session=True)
+            self.addCleanup(unrelated.kill)
+            worker_10 = self.fake_worker(pool, 10)
+            (Path(state_dir) / "worker-0.pid").write_text(str(unrelated.pid))
+            (Path(state_dir) / "worker-1.pid").write_text(str(worker_10.pid))
+
+            for index in (0, 1):
+                self.assertIsNone(pool._worker_pid(index))
+                pool._kill_worker(index)
+                self.assertFalse((Path(state_dir) / f"worker-{index}.pid").exists())
+            self.assertIsNone(unrelated.poll())
+            self.assertEqual(pool._worker_pid(10), worker_10.pid)
+
+    def test_stale_pool_is_not_running(self):
+        with tempfile.TemporaryDirectory() as state_dir:
+            pool_file = Path(state_dir) / "pool.json"
+            pool_file.write_text(json.dumps({"size": 2}))
+            (Path(state_dir) / "worker-0.pid").write_text("999999999")
+            self.assertIsNone(SofficePool.running(state_dir))
+            self.assertFalse(pool_file.exists())
+
+            # A pool with one live worker is running
+            pool_file.write_text(json.dumps({"size": 2}))
+            self.fake_worker(SofficePool(2, state_dir), 1)
+            self.assertIsNotNone(SofficePool.running(state_dir))
+
+    def test_pool_restarting_its_only_worker_is_running(self):
+        with tempfile.TemporaryDirectory() as state_dir:
+            (Path(state_dir) / "pool.json").write_text(json.dumps({"size": 1}))
+            check = (
+                "import sys, soffice_pool; "
+                "sys.exit(soffice_pool.SofficePool.running(sys.argv[1]) is None)"
+            )
+            # Worker locks are held per process, so check from another one
+            with SofficePool(1, state_dir)._worker_lock(0, blocking=True):
+                result = subprocess.run(
+                    [sys.executable, "-c", check, state_dir],
+                    cwd=Path(__file__).parent,
+                )
+            self.assertEqual(result.returncode, 0)
+            self.assertIsNone(SofficePool.running(state_dir))
+
+    def test_pid_alive_for_other_processes(self):
+        self.assertFalse(soffice_pool._pid_alive(None))
+        self.assertTrue(soffice_pool._pid_alive(1))  # Not our child
+        process = subprocess.Popen(["sleep", "30"])
+        os.kill(process.pid, signal.SIGKILL)
+        process.wait()
+        self.assertFalse(soffice_pool._pid_alive(process.pid))
+
+
+@unittest.skipIf(
+    shutil.which("soffice") is None, "LibreOffice (soffice) is not installed"
+)
+class TestSofficeConversion(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.docx = Path(self.tmp.name) / "hello.docx"
+        write_docx(self.docx)
+
+    def test_one_shot_conversion(self):
+        output_dir = Path(self.tmp.name) / "out"
+        output_dir.mkdir()
+        pdf = convert_document(
+            self.docx,
+            output_dir,
+            "pdf",
+            timeout=120,
+            profile_dir=Path(self.tmp.name) / "profile",
+        )
+        self.assertTrue(pdf.read_bytes().startswith(b"%PDF"))
+
+    @unittest.skipIf(
+        soffice_pool.uno is None, "Python UNO bindings (python3-uno) are not installed"
+    )
+    def test_pool_conversion_and_restart(self):
+        pool = SofficePool(1, Path(self.tmp.name) / "pool")
+        pool.start()
+        self.addCleanup(pool.stop)
+        self.assertTrue(pool.status()[0]["alive"])
+
+        output_dir = Path(self.tmp.name) / "out"
+        output_dir.mkdir()
+        pdf = pool.convert(self.docx, output_dir, "pdf", timeout=120)
+        self.assertTrue(pdf.read_bytes().startswith(b"%PDF"))
+
+        # A killed worker is relaunched by the next job
+        pool._kill_worker(0)
+        self.assertFalse(pool.status()[0]["alive"])
+        pdf.unlink()
+        pool.convert(self.docx, output_dir, "pdf", timeout=120)
+        self.assertTrue(pdf.exists())
+
+        pool.stop()
+        self.assertEqual([worker["alive"] for worker in pool.status()], [False])
+
+
+if __name__ == "__main__":
+    unittest.main()
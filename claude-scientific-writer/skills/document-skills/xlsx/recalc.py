@@ -2,15 +2,47 @@
 """
 Excel Formula Recalculation Script
 Recalculates all formulas in an Excel file using LibreOffice
+
+Uses the persistent soffice pool when one is running
+(python ../shared/soffice_pool.py start), otherwise starts soffice for each workbook.
 """
 
+import argparse
 import json
 import sys
 import subprocess
 import os
 import platform
+import posixpath
+import zipfile
 from pathlib import Path
-from openpyxl import load_workbook
+from xml.etree import ElementTree
+from openpyxl.utils.cell import column_index_from_string, get_column_letter
+
+# soffice_pool.py is shared by the docx, pptx and xlsx skills
+sys.path.append(str(Path(__file__).resolve().parents[1] / "shared"))
+from soffice_pool import ConversionError, PoolUnavailable, SofficePool
+
+EXCEL_ERRORS = ['#VALUE!', '#DIV/0!', '#REF!', '#NAME?', '#NULL!', '#NUM!', '#N/A']
+MAX_LOCATIONS = 20  # Locations reported per error type by default
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+SHEET = f'{MAIN_NS}sheet'
+SHEET_DATA = f'{MAIN_NS}sheetData'
+ROW = f'{MAIN_NS}row'
+CELL = f'{MAIN_NS}c'
+VALUE = f'{MAIN_NS}v'
+FORMULA = f'{MAIN_NS}f'
+INLINE_STRING = f'{MAIN_NS}is'
+STRING_ITEM = f'{MAIN_NS}si'
+RICH_RUN = f'{MAIN_NS}r'
+TEXT = f'{MAIN_NS}t'
+REL_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+RELATIONSHIP = '{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+REL_TYPES = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+OFFICE_DOCUMENT = f'{REL_TYPES}/officeDocument'
+WORKSHEET = f'{REL_TYPES}/worksheet'
+SHARED_STRINGS = f'{REL_TYPES}/sharedStrings'
 
 
 def setup_libreoffice_macro():
@@ -50,24 +82,37 @@ def setup_libreoffice_macro():
         return False
 
 
-def recalc(filename, timeout=30):
+def recalc_with_pool(abs_path, timeout):
     """
-    Recalculate formulas in Excel file and report any errors
-    
-    Args:
-        filename: Path to Excel file
-        timeout: Maximum time to wait for recalculation (seconds)
+    Recalculate on the persistent soffice pool (see soffice_pool.py)
     
     Returns:
-        dict with error locations and counts
-    """
-    if not Path(filename).exists():
-        return {'error': f'File {filename} does not exist'}
+        None on success, otherwise an error message
     
-    abs_path = str(Path(filename).absolute())
+    Raises:
+        PoolUnavailable: If no pool is running or its workers can't be reached
+    """
+    pool = SofficePool.running()
+    if pool is None:
+        raise PoolUnavailable('No soffice pool is running')
+    try:
+        pool.recalculate(abs_path, timeout=timeout)
+    except TimeoutError:
+        pass  # Like the one-shot timeout: report whatever was saved
+    except ConversionError as e:
+        return str(e)
+    return None
+
+
+def recalc_with_macro(abs_path, timeout):
+    """
+    Recalculate by starting soffice with the RecalculateAndSave macro
     
+    Returns:
+        None on success, otherwise an error message
+    """
     if not setup_libreoffice_macro():
-        return {'error': 'Failed to setup LibreOffice macro'}
+        return 'Failed to setup LibreOffice macro'
     
     cmd = [
         'soffice', '--headless', '--norestore',
@@ -94,85 +139,264 @@ def recalc(filename, timeout=30):
     if result.returncode != 0 and result.returncode != 124:  # 124 is timeout exit code
         error_msg = result.stderr or 'Unknown error during recalculation'
         if 'Module1' in error_msg or 'RecalculateAndSave' not in error_msg:
-            return {'error': 'LibreOffice macro not configured properly'}
+            return 'LibreOffice macro not configured properly'
         else:
-            return {'error': error_msg}
+            return error_msg
+    
+    return None
+
+
+def recalc(filename, timeout=30, max_locations=MAX_LOCATIONS, on_error=None):
+    """
+    Recalculate formulas in Excel file and report any errors
+    
+    Args:
+        filename: Path to Excel file
+        timeout: Maximum time to wait for recalculation (seconds)
+        max_locations: Locations to report per error type (None for all)
+        on_error: Optional callback(error, location), called as each error is found
+    
+    Returns:
+        dict with error locations and counts
+    """
+    if not Path(filename).exists():
+        return {'error': f'File {filename} does not exist'}
+    
+    abs_path = str(Path(filename).absolute())
+    
+    try:
+        error = recalc_with_pool(abs_path, timeout)
+    except PoolUnavailable:
+        error = recalc_with_macro(abs_path, timeout)
+    if error:
+        return {'error': error}
     
     # Check for Excel errors in the recalculated file - scan ALL cells
     try:
-        wb = load_workbook(filename, data_only=True)
-        
-        excel_errors = ['#VALUE!', '#DIV/0!', '#REF!', '#NAME?', '#NULL!', '#NUM!', '#N/A']
-        error_details = {err: [] for err in excel_errors}
-        total_errors = 0
-        
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            # Check ALL rows and columns - no limits
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value is not None and isinstance(cell.value, str):
-                        for err in excel_errors:
-                            if err in cell.value:
-                                location = f"{sheet_name}!{cell.coordinate}"
-                                error_details[err].append(location)
-                                total_errors += 1
-                                break
-        
-        wb.close()
-        
-        # Build result summary
-        result = {
-            'status': 'success' if total_errors == 0 else 'errors_found',
-            'total_errors': total_errors,
-            'error_summary': {}
-        }
-        
-        # Add non-empty error categories
-        for err_type, locations in error_details.items():
-            if locations:
-                result['error_summary'][err_type] = {
-                    'count': len(locations),
-                    'locations': locations[:20]  # Show up to 20 locations
-                }
+        return scan_workbook(filename, max_locations=max_locations, on_error=on_error)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def scan_workbook(filename, max_locations=MAX_LOCATIONS, on_error=None):
+    """
+    Scan every cell for Excel errors and count formulas, streaming the sheet XML
+    
+    Only cells with an error (t="e") or string value are inspected, and rows are
+    discarded as soon as they have been scanned, so memory use doesn't grow with
+    the size of the workbook.
+    
+    Args:
+        filename: Path to Excel file
+        max_locations: Locations to report per error type (None for all);
+            counts always cover every error
+        on_error: Optional callback(error, location), called as each error is found
+    
+    Returns:
+        dict with error locations and counts, as returned by recalc()
+    """
+    error_details = {err: {'count': 0, 'locations': []} for err in EXCEL_ERRORS}
+    total_errors = 0
+    formula_count = 0
+    
+    with zipfile.ZipFile(filename) as zf:
+        workbook_path = _related_parts(zf, '')[OFFICE_DOCUMENT][0]
+        shared_errors = _shared_string_errors(zf, workbook_path)
         
-        # Add formula count for context - also check ALL cells
-        wb_formulas = load_workbook(filename, data_only=False)
-        formula_count = 0
-        for sheet_name in wb_formulas.sheetnames:
-            ws = wb_formulas[sheet_name]
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value and isinstance(cell.value, str) and cell.value.startswith('='):
+        for sheet_name, sheet_path in _worksheets(zf, workbook_path):
+            with zf.open(sheet_path) as source:
+                for coordinate, error, has_formula in _scan_sheet(source, shared_errors):
+                    if has_formula:
                         formula_count += 1
-        wb_formulas.close()
-        
-        result['total_formulas'] = formula_count
+                    if error is None:
+                        continue
+                    
+                    location = f"{sheet_name}!{coordinate}"
+                    details = error_details[error]
+                    details['count'] += 1
+                    if max_locations is None or len(details['locations']) < max_locations:
+                        details['locations'].append(location)
+                    total_errors += 1
+                    if on_error:
+                        on_error(error, location)
+    
+    # Build result summary
+    result = {
+        'status': 'success' if total_errors == 0 else 'errors_found',
+        'total_errors': total_errors,
+        'error_summary': {}
+    }
+    
+    # Add non-empty error categories
+    for err_type, details in error_details.items():
+        if details['count']:
+            result['error_summary'][err_type] = details
+    
+    # Add formula count for context
+    result['total_formulas'] = formula_count
+    
+    return result
+
+
+def _find_error(value):
+    """Return the first Excel error contained in a cell value, or None"""
+    for err in EXCEL_ERRORS:
+        if err in value:
+            return err
+    return None
+
+
+def _scan_sheet(source, shared_errors):
+    """
+    Yield (coordinate, error, has_formula) for each cell with an error or formula
+    
+    Rows are removed from the tree once scanned. Cells without an r attribute
+    get their coordinate from their position, as in openpyxl.
+    """
+    sheet_data = None
+    row_index = 0
+    for event, elem in ElementTree.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if elem.tag == SHEET_DATA:
+                sheet_data = elem
+            elif elem.tag == ROW:
+                row_index = int(elem.get('r', row_index + 1))
+            continue
+        if elem.tag != ROW:
+            continue
         
-        return result
+        column_index = 0
+        for cell in elem.iter(CELL):
+            reference = cell.get('r')
+            if reference:
+                column_index = column_index_from_string(reference.rstrip('0123456789'))
+            else:
+                column_index += 1
+                reference = f"{get_column_letter(column_index)}{row_index}"
+            
+            has_formula = cell.find(FORMULA) is not None
+            error = None
+            cell_type = cell.get('t')
+            if cell_type == 's':
+                value = cell.findtext(VALUE)
+                error = shared_errors.get(int(value)) if value else None
+            elif cell_type in ('e', 'str'):
+                error = _find_error(cell.findtext(VALUE) or '')
+            elif cell_type == 'inlineStr':
+                inline = cell.find(INLINE_STRING)
+                if inline is not None:
+                    error = _find_error(_string_item_text(inline))
+            
+            if error is not None or has_formula:
+                yield reference, error, has_formula
         
-    except Exception as e:
-        return {'error': str(e)}
+        if sheet_data is not None:
+            sheet_data.remove(elem)
+        else:
+            elem.clear()
+
+
+def _shared_string_errors(zf, workbook_path):
+    """Map shared string indices to the Excel error they contain, if any"""
+    errors = {}
+    paths = _related_parts(zf, workbook_path).get(SHARED_STRINGS)
+    if not paths:
+        return errors
+    
+    with zf.open(paths[0]) as source:
+        index = 0
+        for _, elem in ElementTree.iterparse(source):
+            if elem.tag != STRING_ITEM:
+                continue
+            error = _find_error(_string_item_text(elem))
+            if error is not None:
+                errors[index] = error
+            index += 1
+            elem.clear()
+    return errors
+
+
+def _string_item_text(item):
+    """Plain text of a string item: its own <t> and rich text runs, without phonetics"""
+    parts = [item.findtext(TEXT) or '']
+    parts.extend(run.findtext(TEXT) or '' for run in item.findall(RICH_RUN))
+    return ''.join(parts)
+
+
+def _worksheets(zf, workbook_path):
+    """Return (sheet name, part path) for each worksheet, in workbook order"""
+    targets = {}
+    for rel_type, paths_by_id in _relationships(zf, workbook_path).items():
+        if rel_type == WORKSHEET:
+            targets.update(paths_by_id)
+    
+    root = ElementTree.fromstring(zf.read(workbook_path))
+    return [
+        (sheet.get('name'), targets[sheet.get(REL_ID)])
+        for sheet in root.iter(SHEET)
+        if sheet.get(REL_ID) in targets
+    ]
+
+
+def _related_parts(zf, part_path):
+    """Map relationship types of a part to the paths of their targets"""
+    return {
+        rel_type: list(paths_by_id.values())
+        for rel_type, paths_by_id in _relationships(zf, part_path).items()
+    }
+
+
+def _relationships(zf, part_path):
+    """Map relationship types of a part to {relationship id: target path}"""
+    folder, name = posixpath.split(part_path)
+    rels_path = posixpath.join(folder, '_rels', f"{name}.rels")
+    try:
+        root = ElementTree.fromstring(zf.read(rels_path))
+    except KeyError:
+        return {}
+    
+    relationships = {}
+    for rel in root.iter(RELATIONSHIP):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = rel.get('Target')
+        if target.startswith('/'):
+            path = target.lstrip('/')
+        else:
+            path = posixpath.normpath(posixpath.join(folder, target))
+        relationships.setdefault(rel.get('Type'), {})[rel.get('Id')] = path
+    return relationships
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python recalc.py <excel_file> [timeout_seconds]")
-        print("\nRecalculates all formulas in an Excel file using LibreOffice")
-        print("\nReturns JSON with error details:")
-        print("  - status: 'success' or 'errors_found'")
-        print("  - total_errors: Total number of Excel errors found")
-        print("  - total_formulas: Number of formulas in the file")
-        print("  - error_summary: Breakdown by error type with locations")
-        print("    - #VALUE!, #DIV/0!, #REF!, #NAME?, #NULL!, #NUM!, #N/A")
-        sys.exit(1)
-    
-    filename = sys.argv[1]
-    timeout = int(sys.argv[2]) if len(sys.argv) > 2 else 30
-    
-    result = recalc(filename, timeout)
+    parser = argparse.ArgumentParser(
+        description='Recalculates all formulas in an Excel file using LibreOffice',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""Returns JSON with error details:
+  - status: 'success' or 'errors_found'
+  - total_errors: Total number of Excel errors found
+  - total_formulas: Number of formulas in the file
+  - error_summary: Breakdown by error type with locations
+    - #VALUE!, #DIV/0!, #REF!, #NAME?, #NULL!, #NUM!, #N/A""",
+    )
+    parser.add_argument('excel_file', help='Excel file to recalculate')
+    parser.add_argument('timeout', nargs='?', type=int, default=30,
+                        help='Maximum seconds for recalculation (default: 30)')
+    parser.add_argument('--max-locations', type=int, default=MAX_LOCATIONS,
+                        help=f'Locations to report per error type (default: {MAX_LOCATIONS}, 0 for all)')
+    parser.add_argument('--progress', action='store_true',
+                        help='Print each error to stderr as soon as it is found')
+    args = parser.parse_args()
+    
+    on_error = None
+    if args.progress:
+        def on_error(error, location):
+            print(f"{location}: {error}", file=sys.stderr, flush=True)
+    
+    result = recalc(args.excel_file, args.timeout,
+                    max_locations=args.max_locations or None, on_error=on_error)
     print(json.dumps(result, indent=2))
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,94 @@
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from openpyxl import Workbook
+
+import recalc
+from recalc import scan_workbook
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestScanWorkbook(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = Path(self.temp_dir.name) / 'book.xlsx'
+
+        wb = Workbook()
+        data = wb.active
+        data.title = 'Data'
+        data['A1'] = 'Label'  # shared string without an error
+        data['B1'] = '=1/0'
+        data['B2'] = '#DIV/0!'  # error cell (t='e')
+        data['B3'] = '#DIV/0!'
+        data['C1'] = 'Lookup failed: #N/A'  # shared string containing an error
+        data['C2'] = 'Lookup failed: #N/A'  # the same shared string again
+        data['D5'] = '=SUM(A1:A3)'
+
+        summary = wb.create_sheet('Summary')
+        summary['A1'] = '#REF!'
+        summary['B2'] = '=Data!B1'
+        for row in range(1, 4):
+            summary[f'E{row}'] = '#DIV/0!'
+        wb.save(self.path)
+
+    def test_counts_and_locations(self):
+        result = scan_workbook(self.path)
+        self.assertEqual(result['status'], 'errors_found')
+        self.assertEqual(result['total_errors'], 8)
+        self.assertEqual(result['total_formulas'], 3)
+        self.assertEqual(
+            result['error_summary'],
+            {
+                '#DIV/0!': {
+                    'count': 5,
+                    'locations': [
+                        'Data!B2',
+                        'Data!B3',
+                        'Summary!E1',
+                        'Summary!E2',
+                        'Summary!E3',
+                    ],
+                },
+                '#REF!': {'count': 1, 'locations': ['Summary!A1']},
+                '#N/A': {'count': 2, 'locations': ['Data!C1', 'Data!C2']},
+            },
+        )
+
+    def test_on_error_sees_every_error_in_order(self):
+        found = []
+        scan_workbook(self.path, max_locations=1, on_error=lambda *e: found.append(e))
+        self.assertEqual(len(found), 8)
+        self.assertEqual(found[:3], [
+            ('#N/A', 'Data!C1'),
+            ('#DIV/0!', 'Data!B2'),
+            ('#N/A', 'Data!C2'),
+        ])
+
+    def run_main(self, *args):
+        output = io.StringIO()
+        with mock.patch.object(recalc, 'recalc_with_pool', return_value=None), \
+                mock.patch('sys.argv', ['recalc.py', str(self.path), *args]), \
+                contextlib.redirect_stdout(output):
+            recalc.main()
+        return json.loads(output.getvalue())
+
+    def test_max_locations_truncates_locations(self):
+        result = self.run_main('--max-locations', '2')
+        div0 = result['error_summary']['#DIV/0!']
+        self.assertEqual(div0['count'], 5)
+        self.assertEqual(div0['locations'], ['Data!B2', 'Data!B3'])
+        self.assertEqual(result['error_summary']['#REF!']['locations'], ['Summary!A1'])
+        self.assertEqual(result['total_errors'], 8)
+
+        result = self.run_main('--max-locations', '0')
+        self.assertEqual(len(result['error_summary']['#DIV/0!']['locations']), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Metadata Response Cache
+Persistent SQLite cache for CrossRef, doi.org, PubMed and arXiv responses.
+
+Shared by citation-management/scripts (doi_to_bibtex.py, extract_metadata.py,
+validate_citations.py) and literature-review/scripts/verify_citations.py; keep
+the copies identical. Both copies use the same cache file, so a record fetched
+by one script is reused by the others.
+
+Responses are keyed by endpoint and normalized identifier (a DOI is the same
+with or without its https://doi.org/ prefix and in any letter case). Successful
+responses are kept for 30 days and "not found" responses (404/410) for one day;
+server errors are never cached. A 200 response that a not_found check rejects
+(an empty search result) is cached and returned as a 404. In offline mode only cached responses are
+served, including expired ones, and anything else fails with OfflineCacheMiss.
+
+The cache lives in $CITATION_CACHE_DIR, or ~/.cache/citation-metadata. It is
+created on the first lookup; if it cannot be opened, lookups go to the network
+with a warning (in offline mode that is an error, CacheUnavailable).
+
+Usage:
+    from metadata_cache import MetadataCache, cached_request
+
+    cache = MetadataCache(offline=False)
+    response = cached_request(session, cache, 'crossref/works', doi,
+                              f'https://api.crossref.org/works/{doi}', timeout=15)
+    if response.status_code == 200:
+        message = response.json()['message']
+
+    # Inspect or clear the cache
+    python metadata_cache.py --stats
+    python metadata_cache.py --clear
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import requests
+
+CACHE_DIR = Path(
+    os.environ.get('CITATION_CACHE_DIR')
+    or Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'citation-metadata'
+)
+CACHE_FILE = 'metadata.sqlite3'
+
+DAY = 24 * 60 * 60
+DEFAULT_TTL = 30 * DAY
+DEFAULT_NEGATIVE_TTL = 1 * DAY
+
+# Statuses that mean the record does not exist, cached for negative_ttl
+NOT_FOUND_STATUSES = {404, 410}
+
+# Prefixes that do not change which record an identifier refers to
+IDENTIFIER_PREFIXES = (
+    'https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'http://dx.doi.org/',
+    'doi:', 'arxiv:', 'pmid:',
+)
+
+
+class OfflineCacheMiss(requests.exceptions.RequestException):
+    """Raised in offline mode when a response is not in the cache."""
+
+
+class CacheUnavailable(Exception):
+    """Raised in offline mode (or by open()) when the cache cannot be opened."""
+
+
+class CachedResponse:
+    """The parts of requests.Response that the citation scripts use."""
+
+    def __init__(self, status_code: int, content: bytes, encoding: Optional[str],
+                 from_cache: bool):
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+        self.from_cache = from_cache
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+def normalize_identifier(identifier: str) -> str:
+    """Normalize a DOI, PMID or arXiv ID for use as a cache key."""
+    identifier = identifier.strip().lower()
+    for prefix in IDENTIFIER_PREFIXES:
+        if identifier.startswith(prefix):
+            identifier = identifier[len(prefix):]
+    return identifier.strip()
+
+
+class MetadataCache:
+    """SQLite-backed response cache, safe to share between threads."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL, offline: bool = False):
+        """
+        Set up the cache; the file is opened (or created) on first use.
+
+        Args:
+            cache_dir: Directory for the cache file (default: CACHE_DIR)
+            ttl: Seconds to keep successful responses
+            negative_ttl: Seconds to keep "not found" responses
+            offline: Serve only from the cache, never from the network
+        """
+        self.path = Path(cache_dir or CACHE_DIR) / CACHE_FILE
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._db = None
+        self._unavailable = False
+
+    def open(self) -> None:
+        """
+        Open (or create) the cache file now rather than on first use.
+
+        Raises:
+            CacheUnavailable: If the directory or database cannot be opened
+        """
+        with self._lock:
+            self._open()
+
+    def _open(self) -> None:
+        """Open the database if it is not open yet; called with the lock held."""
+        if self._db is not None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            with db:
+                db.execute('PRAGMA journal_mode=WAL')
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS responses ('
+                    ' endpoint TEXT NOT NULL,'
+                    ' identifier TEXT NOT NULL,'
+                    ' status INTEGER NOT NULL,'
+                    ' body BLOB NOT NULL,'
+                    ' encoding TEXT,'
+                    ' fetched_at REAL NOT NULL,'
+                    ' PRIMARY KEY (endpoint, identifier))'
+                )
+        except (OSError, sqlite3.Error) as e:
+            raise CacheUnavailable(f'Cannot open the response cache {self.path}: {e}') from e
+        self._db = db
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """
+        The open database, or None once it has failed to open (after warning
+        once). Called with the lock held.
+
+        Raises:
+            CacheUnavailable: In offline mode, if the cache cannot be opened
+        """
+        if self._db is None and not self._unavailable:
+            try:
+                self._open()
+            except CacheUnavailable as e:
+                if self.offline:
+                    raise
+                self._unavailable = True
+                print(f'Warning: {e}; continuing without the cache', file=sys.stderr)
+        return self._db
+
+    def get(self, endpoint: str, identifier: str) -> Optional[CachedResponse]:
+        """
+        Look up a cached response.
+
+        Args:
+            endpoint: Name of the API endpoint, e.g. 'crossref/works'
+            identifier: DOI, PMID or arXiv ID (normalized here)
+
+        Returns:
+            The cached response, or None if missing or expired (expired
+            responses are still returned in offline mode)
+        """
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return None
+            row = db.execute(
+                'SELECT status, body, encoding, fetched_at FROM responses'
+                ' WHERE endpoint = ? AND identifier = ?',
+                (endpoint, normalize_identifier(identifier)),
+            ).fetchone()
+        if row is None:
+            return None
+
+        status, body, encoding, fetched_at = row
+        ttl = self.negative_ttl if status in NOT_FOUND_STATUSES else self.ttl
+        if not self.offline and time.time() - fetched_at > ttl:
+            return None
+        return CachedResponse(status, body, encoding, from_cache=True)
+
+    def put(self, endpoint: str, identifier: str, status: int, body: bytes,
+            encoding: Optional[str] = None) -> None:
+        """Store a response, if its status is one that is worth caching."""
+        if not (200 <= status < 300 or status in NOT_FOUND_STATUSES):
+            return
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return
+            with db:
+                db.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                    (endpoint, normalize_identifier(identifier), status, body, encoding, time.time()),
+                )
+
+    def fetch(self, session: requests.Session, endpoint: str, identifier: str, url: str,
+              method: str = 'GET', not_found: Optional[Callable[[bytes], bool]] = None,
+              **kwargs) -> CachedResponse:
+        """
+        Return the cached response, or make the request and cache the result.
+
+        Args:
+            session: Session used for the request on a cache miss
+            endpoint: Name of the API endpoint, e.g. 'crossref/works'
+            identifier: DOI, PMID or arXiv ID the request is for
+            url: Request URL
+            method: HTTP method
+            not_found: Called with the body of a 200 response; if it returns True
+                the record does not exist and the response is treated as a 404
+            **kwargs: Passed to session.request (params, headers, timeout, ...)
+
+        Returns:
+            Cached or fresh response
+
+        Raises:
+            OfflineCacheMiss: In offline mode, if the response is not cached
+            CacheUnavailable: In offline mode, if the cache cannot be opened
+            requests.exceptions.RequestException: If the request fails
+        """
+        cached = self.get(endpoint, identifier)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        if self.offline:
+            raise OfflineCacheMiss(f'{endpoint} response for {identifier} is not cached (offline mode)')
+
+        self.misses += 1
+        response = session.request(method, url, **kwargs)
+        status = response.status_code
+        if status == 200 and not_found is not None and not_found(response.content):
+            status = 404
+        self.put(endpoint, identifier, status, response.content, response.encoding)
+        return CachedResponse(status, response.content, response.encoding, from_cache=False)
+
+    def stats(self) -> dict:
+        """Count cached responses by endpoint and status."""
+        with self._lock:
+            self._open()
+            rows = self._db.execute(
+                'SELECT endpoint, status, COUNT(*) FROM responses GROUP BY endpoint, status'
+                ' ORDER BY endpoint, status'
+            ).fetchall()
+        return {f'{endpoint} {status}': count for endpoint, status, count in rows}
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._open()
+            with self._db:
+                self._db.execute('DELETE FROM responses')
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def cached_request(session: requests.Session, cache: Optional[MetadataCache], endpoint: str,
+                   identifier: str, url: str, method: str = 'GET',
+                   not_found: Optional[Callable[[bytes], bool]] = None, **kwargs):
+    """
+    Make a request through the cache, or directly if cache is None.
+
+    not_found is only used when caching (see MetadataCache.fetch).
+
+    Returns:
+        CachedResponse, or requests.Response when not caching
+    """
+    if cache is None:
+        return session.request(method, url, **kwargs)
+    return cache.fetch(session, endpoint, identifier, url, method=method, not_found=not_found,
+                       **kwargs)
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Inspect or clear the citation metadata cache',
+        epilog=f'Cache location: {CACHE_DIR / CACHE_FILE}'
+    )
+    parser.add_argument('--stats', action='store_true', help='Show cached responses by endpoint')
+    parser.add_argument('--clear', action='store_true', help='Remove all cached responses')
+    args = parser.parse_args()
+
+    cache = MetadataCache()
+    try:
+        cache.open()
+    except CacheUnavailable as e:
+        print(f'Error: {e}', file=sys.stderr)
+        sys.exit(1)
+    if args.clear:
+        cache.clear()
+        print(f'Cleared {cache.path}')
+    else:
+        print(f'Cache: {cache.path}')
+        for name, count in cache.stats().items():
+            print(f'  {name}: {count}')
+
+
+if __name__ == '__main__':
+    main()
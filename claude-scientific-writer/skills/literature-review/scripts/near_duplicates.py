@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection
+Finds entries that describe the same work even when their titles, DOIs or
+years do not match exactly: typo'd titles, a preprint and its published
+version, or the same paper exported from several reference managers.
+
+Shared by citation-management/scripts (validate_citations.py, format_bibtex.py)
+and literature-review/scripts/search_databases.py; keep the copies identical.
+
+Candidate pairs come from three indexes, so the number of comparisons grows
+with the number of likely duplicates rather than with the square of the
+library size:
+- identical DOIs (always duplicates)
+- identical normalized titles
+- MinHash locality-sensitive hashing of title character trigrams plus the
+  first author, which tolerates typos
+Blocks that grow past MAX_BLOCK_SIZE (titles built from very common words)
+are only compared between neighbours in title order.
+
+Each candidate pair is scored on title similarity, then lowered if the first
+authors differ or the years are more than two apart. Two different published
+(non-preprint) DOIs, or titles whose numbers differ ("Part I" and "Part II",
+"in 2019" and "in 2020"), are never duplicates. Pairs scoring at least the
+threshold are clustered.
+
+Matches are either exact (the same DOI, or the same title, first author and
+year) or similar; exact_groups() splits a group into its exact parts, which
+is what is safe to merge without review.
+
+Usage:
+    from near_duplicates import find_duplicate_groups, record_from_bibtex
+
+    groups = find_duplicate_groups([record_from_bibtex(e) for e in entries])
+    for group in groups:
+        print(group.score, [entries[i]['key'] for i in group.members])
+"""
+
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+DEFAULT_THRESHOLD = 0.85
+
+# MinHash signature = BANDS x ROWS values. Two titles whose trigram sets have
+# Jaccard similarity 0.8 share a band with probability 0.99, 0.65 with 0.86,
+# 0.3 with 0.08 and 0.1 with 0.001
+BANDS = 10
+ROWS = 4
+
+# Larger blocks are compared by sorted neighbourhood within NEIGHBOURS positions
+MAX_BLOCK_SIZE = 50
+NEIGHBOURS = 10
+
+# DOI prefixes of preprint servers (arXiv, bioRxiv/medRxiv, Research Square,
+# Preprints.org, OSF, PsyArXiv, SSRN); a preprint and its published version
+# have different DOIs
+PREPRINT_DOI_PREFIXES = (
+    '10.48550/', '10.1101/', '10.21203/', '10.20944/', '10.31219/', '10.31234/', '10.2139/',
+)
+
+# Words after which a number or roman numeral marks a part of a series
+PART_WORDS = {
+    'book', 'chapter', 'issue', 'no', 'number', 'paper', 'part', 'pt', 'section', 'series',
+    'vol', 'volume',
+}
+
+EXACT_REASONS = ('doi', 'title')
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'by', 'for', 'from', 'in', 'is', 'of', 'on',
+    'or', 'the', 'to', 'toward', 'towards', 'using', 'via', 'with',
+}
+
+_PRIME = (1 << 61) - 1
+_HASH_A, _HASH_B = 0x5DEECE66D3A1, 0x2545F4914F6C
+
+
+class DuplicateRecord(NamedTuple):
+    """The fields of an entry that identify the work it describes."""
+    title: str
+    first_author: str = ''
+    year: str = ''
+    doi: str = ''
+
+
+class DuplicateMatch(NamedTuple):
+    """
+    Two records found to be duplicates.
+
+    reason is 'doi' (same DOI), 'title' (same title, first author and year,
+    where given) or 'similar'.
+    """
+    first: int
+    second: int
+    score: float
+    reason: str
+
+
+class DuplicateGroup(NamedTuple):
+    """
+    Indexes of records that describe the same work.
+
+    score is the lowest similarity among the matches that joined the group,
+    and matches lists those pairs.
+    """
+    members: List[int]
+    score: float
+    matches: List[DuplicateMatch]
+
+
+class _Prepared(NamedTuple):
+    title: str
+    tokens: frozenset
+    shingles: frozenset
+    author: str
+    year: Optional[int]
+    doi: str
+    numbers: tuple
+
+
+def _fold(text: str) -> str:
+    """Lowercase, strip accents, LaTeX commands and punctuation, collapse whitespace."""
+    text = re.sub(r'\\[a-zA-Z]+\s*|[{}$\\]', ' ', text or '')
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r'[^\w\s]|_', ' ', text.lower())
+    return ' '.join(text.split())
+
+
+def _roman(word: str) -> Optional[int]:
+    if not re.fullmatch(r'x{0,3}(ix|iv|v?i{0,3})', word) or not word:
+        return None
+    values = {'i': 1, 'v': 5, 'x': 10}
+    total = 0
+    for current, following in zip(word, word[1:] + ' '):
+        value = values[current]
+        total += -value if values.get(following, 0) > value else value
+    return total
+
+
+def _numbers(words: List[str]) -> tuple:
+    """Numbers in a folded title, with part/volume roman numerals as integers."""
+    numbers = []
+    for position, word in enumerate(words):
+        if word.isdigit():
+            numbers.append(int(word))
+        else:
+            # A lone "i" is only a numeral after "part", "vol" etc.
+            value = _roman(word)
+            if value and (len(word) > 1 or (position and words[position - 1] in PART_WORDS)):
+                numbers.append(value)
+    return tuple(sorted(numbers))
+
+
+def normalize_doi(doi: str) -> str:
+    doi = (doi or '').strip().lower()
+    for prefix in ('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'http://dx.doi.org/', 'doi:'):
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi.strip()
+
+
+def first_author_surname(authors) -> str:
+    """
+    Surname of the first author.
+
+    Args:
+        authors: BibTeX author field ("Last, First and ..." or "First Last and
+            ..."), a comma-separated list ("Smith J, Doe A"), or a list of names
+    """
+    if isinstance(authors, (list, tuple)):
+        first = str(authors[0]) if authors else ''
+    else:
+        first = re.split(r'\s+and\s+|;', authors or '', maxsplit=1)[0]
+    name = first.split(',')[0]
+    words = _fold(name).split()
+    # "Smith J" / "Li JA" (PubMed style) put upper-case initials last
+    initials = name.split()[-1].replace('.', '') if len(words) > 1 else ''
+    if initials.isupper() and len(initials) <= 3:
+        return ''.join(words[:-1])
+    if ',' in first:
+        return ''.join(words)  # "van der Berg, Jan"
+    return words[-1] if words else ''
+
+
+def record_from_bibtex(entry: Dict) -> DuplicateRecord:
+    """Record for an entry from bibtex_parser."""
+    fields = entry['fields']
+    return DuplicateRecord(
+        title=fields.get('title', ''),
+        first_author=first_author_surname(fields.get('author') or fields.get('editor', '')),
+        year=fields.get('year', ''),
+        doi=fields.get('doi', ''),
+    )
+
+
+def record_from_search_result(result: Dict) -> DuplicateRecord:
+    """Record for a literature search result ('title', 'authors', 'year', 'doi')."""
+    return DuplicateRecord(
+        title=result.get('title') or '',
+        first_author=first_author_surname(result.get('authors') or ''),
+        year=str(result.get('year') or ''),
+        doi=result.get('doi') or '',
+    )
+
+
+def is_preprint_doi(doi: str) -> bool:
+    return normalize_doi(doi).startswith(PREPRINT_DOI_PREFIXES)
+
+
+def _prepare(record: DuplicateRecord) -> _Prepared:
+    title = _fold(record.title)
+    all_words = title.split()
+    words = [word for word in all_words if word not in STOPWORDS]
+    author = first_author_surname(record.first_author)
+    year = re.search(r'\d{4}', str(record.year or ''))
+    return _Prepared(
+        title=title,
+        tokens=frozenset(words),
+        shingles=_shingles(' '.join(words) or title, author),
+        author=author,
+        year=int(year.group()) if year else None,
+        doi=normalize_doi(record.doi),
+        numbers=_numbers(all_words),
+    )
+
+
+def _shingles(text: str, author: str) -> frozenset:
+    """Character trigrams of the title (without stopwords), plus the first author."""
+    shingles = {text[i:i + 3] for i in range(max(1, len(text) - 2))} if text else set()
+    if author:
+        shingles.add('@' + author)
+    return frozenset(shingles)
+
+
+def _minhash(shingles: Iterable[str], hashes: Dict[str, int]) -> List[int]:
+    """
+    MinHash signature of BANDS * ROWS values, by one-permutation hashing.
+
+    Each shingle is hashed once into one of the signature's bins, and each
+    bin keeps its smallest value; empty bins borrow from the next filled bin
+    (rotation densification), which keeps the chance that two signatures
+    agree on a value equal to the sets' Jaccard similarity.
+
+    Args:
+        shingles: Set to sign
+        hashes: Cache of shingle hashes, shared between calls
+    """
+    size = BANDS * ROWS
+    signature = [None] * size
+    for shingle in shingles:
+        h = hashes.get(shingle)
+        if h is None:
+            h = hashes[shingle] = (_HASH_A * zlib.crc32(shingle.encode('utf-8')) + _HASH_B) % _PRIME
+        value, slot = divmod(h, size)
+        if signature[slot] is None or value < signature[slot]:
+            signature[slot] = value
+    if None in signature and any(value is not None for value in signature):
+        for slot in range(size):
+            if signature[slot] is None:
+                distance = 1
+                while signature[(slot + distance) % size] is None:
+                    distance += 1
+                signature[slot] = (distance, signature[(slot + distance) % size])
+    return signature
+
+
+def _score(a: _Prepared, b: _Prepared, threshold: float = 0.0) -> float:
+    """Similarity of two prepared records; below threshold it may be returned as 0."""
+    if a.doi and a.doi == b.doi:
+        return 1.0
+    if not a.title or not b.title:
+        return 0.0
+    # Two DOIs are two works, unless one of them is the preprint
+    if a.doi and b.doi and not (a.doi.startswith(PREPRINT_DOI_PREFIXES)
+                                or b.doi.startswith(PREPRINT_DOI_PREFIXES)):
+        return 0.0
+    # Parts of a series, or studies of different years
+    if a.numbers != b.numbers:
+        return 0.0
+
+    # One title extends the other, e.g. a subtitle added on publication
+    shorter = min(len(a.tokens), len(b.tokens))
+    score = 0.9 * len(a.tokens & b.tokens) / shorter if shorter >= 5 else 0.0
+
+    # Titles within a few typos of each other share most trigrams; only
+    # those are worth the exact (slower) edit-based ratio
+    dice = 2 * len(a.shingles & b.shingles) / (len(a.shingles) + len(b.shingles))
+    if dice >= min(threshold, 0.9) / 2:
+        score = max(score, SequenceMatcher(None, a.title, b.title).ratio())
+    if score < threshold:
+        return 0.0
+
+    if a.author and b.author and a.author != b.author:
+        if SequenceMatcher(None, a.author, b.author).ratio() < 0.8:
+            score *= 0.8
+    # A preprint is usually published within a year or two
+    if a.year and b.year and abs(a.year - b.year) > 2:
+        score *= 0.8
+    return score
+
+
+def _exact(a: _Prepared, b: _Prepared) -> bool:
+    """Same title, and the same first author and year where both give one."""
+    return (a.title == b.title
+            and (not a.author or not b.author or a.author == b.author)
+            and (not a.year or not b.year or a.year == b.year))
+
+
+def similarity(a: DuplicateRecord, b: DuplicateRecord) -> float:
+    """Similarity of two records, from 0 (unrelated) to 1 (same DOI or title)."""
+    return _score(_prepare(a), _prepare(b))
+
+
+def find_duplicate_groups(records: List[DuplicateRecord],
+                          threshold: float = DEFAULT_THRESHOLD) -> List[DuplicateGroup]:
+    """
+    Cluster records that describe the same work.
+
+    Args:
+        records: One record per entry (see record_from_bibtex and
+            record_from_search_result)
+        threshold: Minimum similarity for two records to be duplicates
+
+    Returns:
+        Groups of two or more record indexes, ordered by their first member
+    """
+    prepared = [_prepare(record) for record in records]
+    parent = list(range(len(records)))
+    matches = []
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def link(i, j, score, reason):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+            matches.append(DuplicateMatch(min(i, j), max(i, j), score, reason))
+
+    # Identical DOIs
+    by_doi = defaultdict(list)
+    for index, record in enumerate(prepared):
+        if record.doi:
+            by_doi[record.doi].append(index)
+    for indexes in by_doi.values():
+        for index in indexes[1:]:
+            link(indexes[0], index, 1.0, 'doi')
+
+    # Identical titles, then MinHash bands; each block holds candidate
+    # duplicates. Exact matches are linked first so that exact_groups() sees
+    # all of them.
+    title_blocks = defaultdict(list)
+    band_blocks = defaultdict(list)
+    hashes = {}
+    for index, record in enumerate(prepared):
+        if not record.title:
+            continue
+        title_blocks[record.title].append(index)
+        signature = _minhash(record.shingles, hashes)
+        for band in range(BANDS):
+            band_blocks[(band, tuple(signature[band * ROWS:(band + 1) * ROWS]))].append(index)
+
+    compared = set()
+    for exact_pass, blocks in ((True, title_blocks), (False, band_blocks)):
+        for indexes in blocks.values():
+            if len(indexes) < 2:
+                continue
+            if len(indexes) > MAX_BLOCK_SIZE:
+                indexes = sorted(indexes, key=lambda i: prepared[i].title)
+                window = NEIGHBOURS
+            else:
+                window = len(indexes)
+            for position, i in enumerate(indexes):
+                for j in indexes[position + 1:position + 1 + window]:
+                    pair = (i, j) if i < j else (j, i)
+                    if pair in compared or find(i) == find(j):
+                        continue
+                    if exact_pass:
+                        if not _exact(prepared[i], prepared[j]):
+                            continue  # left for the MinHash pass
+                        score = _score(prepared[i], prepared[j], threshold)
+                        if score >= threshold:
+                            link(i, j, score, 'title')
+                    else:
+                        score = _score(prepared[i], prepared[j], threshold)
+                        if score >= threshold:
+                            link(i, j, score, 'similar')
+                    compared.add(pair)
+
+    members = defaultdict(list)
+    for index in range(len(records)):
+        members[find(index)].append(index)
+    group_matches = defaultdict(list)
+    for match in matches:
+        group_matches[find(match.first)].append(match)
+
+    return [
+        DuplicateGroup(indexes, min(m.score for m in group_matches[root]), group_matches[root])
+        for root, indexes in sorted(members.items())
+        if len(indexes) > 1
+    ]
+
+
+def exact_groups(group: DuplicateGroup) -> List[DuplicateGroup]:
+    """
+    Split a group into the parts joined by exact matches (the same DOI, or
+    the same title, first author and year); members matched to the rest only
+    by similarity are left out.
+    """
+    parent = {index: index for index in group.members}
+
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    exact = [match for match in group.matches if match.reason in EXACT_REASONS]
+    for match in exact:
+        parent[find(match.second)] = find(match.first)
+    members = defaultdict(list)
+    for index in group.members:
+        members[find(index)].append(index)
+    return [
+        DuplicateGroup(indexes, 1.0, [m for m in exact if find(m.first) == root])
+        for root, indexes in sorted(members.items())
+        if len(indexes) > 1
+    ]
+
+
+def preferred_member(group: DuplicateGroup, records: List[DuplicateRecord],
+                     field_counts: Optional[List[int]] = None) -> int:
+    """
+    The member to keep when merging a group: a published version over a
+    preprint, then the one with a DOI, then the most complete, then the first.
+
+    Args:
+        group: Duplicate group
+        records: The records the group indexes into
+        field_counts: Optional number of filled-in fields per record
+    """
+    def rank(index):
+        doi = records[index].doi
+        return (
+            bool(doi) and not is_preprint_doi(doi),
+            bool(doi),
+            field_counts[index] if field_counts else 0,
+            -index,
+        )
+    return max(group.members, key=rank)
@@ -6,9 +6,12 @@ Searches multiple literature databases and aggregates results.
 
 import json
 import sys
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime
 
+from near_duplicates import (DEFAULT_THRESHOLD, exact_groups, find_duplicate_groups, preferred_member,
+                             record_from_search_result)
+
 def format_search_results(results: List[Dict], output_format: str = 'json') -> str:
     """
     Format search results for output.
@@ -80,41 +83,39 @@ def format_search_results(results: List[Dict], output_format: str = 'json') -> s
     else:
         raise ValueError(f"Unknown format: {output_format}")
 
-def deduplicate_results(results: List[Dict]) -> List[Dict]:
+def deduplicate_results(results: List[Dict], similarity: Optional[float] = None) -> List[Dict]:
     """
-    Remove duplicate results based on DOI or title.
+    Remove duplicate results based on DOI or identical title, first author
+    and year.
+
+    Near-identical titles (such as a preprint and its published version found
+    in different databases; see near_duplicates.py) are only listed on stderr
+    as possible duplicates, unless similarity is given. Of each group of
+    duplicates the published, most complete result is kept.
 
     Args:
         results: List of search results
+        similarity: Also remove results at least this similar (0-1)
 
     Returns:
         Deduplicated list
     """
-    seen_dois = set()
-    seen_titles = set()
-    unique_results = []
-
-    for result in results:
-        doi = result.get('doi', '').lower().strip()
-        title = result.get('title', '').lower().strip()
-
-        # Check DOI first (more reliable)
-        if doi and doi in seen_dois:
-            continue
-
-        # Check title as fallback
-        if not doi and title in seen_titles:
-            continue
-
-        # Add to results
-        if doi:
-            seen_dois.add(doi)
-        if title:
-            seen_titles.add(title)
-
-        unique_results.append(result)
+    records = [record_from_search_result(result) for result in results]
+    field_counts = [sum(1 for value in result.values() if value) for result in results]
+    duplicate_indexes = set()
+    for group in find_duplicate_groups(records, similarity or DEFAULT_THRESHOLD):
+        if similarity is None:
+            merged = exact_groups(group)
+            if len(merged) != 1 or merged[0].members != group.members:
+                titles = '; '.join(f'"{results[index].get("title", "")}"' for index in group.members)
+                print(f"Possible duplicates (similarity {group.score:.2f}), kept: {titles}", file=sys.stderr)
+        else:
+            merged = [group]
+        for part in merged:
+            keep = preferred_member(part, records, field_counts)
+            duplicate_indexes.update(index for index in part.members if index != keep)
 
-    return unique_results
+    return [result for index, result in enumerate(results) if index not in duplicate_indexes]
 
 def rank_results(results: List[Dict], criteria: str = 'citations') -> List[Dict]:
     """
@@ -217,6 +218,7 @@ def main():
         print("  --year-start YEAR        Filter by start year")
         print("  --year-end YEAR          Filter by end year")
         print("  --deduplicate            Remove duplicates")
+        print(f"  --similarity SCORE       Also remove near-duplicates this similar (e.g. {DEFAULT_THRESHOLD})")
         print("  --summary                Show summary statistics")
         sys.exit(1)
 
@@ -236,6 +238,7 @@ def main():
     year_start = None
     year_end = None
     do_dedup = False
+    similarity = None
     show_summary = False
 
     i = 2
@@ -260,6 +263,9 @@ def main():
         elif arg == '--deduplicate':
             do_dedup = True
             i += 1
+        elif arg == '--similarity' and i + 1 < len(sys.argv):
+            similarity = float(sys.argv[i + 1])
+            i += 2
         elif arg == '--summary':
             show_summary = True
             i += 1
@@ -268,7 +274,7 @@ def main():
 
     # Process results
     if do_dedup:
-        results = deduplicate_results(results)
+        results = deduplicate_results(results, similarity)
         print(f"After deduplication: {len(results)} results")
 
     if year_start or year_end:
@@ -5,17 +5,20 @@ Verifies DOIs, URLs, and citation metadata for accuracy.
 """
 
 import re
-import requests
 import json
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
-import time
+
+from metadata_cache import CacheUnavailable, MetadataCache, OfflineCacheMiss, cached_request
+from rate_limiter import DEFAULT_WORKERS, RateLimitedSession, map_concurrently, user_agent
 
 class CitationVerifier:
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, cache: Optional[MetadataCache] = None):
+        """cache: optional response cache for DOI lookups (see metadata_cache.py)."""
+        self.cache = cache
+        self.session = RateLimitedSession()
         self.session.headers.update({
-            'User-Agent': 'CitationVerifier/1.0 (Literature Review Tool)'
+            'User-Agent': user_agent('CitationVerifier/1.0', 'Literature Review Tool')
         })
 
     def extract_dois(self, text: str) -> List[str]:
@@ -27,10 +30,11 @@ class CitationVerifier:
         """
         Verify a DOI and retrieve metadata.
         Returns (is_valid, metadata)
+        Raises OfflineCacheMiss in offline mode if the DOI is not cached.
         """
         try:
             url = f"https://doi.org/api/handles/{doi}"
-            response = self.session.get(url, timeout=10)
+            response = cached_request(self.session, self.cache, "doi.org/handle", doi, url, timeout=10)
 
             if response.status_code == 200:
                 # DOI exists, now get metadata from CrossRef
@@ -38,6 +42,8 @@ class CitationVerifier:
                 return True, metadata
             else:
                 return False, {}
+        except OfflineCacheMiss:
+            raise
         except Exception as e:
             return False, {"error": str(e)}
 
@@ -45,7 +51,7 @@ class CitationVerifier:
         """Get metadata from CrossRef API."""
         try:
             url = f"https://api.crossref.org/works/{doi}"
-            response = self.session.get(url, timeout=10)
+            response = cached_request(self.session, self.cache, "crossref/works", doi, url, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -105,9 +111,9 @@ class CitationVerifier:
         except Exception as e:
             return False, 0
 
-    def verify_citations_in_file(self, filepath: str) -> Dict:
+    def verify_citations_in_file(self, filepath: str, workers: int = DEFAULT_WORKERS) -> Dict:
         """
-        Verify all citations in a markdown file.
+        Verify all citations in a markdown file, up to `workers` DOIs at a time.
         Returns a report of verification results.
         """
         with open(filepath, 'r', encoding='utf-8') as f:
@@ -119,21 +125,30 @@ class CitationVerifier:
             'total_dois': len(dois),
             'verified': [],
             'failed': [],
+            'unverified': [],
             'metadata': {}
         }
 
-        for doi in dois:
-            print(f"Verifying DOI: {doi}")
-            is_valid, metadata = self.verify_doi(doi)
+        def verify(doi):
+            try:
+                return self.verify_doi(doi)
+            except OfflineCacheMiss:
+                return None
+
+        # The session keeps doi.org and CrossRef within their rate limits
+        for doi, result in zip(dois, map_concurrently(verify, dois, workers)):
+            print(f"Verified DOI: {doi}")
+            if result is None:
+                report['unverified'].append(doi)
+                continue
 
+            is_valid, metadata = result
             if is_valid:
                 report['verified'].append(doi)
                 report['metadata'][doi] = metadata
             else:
                 report['failed'].append(doi)
 
-            time.sleep(0.5)  # Rate limiting
-
         return report
 
     def format_citation_apa(self, metadata: Dict) -> str:
@@ -183,12 +198,23 @@ def main():
     """Example usage."""
     import sys
 
-    if len(sys.argv) < 2:
-        print("Usage: python verify_citations.py <markdown_file>")
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = set(sys.argv[1:]) - set(args)
+    if len(args) < 1 or not options <= {"--offline", "--no-cache"} or options == {"--offline", "--no-cache"}:
+        print("Usage: python verify_citations.py <markdown_file> [--offline | --no-cache]")
+        print("  --offline   use only cached responses, never the network")
+        print("  --no-cache  do not read or write the response cache")
         sys.exit(1)
 
-    filepath = sys.argv[1]
-    verifier = CitationVerifier()
+    filepath = args[0]
+    cache = None if "--no-cache" in options else MetadataCache(offline="--offline" in options)
+    if "--offline" in options:
+        try:
+            cache.open()  # Offline lookups cannot work without the cache
+        except CacheUnavailable as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    verifier = CitationVerifier(cache=cache)
 
     print(f"Verifying citations in: {filepath}")
     report = verifier.verify_citations_in_file(filepath)
@@ -199,6 +225,8 @@ def main():
     print(f"\nTotal DOIs found: {report['total_dois']}")
     print(f"Verified: {len(report['verified'])}")
     print(f"Failed: {len(report['failed'])}")
+    if report['unverified']:
+        print(f"Not cached (offline): {len(report['unverified'])}")
 
     if report['failed']:
         print("\nFailed DOIs:")
@@ -7,6 +7,8 @@ Supports multiple output formats and resolutions.
 
 Uses PyMuPDF (fitz) as the primary conversion method - no external
 dependencies required (no poppler, ghostscript, or ImageMagick needed).
+Pages are rendered in parallel by pdf_rasterizer.py and written to disk as
+they are rendered, so memory use stays flat for long decks.
 """
 
 import sys
@@ -14,12 +16,9 @@ import argparse
 from pathlib import Path
 from typing import Optional, List
 
-# Try to import pymupdf (preferred - no external dependencies)
-try:
-    import fitz  # PyMuPDF
-    HAS_PYMUPDF = True
-except ImportError:
-    HAS_PYMUPDF = False
+from pdf_rasterizer import literal_pattern, pymupdf, rasterize_pdf
+
+HAS_PYMUPDF = pymupdf is not None
 
 
 class PDFToImagesConverter:
@@ -32,7 +31,9 @@ class PDFToImagesConverter:
         dpi: int = 150,
         format: str = 'jpg',
         first_page: Optional[int] = None,
-        last_page: Optional[int] = None
+        last_page: Optional[int] = None,
+        max_dim: Optional[int] = None,
+        jobs: Optional[int] = None
     ):
         self.pdf_path = Path(pdf_path)
         self.output_prefix = output_prefix
@@ -40,6 +41,8 @@ class PDFToImagesConverter:
         self.format = format.lower()
         self.first_page = first_page
         self.last_page = last_page
+        self.max_dim = max_dim
+        self.jobs = jobs
         
         # Validate format
         if self.format not in ['jpg', 'jpeg', 'png']:
@@ -68,41 +71,17 @@ class PDFToImagesConverter:
         """Convert using PyMuPDF library (no external dependencies)."""
         print("Using PyMuPDF (no external dependencies required)...")
         
-        # Open the PDF
-        doc = fitz.open(self.pdf_path)
-        
-        # Determine page range
-        start_page = (self.first_page - 1) if self.first_page else 0
-        end_page = self.last_page if self.last_page else doc.page_count
-        
-        # Calculate zoom factor from DPI (72 DPI is the base)
-        zoom = self.dpi / 72
-        matrix = fitz.Matrix(zoom, zoom)
-        
-        output_files = []
-        output_dir = Path(self.output_prefix).parent
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        for page_num in range(start_page, end_page):
-            page = doc[page_num]
-            
-            # Render page to pixmap
-            pixmap = page.get_pixmap(matrix=matrix)
-            
-            # Determine output path
-            output_path = Path(f"{self.output_prefix}-{page_num + 1:03d}.{self.format}")
-            
-            # Save the image
-            if self.format in ['jpg', 'jpeg']:
-                pixmap.save(str(output_path), output="jpeg")
-            else:
-                pixmap.save(str(output_path), output="png")
-            
-            output_files.append(output_path)
-            print(f"  Created: {output_path.name}")
-        
-        doc.close()
-        return output_files
+        pages = rasterize_pdf(
+            self.pdf_path,
+            literal_pattern(self.output_prefix) + f"-{{page:03d}}.{self.format}",
+            dpi=self.dpi,
+            max_dim=self.max_dim,
+            first_page=self.first_page,
+            last_page=self.last_page,
+            jobs=self.jobs,
+            on_page=lambda page: print(f"  Created: {page.path.name}")
+        )
+        return [page.path for page in pages]
 
 
 def main():
@@ -119,6 +98,9 @@ Examples:
   
   %(prog)s presentation.pdf review/s --first 5 --last 10
     → Converts only slides 5-10
+  
+  %(prog)s presentation.pdf review/s --max-dim 1600 --jobs 4
+    → Fits every slide within 1600 px, rendering on 4 processes
 
 Output:
   Images are named: PREFIX-001.FORMAT, PREFIX-002.FORMAT, etc.
@@ -170,6 +152,18 @@ Requirements:
         help='Last page to convert (1-indexed)'
     )
     
+    parser.add_argument(
+        '--max-dim',
+        type=int,
+        help='Scale pages down so neither side exceeds this many pixels'
+    )
+    
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        help='Worker processes to render with (default: CPU count)'
+    )
+    
     args = parser.parse_args()
     
     # Create output directory if needed
@@ -185,7 +179,9 @@ Requirements:
             dpi=args.dpi,
             format=args.format,
             first_page=args.first,
-            last_page=args.last
+            last_page=args.last,
+            max_dim=args.max_dim,
+            jobs=args.jobs
         )
         
         output_files = converter.convert()
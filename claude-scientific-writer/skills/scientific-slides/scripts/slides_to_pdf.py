@@ -14,12 +14,22 @@ Usage:
     
     # From a directory (sorted by filename)
     python slides_to_pdf.py slides/ -o presentation.pdf
+
+With PyMuPDF installed, pages are assembled one at a time: JPEG slides are
+embedded as-is without re-encoding, and other images are decoded one by one
+(in parallel worker processes for larger decks) and JPEG-encoded the same way
+Pillow's PDF writer does. Only compressed image data is held in memory, not
+decoded pixels. Without PyMuPDF, or with --no-stream, all images are loaded
+and saved with Pillow.
 """
 
 import argparse
+import io
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 try:
     from PIL import Image
@@ -27,6 +37,20 @@ except ImportError:
     print("Error: Pillow library not found. Install with: pip install Pillow")
     sys.exit(1)
 
+try:
+    import pymupdf
+except ImportError:
+    try:
+        import fitz as pymupdf  # PyMuPDF before 1.24
+    except ImportError:
+        pymupdf = None
+
+# Below this many images, starting worker processes costs more than it saves
+PARALLEL_MIN_IMAGES = 4
+
+# JPEG modes that can be embedded in a PDF without decoding
+EMBEDDABLE_JPEG_MODES = {'RGB', 'L'}
+
 
 def get_image_files(paths: List[str]) -> List[Path]:
     """
@@ -71,8 +95,112 @@ def get_image_files(paths: List[str]) -> List[Path]:
     return image_files
 
 
+def flatten_to_rgb(img: Image.Image) -> Image.Image:
+    """
+    Convert an image to RGB, flattening transparency onto white.
+    
+    Args:
+        img: Opened image
+        
+    Returns:
+        RGB image (img itself if it already is RGB)
+    """
+    # Convert to RGB if necessary (PDF doesn't support RGBA)
+    if img.mode in ('RGBA', 'P'):
+        # Create white background
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def slide_jpeg(image_path: Path) -> Tuple[bytes, Tuple[int, int]]:
+    """
+    Get the JPEG data to embed for one slide image.
+    
+    JPEG files are returned as-is. Anything else is decoded, flattened to RGB
+    and JPEG-encoded with Pillow's defaults, which is what Pillow's own PDF
+    writer embeds.
+    
+    Args:
+        image_path: Image file
+        
+    Returns:
+        Tuple of (JPEG bytes, (width, height) in pixels)
+    """
+    with Image.open(image_path) as img:
+        if img.format == 'JPEG' and img.mode in EMBEDDABLE_JPEG_MODES:
+            return Path(image_path).read_bytes(), img.size
+        
+        buffer = io.BytesIO()
+        flatten_to_rgb(img).save(buffer, "JPEG")
+        return buffer.getvalue(), img.size
+
+
+def _combine_streaming(image_paths: List[Path], output_path: Path, dpi: int,
+                       jobs: Optional[int], verbose: bool) -> int:
+    """Assemble the PDF page by page with PyMuPDF; return the page count."""
+    jobs = jobs or os.cpu_count() or 1
+    total = len(image_paths)
+    
+    if jobs == 1 or total < PARALLEL_MIN_IMAGES:
+        executor = None
+        slides = map(slide_jpeg, image_paths)
+    else:
+        executor = ProcessPoolExecutor(max_workers=min(jobs, total))
+        # map() yields in input order while later images are still converting
+        slides = executor.map(slide_jpeg, image_paths)
+    
+    try:
+        with pymupdf.open() as doc:
+            for i, (img_path, (data, (width, height))) in enumerate(zip(image_paths, slides)):
+                # Same page size as Pillow's PDF output: pixels at the given DPI
+                page = doc.new_page(width=width * 72 / dpi, height=height * 72 / dpi)
+                page.insert_image(page.rect, stream=data)
+                
+                if verbose:
+                    print(f"  [{i+1}/{total}] Added: {img_path.name} ({width}x{height})")
+            
+            doc.save(output_path, garbage=1)
+            return doc.page_count
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _combine_with_pillow(image_paths: List[Path], output_path: Path, dpi: int,
+                         verbose: bool) -> int:
+    """Load every image and save them with Pillow; return the page count."""
+    images = []
+    try:
+        for i, img_path in enumerate(image_paths):
+            img = flatten_to_rgb(Image.open(img_path))
+            images.append(img)
+            
+            if verbose:
+                print(f"  [{i+1}/{len(image_paths)}] Loaded: {img_path.name} ({img.size[0]}x{img.size[1]})")
+        
+        images[0].save(
+            output_path,
+            "PDF",
+            resolution=dpi,
+            save_all=True,
+            append_images=images[1:]
+        )
+        return len(images)
+    finally:
+        # Close all images
+        for img in images:
+            img.close()
+
+
 def combine_images_to_pdf(image_paths: List[Path], output_path: Path, 
-                         dpi: int = 150, verbose: bool = False) -> bool:
+                         dpi: int = 150, verbose: bool = False,
+                         stream: bool = True, jobs: Optional[int] = None) -> bool:
     """
     Combine multiple images into a single PDF.
     
@@ -81,6 +209,10 @@ def combine_images_to_pdf(image_paths: List[Path], output_path: Path,
         output_path: Output PDF path
         dpi: Resolution for the PDF (default: 150)
         verbose: Print progress information
+        stream: Assemble page by page with PyMuPDF if it is installed
+            (default: True); otherwise load all images with Pillow
+        jobs: Worker processes for converting images when streaming
+            (default: CPU count)
         
     Returns:
         True if successful, False otherwise
@@ -89,74 +221,36 @@ def combine_images_to_pdf(image_paths: List[Path], output_path: Path,
         print("Error: No image files found")
         return False
     
+    if stream and pymupdf is None:
+        if verbose:
+            print("PyMuPDF not installed; loading all images with Pillow instead")
+        stream = False
+    
     if verbose:
         print(f"Combining {len(image_paths)} images into PDF...")
     
-    # Load all images
-    images = []
-    for i, img_path in enumerate(image_paths):
-        try:
-            img = Image.open(img_path)
-            # Convert to RGB if necessary (PDF doesn't support RGBA)
-            if img.mode in ('RGBA', 'P'):
-                # Create white background
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            images.append(img)
-            
-            if verbose:
-                print(f"  [{i+1}/{len(image_paths)}] Loaded: {img_path.name} ({img.size[0]}x{img.size[1]})")
-        except Exception as e:
-            print(f"Error loading {img_path}: {e}")
-            return False
-    
-    if not images:
-        print("Error: No images could be loaded")
-        return False
-    
     # Create output directory if needed
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Save as PDF
     try:
-        # First image
-        first_image = images[0]
-        
-        # Remaining images (if any)
-        remaining_images = images[1:] if len(images) > 1 else []
-        
-        # Save to PDF
-        first_image.save(
-            output_path,
-            "PDF",
-            resolution=dpi,
-            save_all=True,
-            append_images=remaining_images
-        )
-        
-        if verbose:
-            print(f"\n✓ PDF created: {output_path}")
-            print(f"  Total slides: {len(images)}")
-            file_size = output_path.stat().st_size
-            if file_size > 1024 * 1024:
-                print(f"  File size: {file_size / (1024 * 1024):.1f} MB")
-            else:
-                print(f"  File size: {file_size / 1024:.1f} KB")
-        
-        return True
+        if stream:
+            page_count = _combine_streaming(image_paths, output_path, dpi, jobs, verbose)
+        else:
+            page_count = _combine_with_pillow(image_paths, output_path, dpi, verbose)
     except Exception as e:
         print(f"Error creating PDF: {e}")
         return False
-    finally:
-        # Close all images
-        for img in images:
-            img.close()
+    
+    if verbose:
+        print(f"\n✓ PDF created: {output_path}")
+        print(f"  Total slides: {page_count}")
+        file_size = output_path.stat().st_size
+        if file_size > 1024 * 1024:
+            print(f"  File size: {file_size / (1024 * 1024):.1f} MB")
+        else:
+            print(f"  File size: {file_size / 1024:.1f} KB")
+    
+    return True
 
 
 def main():
@@ -177,6 +271,9 @@ Examples:
   
   # With custom DPI and verbose output
   python slides_to_pdf.py slides/*.png -o presentation.pdf --dpi 200 -v
+  
+  # Convert images on 4 processes
+  python slides_to_pdf.py slides/ -o presentation.pdf --jobs 4
 
 Supported formats: PNG, JPG, JPEG, GIF, WEBP, BMP
 
@@ -196,6 +293,10 @@ Tips:
                        help="PDF resolution in DPI (default: 150)")
     parser.add_argument("-v", "--verbose", action="store_true",
                        help="Verbose output")
+    parser.add_argument("--no-stream", action="store_true",
+                       help="Load all images with Pillow instead of assembling page by page")
+    parser.add_argument("-j", "--jobs", type=int,
+                       help="Worker processes for converting images (default: CPU count)")
     
     args = parser.parse_args()
     
@@ -220,7 +321,9 @@ Tips:
         image_files, 
         output_path, 
         dpi=args.dpi, 
-        verbose=args.verbose
+        verbose=args.verbose,
+        stream=not args.no_stream,
+        jobs=args.jobs
     )
     
     if success:
@@ -0,0 +1,88 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from slides_to_pdf import combine_images_to_pdf, pymupdf, slide_jpeg
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+@unittest.skipIf(pymupdf is None, "PyMuPDF is not installed")
+class TestStreamingCombine(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.temp_path = Path(self.temp_dir.name)
+
+        # JPEG slides are embedded as-is, the others are converted
+        self.slides = [
+            self.save("01.jpg", Image.new("RGB", (320, 180), (200, 30, 30))),
+            self.save("02.png", Image.new("RGBA", (320, 180), (30, 200, 30, 128))),
+            self.save("03.jpg", Image.new("L", (160, 120), 90)),
+            self.save("04.png", Image.new("P", (240, 180), 7)),
+            self.save("05.jpg", Image.new("CMYK", (320, 180), (0, 50, 100, 0))),
+        ]
+
+    def save(self, name, image):
+        path = self.temp_path / name
+        image.save(path)
+        return path
+
+    def combine(self, name, **kwargs):
+        output_path = self.temp_path / name
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(combine_images_to_pdf(self.slides, output_path, **kwargs))
+        return output_path
+
+    def page_images(self, pdf_path):
+        """(filter, image bytes, page size) of the single image on each page."""
+        pages = []
+        with pymupdf.open(pdf_path) as doc:
+            for page in doc:
+                (xref, *_), = page.get_images()
+                _, image_filter = doc.xref_get_key(xref, "Filter")
+                pages.append(
+                    (
+                        image_filter,
+                        doc.xref_stream_raw(xref),
+                        (round(page.rect.width, 2), round(page.rect.height, 2)),
+                    )
+                )
+        return pages
+
+    def test_jpeg_embedded_as_is_and_others_converted(self):
+        for jobs in (1, 2):
+            pages = self.page_images(self.combine(f"jobs{jobs}.pdf", jobs=jobs))
+            self.assertEqual(len(pages), len(self.slides))
+            for slide, (image_filter, data, _) in zip(self.slides, pages):
+                self.assertEqual(image_filter, "/DCTDecode", slide.name)
+                if slide.name in ("01.jpg", "03.jpg"):
+                    self.assertEqual(data, slide.read_bytes(), slide.name)
+                else:
+                    self.assertNotEqual(data, slide.read_bytes(), slide.name)
+                    self.assertEqual(data, slide_jpeg(slide)[0], slide.name)
+
+    def test_converted_slides_are_rgb_jpeg(self):
+        for slide in self.slides[1:]:
+            data, size = slide_jpeg(slide)
+            with Image.open(io.BytesIO(data)) as image:
+                self.assertEqual(image.format, "JPEG")
+                self.assertIn(image.mode, ("RGB", "L"))
+                self.assertEqual(image.size, size)
+
+    def test_pages_match_pillow_output(self):
+        streamed = self.page_images(self.combine("streamed.pdf", dpi=96, jobs=2))
+        pillow = self.page_images(self.combine("pillow.pdf", dpi=96, stream=False))
+        self.assertEqual(len(streamed), len(pillow))
+        self.assertEqual(
+            [size for _, _, size in streamed], [size for _, _, size in pillow]
+        )
+        self.assertEqual(streamed[0][2], (240.0, 135.0))
+
+
+if __name__ == "__main__":
+    unittest.main()